@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Reservation, Business
+from .models import User, Reservation, Business, NotificationJob
 
 # Register your models here.
 
@@ -15,10 +15,10 @@ class BusinessAdmin(admin.ModelAdmin):
             'fields': ('name', 'subdomain', 'email', 'phone')
         }),
         ('Business Settings', {
-            'fields': ('business_hours_start', 'business_hours_end', 'timezone')
+            'fields': ('business_hours_start', 'business_hours_end', 'timezone', 'serialize_bookings')
         }),
         ('Email Configuration', {
-            'fields': ('email_from_name', 'email_from_address')
+            'fields': ('email_from_name', 'email_from_address', 'email_digest_enabled', 'email_digest_minutes')
         }),
         ('Branding', {
             'fields': ('primary_color', 'logo_url')
@@ -64,3 +64,11 @@ class UserAdmin(admin.ModelAdmin):
         return form
 
 admin.site.register(Reservation)
+
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'recipient', 'business', 'status', 'created_at', 'sent_at']
+    list_filter = ['status', 'kind', 'channel']
+    search_fields = ['recipient']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'sent_at']
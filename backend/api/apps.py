@@ -1,3 +1,6 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
@@ -7,3 +10,12 @@ class ApiConfig(AppConfig):
     
     def ready(self):
         import api.signals  # Import signals from api app
+        import api.checks  # Register system checks
+
+        # Under gunicorn the post_worker_init hook starts the notification
+        # sweeper; runserver has no hook, so its serving process starts it here
+        if sys.argv[1:2] == ['runserver'] and (
+            os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+        ):
+            from api.utils.notifications import start_sweeper
+            start_sweeper()
@@ -0,0 +1,37 @@
+from django.core.checks import Tags, Warning, register
+from django.db import DatabaseError
+
+
+@register(Tags.database)
+def check_business_subdomains(app_configs, databases=None, **kwargs):
+    """
+    Report businesses whose stored subdomain breaks the tenant lookup rules.
+    TenantRegistry.get() never resolves such hosts, so these businesses are
+    unreachable until the subdomain is renamed. Runs with migrate and with
+    `manage.py check --database default`.
+    """
+    from api.models import Business
+    from api.utils.input_sanitizer import InputSanitizer
+
+    if not databases:
+        return []
+    try:
+        rows = list(Business.objects.values_list('pk', 'subdomain', 'is_active'))
+    except DatabaseError:
+        # Table not created yet (fresh database before migrate)
+        return []
+
+    invalid = [row for row in rows if not InputSanitizer.is_valid_subdomain(row[1])]
+    if not invalid:
+        return []
+    listed = ', '.join(
+        f"'{subdomain}' ({pk}{'' if is_active else ', inactive'})" for pk, subdomain, is_active in invalid
+    )
+    return [
+        Warning(
+            f'{len(invalid)} business subdomain(s) do not match the tenant lookup rules and cannot be reached: {listed}',
+            hint='Rename them: 3-63 lowercase letters, digits or hyphens, no leading/trailing hyphen, not reserved.',
+            obj=Business,
+            id='api.W001',
+        )
+    ]
@@ -0,0 +1,333 @@
+import contextlib
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import Business, NotificationJob, Reservation, User
+from api.utils import notifications
+from api.utils.fake_providers import FakeProviderServer, FakeSMTPServer
+from api.utils.mail_pool import mail_connection
+from api.utils.provider_routing import provider_router
+
+CHANNELS = ('email', 'sms', 'whatsapp')
+
+
+def is_test_database():
+    """Django's test databases are named test_*; SQLite may also be in memory"""
+    name = str(connection.settings_dict['NAME'] or '')
+    return os.path.basename(name).startswith('test') or 'memory' in name
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(share * (len(values) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Push N reservations through the API (public create for the owner email, '
+        'update_status for the status SMS / WhatsApp) against in-process fake '
+        'providers and report throughput, p50/p99 latency and thread counts. '
+        'Jobs are delivered the way this configuration delivers them: by the '
+        'in-process executor after commit, or with NOTIFICATION_WORKER_ENABLED=1 '
+        'by --concurrency delivery threads standing in for run_notification_worker. '
+        'Refuses to run on a non-test database unless --allow-db is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reservations', type=int, default=200)
+        parser.add_argument(
+            '--channels',
+            default=','.join(CHANNELS),
+            help='Comma-separated phases to run: email, sms, whatsapp'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Delivery threads (like run_notification_worker --concurrency); worker mode only'
+        )
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--latency-ms', type=float, default=20, help='Fake provider delay per message')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Extra random delay per message, up to')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of messages the fakes refuse')
+        parser.add_argument('--handshake-ms', type=float, default=0, help='Fake HTTP delay per new connection')
+        parser.add_argument(
+            '--retry-delay-ms',
+            type=float,
+            default=200,
+            help='Retry failed jobs after this long instead of the configured backoff'
+        )
+        parser.add_argument('--timeout', type=float, default=300, help='Seconds to wait per phase')
+        parser.add_argument(
+            '--allow-db',
+            action='store_true',
+            help='Run even though the database is not a test database (creates and deletes a benchmark business)'
+        )
+
+    def handle(self, *args, **options):
+        if not is_test_database() and not options['allow_db']:
+            raise CommandError(
+                f'{connection.settings_dict["NAME"]} is not a test database. The benchmark '
+                'creates a business, reservations and notification jobs in it; pass '
+                '--allow-db to run it there anyway.'
+            )
+        channels = [channel.strip() for channel in options['channels'].split(',') if channel.strip()]
+        unknown = set(channels) - set(CHANNELS)
+        if unknown:
+            raise CommandError(f'Unknown channel(s): {", ".join(sorted(unknown))}')
+
+        faults = dict(
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            failure_rate=options['failure_rate'],
+        )
+        smtp = FakeSMTPServer(**faults).start()
+        http = FakeProviderServer(handshake_ms=options['handshake_ms'], **faults).start()
+        providers = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=smtp.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+            DEFAULT_FROM_EMAIL='benchmark@example.com',
+            TWILIO_ACCOUNT_SID='AC' + '0' * 32,
+            TWILIO_AUTH_TOKEN='benchmark',
+            TWILIO_PHONE_NUMBER='+15005550006',
+            TWILIO_WHATSAPP_NUMBER='+14155238886',
+            TWILIO_API_BASE_URL=http.url,
+            ULTRAMSG_INSTANCE_ID='benchmark',
+            ULTRAMSG_TOKEN='benchmark',
+            ULTRAMSG_API_URL=http.url,
+        )
+
+        if notifications.WORKER_ENABLED:
+            delivery = f'worker mode, {options["concurrency"]} delivery threads'
+        else:
+            delivery = f'in-process executor, {notifications.EXECUTOR_THREADS} threads'
+        self.stdout.write(
+            f'🏁 {options["reservations"]} reservations, {delivery}, '
+            f'provider latency {options["latency_ms"]} ms, failure rate {options["failure_rate"]:.0%}'
+        )
+        business, owner = self._create_business()
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user=owner)
+        results = []
+        try:
+            # Per-message logs and prints of the senders would dominate the run
+            with providers, open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                logging.disable(logging.ERROR)
+                try:
+                    for channel in channels:
+                        results.append(self._run_phase(channel, business, client, options))
+                finally:
+                    logging.disable(logging.NOTSET)
+        finally:
+            owner.delete()
+            business.delete()
+            smtp.shutdown()
+            http.shutdown()
+
+        self._report(results, smtp, http)
+
+    def _create_business(self):
+        business = Business.objects.create(
+            name='Notification Benchmark',
+            subdomain=f'bench-{uuid.uuid4().hex[:12]}',
+            email='owner@example.com',
+        )
+        owner = User.objects.create_user(
+            email=f'{business.subdomain}@example.com', password=None,
+            first_name='Benchmark', last_name='Owner', business=business,
+        )
+        return business, owner
+
+    def _reservations(self, business, count):
+        """The benchmark business's reservations, created (without notifications) if there are none"""
+        reservations = list(Reservation.objects.filter(business=business).order_by('start_time'))
+        if reservations:
+            return reservations
+        start = timezone.now() + timedelta(days=1)
+        return Reservation.objects.bulk_create([
+            Reservation(
+                business=business,
+                customer_name=f'Benchmark Customer {index}',
+                customer_phone=f'+38344{index:06d}',
+                start_time=start + timedelta(minutes=30 * index),
+                end_time=start + timedelta(minutes=30 * index + 30),
+                status='pending',
+            )
+            for index in range(count)
+        ], batch_size=500)
+
+    def _requests(self, channel, business, client, count):
+        """
+        The phase's API calls, one request (and commit) per reservation:
+        public creates for the owner email, update_status for the customer
+        message. Returns the per-request latencies in ms.
+        """
+        latencies = []
+        if channel == 'email':
+            start = timezone.now().replace(microsecond=0) + timedelta(days=2)
+            for index in range(count):
+                slot = start + timedelta(minutes=30 * index)
+                started = time.monotonic()
+                response = client.post('/api/reservations/', {
+                    'subdomain': business.subdomain,
+                    'customer_name': 'Benchmark Customer',
+                    'customer_phone': f'+38344{index:06d}',
+                    'start_time': slot.isoformat(),
+                    'end_time': (slot + timedelta(minutes=30)).isoformat(),
+                }, format='json')
+                latencies.append((time.monotonic() - started) * 1000)
+                if response.status_code != 201:
+                    raise CommandError(f'Create failed ({response.status_code}): {response.content[:300]}')
+            return latencies
+
+        # update_status sends on the configured customer channel
+        with mock.patch.object(notifications, 'CUSTOMER_CHANNEL', channel):
+            for reservation in self._reservations(business, count):
+                started = time.monotonic()
+                response = client.post(
+                    f'/api/reservations/{reservation.pk}/update_status/', {'status': 'confirmed'}, format='json'
+                )
+                latencies.append((time.monotonic() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f'update_status failed ({response.status_code}): {response.content[:300]}')
+        return latencies
+
+    def _deliver(self, stop, business_id, batch_size):
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                # Only the benchmark's own jobs: real queued notifications stay untouched
+                job_ids = notifications.claim_due_jobs(batch_size, business_id=business_id)
+                if job_ids:
+                    notifications.run_jobs(job_ids)
+            except Exception as e:
+                self.stderr.write(f'❌ Delivery batch failed: {e}')
+                job_ids = []
+            if not job_ids:
+                stop.wait(0.01)
+        mail_connection().close()
+        close_old_connections()
+
+    def _sweep(self, business_id, batch_size):
+        """
+        The in-process sweeper's step for the benchmark's own jobs (retries and
+        jobs the saturated executor left queued). The real sweeper is not
+        started: it would hand other businesses' jobs to the fake providers.
+        """
+        if notifications.notification_executor.free_slots() <= 0:
+            return
+        job_ids = notifications.claim_due_jobs(batch_size, business_id=business_id)
+        if job_ids and not notifications.notification_executor.submit(notifications._deliver_claimed, job_ids):
+            notifications.release_claims(job_ids)
+
+    def _run_phase(self, channel, business, client, options):
+        for name in provider_router.stats()['providers']:
+            provider_router.reset(name)
+        jobs = NotificationJob.objects.filter(business=business, channel=channel)
+
+        stop = threading.Event()
+        threads = []
+        if notifications.WORKER_ENABLED:
+            threads = [
+                threading.Thread(
+                    target=self._deliver,
+                    args=(stop, business.pk, options['batch_size']),
+                    name=f'bench-delivery-{index}',
+                )
+                for index in range(max(1, options['concurrency']))
+            ]
+        for thread in threads:
+            thread.start()
+
+        started = time.monotonic()
+        request_latencies = self._requests(channel, business, client, options['reservations'])
+        enqueue_seconds = time.monotonic() - started
+
+        peak_threads = threading.active_count()
+        retry_delay = timedelta(milliseconds=options['retry_delay_ms'])
+        deadline = started + options['timeout']
+        while time.monotonic() < deadline:
+            peak_threads = max(peak_threads, threading.active_count())
+            jobs.filter(status='retrying', updated_at__lte=timezone.now() - retry_delay).update(
+                run_after=timezone.now()
+            )
+            if not jobs.exclude(status__in=('sent', 'dead')).exists():
+                break
+            if not notifications.WORKER_ENABLED:
+                self._sweep(business.pk, options['batch_size'])
+            time.sleep(0.05)
+        elapsed = time.monotonic() - started
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        rows = list(jobs.values_list('status', 'attempts', 'created_at', 'sent_at'))
+        sent = [row for row in rows if row[0] == 'sent']
+        latencies = [(sent_at - created_at).total_seconds() * 1000 for _, _, created_at, sent_at in sent]
+        span = None
+        if sent:
+            span = (max(row[3] for row in sent) - min(row[2] for row in rows)).total_seconds()
+        return {
+            'channel': channel,
+            'jobs': len(rows),
+            'sent': len(sent),
+            'dead': sum(1 for row in rows if row[0] == 'dead'),
+            'unfinished': sum(1 for row in rows if row[0] not in ('sent', 'dead')),
+            'retries': sum(max(0, row[1] - 1) for row in rows),
+            'enqueue_seconds': enqueue_seconds,
+            'elapsed_seconds': elapsed,
+            'throughput': len(sent) / span if span else None,
+            'p50_ms': percentile(latencies, 0.50),
+            'p99_ms': percentile(latencies, 0.99),
+            'request_p50_ms': percentile(request_latencies, 0.50),
+            'delivery_threads': len(threads) or notifications.notification_executor.stats()['started_threads'],
+            'peak_threads': peak_threads,
+        }
+
+    def _report(self, results, smtp, http):
+        self.stdout.write('')
+        self.stdout.write(
+            f'{"phase":<10}{"sent":>7}{"dead":>6}{"retries":>9}{"msg/s":>9}'
+            f'{"p50 ms":>9}{"p99 ms":>9}{"req ms":>9}{"threads":>9}{"peak":>6}'
+        )
+        for result in results:
+            throughput = f'{result["throughput"]:.1f}' if result['throughput'] else '-'
+            p50 = f'{result["p50_ms"]:.0f}' if result['p50_ms'] is not None else '-'
+            p99 = f'{result["p99_ms"]:.0f}' if result['p99_ms'] is not None else '-'
+            request = f'{result["request_p50_ms"]:.0f}' if result['request_p50_ms'] is not None else '-'
+            self.stdout.write(
+                f'{result["channel"]:<10}{result["sent"]:>7}{result["dead"]:>6}{result["retries"]:>9}'
+                f'{throughput:>9}{p50:>9}{p99:>9}{request:>9}{result["delivery_threads"]:>9}{result["peak_threads"]:>6}'
+            )
+            if result['unfinished']:
+                self.stdout.write(self.style.WARNING(
+                    f'  ⚠️ {result["unfinished"]} {result["channel"]} job(s) unfinished after the timeout'
+                ))
+        self.stdout.write('')
+        self.stdout.write('Latency: enqueue (commit) to sent; req ms: p50 of the API call itself.')
+        self.stdout.write('threads: delivery (or executor) threads; peak: all threads')
+        self.stdout.write('of this process, fake provider connection threads included.')
+        self.stdout.write(f'SMTP sink: {smtp.stats()}')
+        self.stdout.write(f'HTTP fake: {http.stats()}')
+        routing = provider_router.stats()['providers']
+        if routing:
+            self.stdout.write('Circuits: ' + ', '.join(
+                f'{name} {state["state"]} (opened {state["times_opened"]}x)' for name, state in routing.items()
+            ))
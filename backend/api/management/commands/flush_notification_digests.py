@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.utils.notifications import flush_digests
+
+
+class Command(BaseCommand):
+    help = 'Fold buffered new-reservation emails into digest jobs (digest mode businesses)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Flush every business now, even if its digest window has not passed'
+        )
+
+    def handle(self, *args, **options):
+        digests = flush_digests(force=options['force'])
+        items = sum(digest.digest_items.count() for digest in digests)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Created {len(digests)} digest job(s) covering {items} new reservation(s)'
+        ))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Business
+from api.utils.reservation_import import (
+    DEFAULT_CHUNK_SIZE, ImportFormatError, import_reservations, parse_rows,
+)
+
+
+class Command(BaseCommand):
+    help = 'Import existing appointments for a business from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('subdomain', type=str, help='Subdomain of the business to import into')
+        parser.add_argument('path', type=str, help='CSV (with header line) or JSON file')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='File format (default: from the file extension)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Rows per INSERT'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and report without inserting anything'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            business = Business.objects.get(subdomain=options['subdomain'])
+        except Business.DoesNotExist:
+            raise CommandError(f"No business with subdomain '{options['subdomain']}'")
+
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'json')
+        try:
+            with open(path, encoding='utf-8-sig') as handle:
+                rows = parse_rows(handle.read(), fmt)
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f'📥 Importing {len(rows)} rows into {business.name} ({business.subdomain})...')
+        report = import_reservations(
+            business, rows, dry_run=options['dry_run'], chunk_size=options['chunk_size']
+        )
+
+        for entry in report['errors']:
+            details = '; '.join(f'{field}: {message}' for field, message in entry['errors'].items())
+            self.stdout.write(self.style.WARNING(f"   Row {entry['row']}: {details}"))
+
+        verb = 'Would create' if report['dry_run'] else 'Created'
+        created = report['total'] - report['failed'] if report['dry_run'] else report['created']
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {created} reservations, {report['failed']} rows rejected"
+        ))
@@ -0,0 +1,127 @@
+import pytz
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Business, Reservation
+from api.utils.overlap import overlapping_pairs, plan_overlap_resolution
+from api.utils.slots import invalidate_booked_slots
+from api.utils.sms_utils import send_reservation_cancelled_sms
+from api.utils.whatsapp_utils import send_whatsapp_message
+
+LOCAL_TZ = pytz.timezone('Europe/Berlin')
+
+# Columns that exist before migration 0011 too: this command runs on a
+# database whose migrate stopped there
+RESERVATION_FIELDS = (
+    'id', 'business', 'staff', 'customer_name', 'customer_phone', 'start_time', 'end_time',
+    'status', 'created_at', 'staff__name', 'business__name', 'business__email', 'business__subdomain',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Cancel double bookings so migration 0011 can add the no-overlap constraint. '
+        'Per overlapping pair the earlier-booked reservation keeps its slot; the '
+        'customers of canceled bookings get the cancellation message and each owner '
+        'an email listing them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list what would be canceled'
+        )
+        parser.add_argument(
+            '--business',
+            help='Subdomain of the only business to resolve'
+        )
+
+    def handle(self, *args, **options):
+        pairs = overlapping_pairs()
+        if options['business']:
+            try:
+                business = Business.objects.only('id').get(subdomain=options['business'])
+            except Business.DoesNotExist:
+                raise CommandError(f"No business with subdomain '{options['business']}'")
+            pairs = [pair for pair in pairs if pair[0] == business.pk]
+        if not pairs:
+            self.stdout.write(self.style.SUCCESS('✅ No overlapping active reservations'))
+            return
+
+        ids = {pk for _, first, second in pairs for pk in (first, second)}
+        rows = {
+            reservation.pk: reservation
+            for reservation in Reservation.objects.select_related('business', 'staff')
+            .only(*RESERVATION_FIELDS).filter(pk__in=ids)
+        }
+        plan = plan_overlap_resolution(pairs, {pk: row.created_at for pk, row in rows.items()})
+
+        by_business = {}
+        for pk, winner in sorted(plan.items()):
+            by_business.setdefault(rows[pk].business_id, []).append((rows[pk], rows[winner]))
+        for items in by_business.values():
+            business = items[0][0].business
+            self.stdout.write(f'{business.name} ({business.subdomain}):')
+            for reservation, winner in items:
+                self.stdout.write(f'  cancel {self._describe(reservation)}  (overlaps {winner.pk})')
+
+        if options['dry_run']:
+            self.stdout.write(f'Dry run: {len(plan)} reservation(s) would be canceled')
+            return
+
+        for items in by_business.values():
+            self._cancel(items[0][0].business, [reservation for reservation, _ in items])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Canceled {len(plan)} reservation(s); run migrate again to add the constraint'
+        ))
+
+    def _describe(self, reservation):
+        start = reservation.start_time.astimezone(LOCAL_TZ)
+        staff = f', {reservation.staff.name}' if reservation.staff else ''
+        return (
+            f'#{reservation.pk} {start:%d/%m/%Y %H:%M}{staff} '
+            f'{reservation.customer_name} {reservation.customer_phone}'
+        )
+
+    def _cancel(self, business, reservations):
+        with transaction.atomic():
+            # A booking changed since the report stays as it is
+            ids = list(
+                Reservation.objects.select_for_update()
+                .filter(pk__in=[reservation.pk for reservation in reservations], status__in=('pending', 'confirmed'))
+                .values_list('pk', flat=True)
+            )
+            Reservation.objects.filter(pk__in=ids).update(status='canceled', updated_at=timezone.now())
+            start_times = [reservation.start_time for reservation in reservations if reservation.pk in ids]
+            transaction.on_commit(lambda: invalidate_booked_slots(business.pk, *start_times))
+        canceled = [reservation for reservation in reservations if reservation.pk in ids]
+
+        # Sent right away: the notification queue's table may not exist yet at this migration
+        for reservation in canceled:
+            if getattr(settings, 'CUSTOMER_NOTIFICATION_CHANNEL', 'sms') == 'whatsapp':
+                sent = send_whatsapp_message(reservation.customer_phone, 'rejected', reservation, business)
+            else:
+                sent = send_reservation_cancelled_sms(reservation)
+            if not sent:
+                self.stderr.write(f'⚠️ Customer of #{reservation.pk} could not be notified ({reservation.customer_phone})')
+
+        if canceled and business.email:
+            lines = '\n'.join(self._describe(reservation) for reservation in canceled)
+            try:
+                send_mail(
+                    subject=f'{len(canceled)} double booking(s) canceled',
+                    message=(
+                        'These reservations overlapped an earlier booking for the same time '
+                        'and staff and were canceled. Their customers were sent the '
+                        f'cancellation message.\n\n{lines}\n'
+                    ),
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[business.email],
+                )
+            except Exception as e:
+                self.stderr.write(f'⚠️ Owner email to {business.email} failed: {e}')
+        self.stdout.write(f'{business.subdomain}: canceled {", ".join(str(reservation.pk) for reservation in canceled) or "nothing"}')
@@ -0,0 +1,63 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from api.utils.fake_providers import FakeProviderServer, FakeSMTPServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local SMTP sink and a fake Twilio/Ultramsg HTTP API (see api/utils/fake_providers.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--smtp-port', type=int, default=1025)
+        parser.add_argument('--http-port', type=int, default=8025)
+        parser.add_argument(
+            '--latency-ms',
+            type=float,
+            default=0,
+            help='Delay per message/request'
+        )
+        parser.add_argument(
+            '--jitter-ms',
+            type=float,
+            default=0,
+            help='Extra random delay per message/request, up to this much'
+        )
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=0.0,
+            help='Share of messages refused (SMTP 451 / HTTP 503), 0-1'
+        )
+        parser.add_argument(
+            '--handshake-ms',
+            type=float,
+            default=0,
+            help='Delay per new HTTP connection, in place of TLS setup'
+        )
+
+    def handle(self, *args, **options):
+        failure = dict(
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            failure_rate=options['failure_rate'],
+        )
+        smtp = FakeSMTPServer(options['smtp_port'], **failure).start()
+        http = FakeProviderServer(options['http_port'], handshake_ms=options['handshake_ms'], **failure).start()
+
+        self.stdout.write(self.style.SUCCESS('🧪 Fake providers running (Ctrl+C to stop)'))
+        self.stdout.write(f'  SMTP sink:            127.0.0.1:{smtp.port}')
+        self.stdout.write(f'  Twilio/Ultramsg API:  {http.url}')
+        self.stdout.write('\nPoint the app at them with:')
+        self.stdout.write(f'  EMAIL_HOST=127.0.0.1 EMAIL_PORT={smtp.port} EMAIL_USE_TLS=False')
+        self.stdout.write('  EMAIL_HOST_USER=noreply@example.com EMAIL_HOST_PASSWORD=')
+        self.stdout.write(f'  TWILIO_API_BASE_URL={http.url} ULTRAMSG_API_URL={http.url}')
+
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        smtp.shutdown()
+        http.shutdown()
+        self.stdout.write(f'SMTP: {smtp.stats()}')
+        self.stdout.write(f'HTTP: {http.stats()}')
@@ -0,0 +1,93 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.utils.notifications import DIGEST_FLUSH_INTERVAL, claim_due_jobs, flush_digests, run_jobs
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued email/SMS/WhatsApp notification jobs (see api/utils/notifications.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Number of delivery threads'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Jobs claimed per thread per poll'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when no job is due'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Deliver the jobs that are due now and exit (cron mode)'
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._stop)
+
+        concurrency = max(1, options['concurrency'])
+        self.stdout.write(f'📬 Notification worker started ({concurrency} threads)')
+        threads = [
+            threading.Thread(
+                target=self._loop,
+                args=(index, options['batch_size'], options['poll_interval'], options['once']),
+                name=f'notification-worker-{index}',
+            )
+            for index in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write(self.style.SUCCESS('✅ Notification worker stopped'))
+
+    def _stop(self, signum, frame):
+        # Finish the jobs in hand; claimed but unsent jobs are re-claimed after the lock timeout
+        self.stdout.write('Stopping after the current jobs...')
+        self.stopping.set()
+
+    def _loop(self, index, batch_size, poll_interval, once):
+        next_flush = 0.0
+        while not self.stopping.is_set():
+            close_old_connections()
+            if index == 0 and time.monotonic() >= next_flush:
+                # One thread folds buffered owner emails into digest jobs
+                next_flush = time.monotonic() + DIGEST_FLUSH_INTERVAL
+                try:
+                    flush_digests()
+                except Exception as e:
+                    self.stderr.write(f'❌ Flushing digests failed: {e}')
+            try:
+                job_ids = claim_due_jobs(batch_size)
+            except Exception as e:
+                self.stderr.write(f'❌ Claiming jobs failed: {e}')
+                job_ids = []
+
+            if job_ids:
+                # The batch is sent back to back over this thread's SMTP connection
+                try:
+                    run_jobs(job_ids)
+                except Exception as e:
+                    self.stderr.write(f'❌ Job batch crashed: {e}')
+
+            if not job_ids:
+                if once:
+                    break
+                self.stopping.wait(poll_interval)
+        close_old_connections()
@@ -0,0 +1,66 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.utils.reminders import HOURS_BEFORE, claim_reminder_batch
+
+
+class Command(BaseCommand):
+    help = 'Queue SMS reminders for upcoming confirmed reservations (see api/utils/reminders.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60.0,
+            help='Seconds between scans'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Reservations claimed per transaction'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Queue the reminders that are due now and exit (cron mode)'
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._stop)
+
+        batch_size = max(1, options['batch_size'])
+        self.stdout.write(f'⏰ Reminder scheduler started ({HOURS_BEFORE}h before start time)')
+        while not self.stopping.is_set():
+            queued = self._scan(batch_size)
+            if queued:
+                self.stdout.write(f'📨 Queued {queued} reminder(s)')
+            if options['once']:
+                break
+            self.stopping.wait(options['interval'])
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS('✅ Reminder scheduler stopped'))
+
+    def _stop(self, signum, frame):
+        self.stdout.write('Stopping after the current batch...')
+        self.stopping.set()
+
+    def _scan(self, batch_size):
+        """Claim batches until the window is empty; returns the number of reminders queued"""
+        queued = 0
+        close_old_connections()
+        while not self.stopping.is_set():
+            try:
+                claimed = claim_reminder_batch(batch_size)
+            except Exception as e:
+                self.stderr.write(f'❌ Claiming reminders failed: {e}')
+                break
+            queued += claimed
+            if claimed < batch_size:
+                break
+        return queued
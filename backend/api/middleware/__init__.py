@@ -1,40 +1,69 @@
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import Http404
-from django.utils.deprecation import MiddlewareMixin
-from api.models import Business
-import threading
+from api.utils.tenant_cache import tenant_registry
 
 # Import security middleware to make it available
 from .security import SecurityHeadersMiddleware
 
-# Thread-local storage for current tenant
-_thread_locals = threading.local()
+# Current tenant of the running request. A ContextVar is scoped to the thread
+# under WSGI and to the task under ASGI, so concurrent requests never see each
+# other's tenant (sync views run via sync_to_async inherit the caller's context).
+_current_tenant = ContextVar('current_tenant', default=None)
 
-class TenantMiddleware(MiddlewareMixin):
+class TenantMiddleware:
     """
-    Middleware to detect subdomain and set current tenant context
+    Middleware to detect subdomain and set current tenant context.
+    Works under both WSGI and ASGI; the tenant context is always reset when
+    the request finishes, even if the view raised.
     """
-    
-    def process_request(self, request):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = _current_tenant.set(self.resolve_tenant(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _current_tenant.reset(token)
+
+    async def __acall__(self, request):
+        # A registry miss queries the database, which must not run on the event loop
+        tenant = await sync_to_async(self.resolve_tenant)(request)
+        token = _current_tenant.set(tenant)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_tenant.reset(token)
+
+    def resolve_tenant(self, request):
+        """Set request.tenant from the Host header; unknown subdomains are a 404"""
         # Get the host from the request
         host = request.get_host().lower()
-        
+
         # Extract subdomain
         subdomain = self.get_subdomain(host)
-        
+
         if subdomain:
-            try:
-                # Find business by subdomain - use select_related to avoid N+1 queries
-                business = Business.objects.get(subdomain=subdomain, is_active=True)
-                request.tenant = business
-                set_current_tenant(business)
-            except Business.DoesNotExist:
+            # Served from the per-worker registry; only a miss touches the database
+            business = tenant_registry.get(subdomain)
+            if business is None:
                 # Subdomain doesn't exist or business is inactive
                 raise Http404("Business not found")
+            request.tenant = business
         else:
             # Main domain - no tenant context, set immediately without DB query
             request.tenant = None
-            set_current_tenant(None)
-    
+        return request.tenant
+
     def get_subdomain(self, host):
         """
         Extract subdomain from host
@@ -53,18 +82,25 @@ class TenantMiddleware(MiddlewareMixin):
 
         # Split by dots
         parts = host.split('.')
-        
+
         # If we have at least 3 parts (subdomain.domain.tld), return first part
         if len(parts) >= 3:
             return parts[0]
-        
+
         # For localhost or single domain, no subdomain
         return None
 
 def get_current_tenant():
-    """Get the current tenant from thread-local storage"""
-    return getattr(_thread_locals, 'tenant', None)
+    """Get the current tenant from the request context"""
+    return _current_tenant.get()
 
 def set_current_tenant(tenant):
-    """Set the current tenant in thread-local storage"""
-    _thread_locals.tenant = tenant
+    """
+    Set the current tenant in the request context.
+    Returns a token; pass it to reset_current_tenant() to restore the previous value.
+    """
+    return _current_tenant.set(tenant)
+
+def reset_current_tenant(token):
+    """Restore the tenant that was current before set_current_tenant()"""
+    _current_tenant.reset(token)
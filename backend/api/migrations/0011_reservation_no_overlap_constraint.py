@@ -0,0 +1,86 @@
+from django.core.management.base import CommandError
+from django.db import migrations
+
+# Pairs of active reservations the constraint below would reject (same staff
+# rule as api/utils/overlap.py, which runs the same query for the
+# resolve_overlapping_reservations command)
+OVERLAPPING_PAIRS = """
+SELECT a.business_id, a.id, b.id
+FROM api_reservation a
+JOIN api_reservation b
+    ON b.business_id = a.business_id
+    AND b.id > a.id
+    AND b.start_time < a.end_time
+    AND a.start_time < b.end_time
+    AND (a.staff_id IS NULL OR b.staff_id IS NULL OR a.staff_id = b.staff_id)
+WHERE a.status IN ('pending', 'confirmed') AND b.status IN ('pending', 'confirmed')
+ORDER BY a.business_id, a.id, b.id
+"""
+
+REPORT_LIMIT = 50
+
+# See api/utils/overlap.py for how the staff rule maps onto int8range
+CREATE_EXTENSION = 'CREATE EXTENSION IF NOT EXISTS btree_gist'
+
+CREATE_CONSTRAINT = """
+ALTER TABLE api_reservation
+    ADD CONSTRAINT api_reservation_no_overlap
+    EXCLUDE USING gist (
+        business_id WITH =,
+        int8range(staff_id, staff_id, '[]') WITH &&,
+        tstzrange(start_time, end_time, '[)') WITH &&
+    )
+    WHERE (status IN ('pending', 'confirmed'))
+"""
+
+DROP_CONSTRAINT = 'ALTER TABLE api_reservation DROP CONSTRAINT IF EXISTS api_reservation_no_overlap'
+
+
+def check_no_overlapping_reservations(apps, schema_editor):
+    """
+    Existing double bookings would make the ALTER TABLE below fail. Which
+    booking gives way is a business decision, not a migration's: stop with
+    the conflicting ids and leave them to resolve_overlapping_reservations.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPPING_PAIRS)
+        pairs = cursor.fetchall()
+    if not pairs:
+        return
+    listed = '\n'.join(
+        f'  business {business_id}: reservations {first} and {second}'
+        for business_id, first, second in pairs[:REPORT_LIMIT]
+    )
+    more = f'\n  ... and {len(pairs) - REPORT_LIMIT} more' if len(pairs) > REPORT_LIMIT else ''
+    raise CommandError(
+        f'{len(pairs)} pair(s) of active reservations overlap, so api_reservation_no_overlap '
+        f'cannot be added:\n{listed}{more}\n'
+        'Review them with `manage.py resolve_overlapping_reservations --dry-run`, resolve them '
+        '(that command cancels the later booking of each pair and notifies the customers and '
+        'owners), then run migrate again.'
+    )
+
+
+def add_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_EXTENSION)
+        schema_editor.execute(CREATE_CONSTRAINT)
+
+
+def remove_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_reservation_active_start_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_overlapping_reservations, migrations.RunPython.noop),
+        migrations.RunPython(add_constraint, remove_constraint),
+    ]
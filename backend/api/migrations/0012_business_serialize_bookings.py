@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_reservation_no_overlap_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='serialize_bookings',
+            field=models.BooleanField(default=False, help_text='Serialize concurrent bookings per staff and day with advisory locks (high-contention tenants)'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_business_serialize_bookings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('channel', models.CharField(choices=[('sms', 'SMS')], default='sms', max_length=20)),
+                ('kind', models.CharField(choices=[('reservation_confirmed', 'Reservation confirmed'), ('reservation_cancelled', 'Reservation cancelled')], max_length=40)),
+                ('recipient', models.CharField(help_text='Phone number or address the message goes to', max_length=254)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_jobs', to='api.business')),
+                ('reservation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notification_jobs', to='api.reservation')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
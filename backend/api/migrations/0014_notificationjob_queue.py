@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:42
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def migrate_statuses(apps, schema_editor):
+    NotificationJob = apps.get_model('api', 'NotificationJob')
+    # 'failed' is gone: those jobs were given up on, which is now 'dead'
+    NotificationJob.objects.filter(status='failed').update(status='dead')
+    # Sends interrupted by the deploy had no lock time; give them one so the
+    # lock timeout hands them to a worker again instead of never
+    NotificationJob.objects.filter(status='sending', locked_at__isnull=True).update(
+        locked_at=django.utils.timezone.now()
+    )
+
+
+def unmigrate_statuses(apps, schema_editor):
+    NotificationJob = apps.get_model('api', 'NotificationJob')
+    NotificationJob.objects.filter(status='dead').update(status='failed')
+    NotificationJob.objects.filter(status='retrying').update(status='queued')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_notificationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationjob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificationjob',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker claimed the job', null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationjob',
+            name='max_attempts',
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.AddField(
+            model_name='notificationjob',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Not picked up before this time (backoff)'),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='channel',
+            field=models.CharField(choices=[('email', 'Email'), ('sms', 'SMS'), ('whatsapp', 'WhatsApp')], default='sms', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='error',
+            field=models.TextField(blank=True, help_text='Error of the last failed attempt'),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='kind',
+            field=models.CharField(choices=[('new_reservation_owner', 'New reservation (owner)'), ('reservation_confirmed', 'Reservation confirmed'), ('reservation_cancelled', 'Reservation cancelled')], max_length=40),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('retrying', 'Retrying'), ('sent', 'Sent'), ('dead', 'Dead')], default='queued', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='notificationjob',
+            index=models.Index(fields=['status', 'run_after'], name='api_notif_due_idx'),
+        ),
+        migrations.RunPython(migrate_statuses, unmigrate_statuses),
+    ]
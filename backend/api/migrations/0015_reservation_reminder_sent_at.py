@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_notificationjob_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='kind',
+            field=models.CharField(choices=[('new_reservation_owner', 'New reservation (owner)'), ('reservation_confirmed', 'Reservation confirmed'), ('reservation_cancelled', 'Reservation cancelled'), ('reservation_reminder', 'Reservation reminder')], max_length=40),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('reminder_sent_at__isnull', True), ('status', 'confirmed')), fields=['start_time'], name='api_reserva_reminder_due_idx'),
+        ),
+    ]
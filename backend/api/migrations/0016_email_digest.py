@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:52
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_reservation_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='email_digest_enabled',
+            field=models.BooleanField(default=False, help_text='Send one summary email per digest window instead of one email per new reservation'),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='email_digest_minutes',
+            field=models.PositiveIntegerField(default=60, help_text='Digest window in minutes (5-1440)', validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(1440)]),
+        ),
+        migrations.AddField(
+            model_name='notificationjob',
+            name='digest',
+            field=models.ForeignKey(blank=True, help_text='Digest email this buffered notification was folded into', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='digest_items', to='api.notificationjob'),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='kind',
+            field=models.CharField(choices=[('new_reservation_owner', 'New reservation (owner)'), ('reservation_confirmed', 'Reservation confirmed'), ('reservation_cancelled', 'Reservation cancelled'), ('reservation_reminder', 'Reservation reminder'), ('new_reservations_digest', 'New reservations digest (owner)')], max_length=40),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('buffered', 'Buffered for digest'), ('sending', 'Sending'), ('retrying', 'Retrying'), ('sent', 'Sent'), ('dead', 'Dead')], default='queued', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='notificationjob',
+            index=models.Index(condition=models.Q(('digest__isnull', True), ('status', 'buffered')), fields=['business', 'created_at'], name='api_notif_buffered_idx'),
+        ),
+    ]
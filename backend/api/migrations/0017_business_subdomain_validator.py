@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:06
+
+import api.utils.input_sanitizer
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_email_digest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='business',
+            name='subdomain',
+            field=models.CharField(help_text="Subdomain for business (e.g., 'salon' for salon.yourdomain.com)", max_length=50, unique=True, validators=[api.utils.input_sanitizer.InputSanitizer.validate_subdomain]),
+        ),
+    ]
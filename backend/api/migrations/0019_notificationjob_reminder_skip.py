@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_reservation_rejected_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationjob',
+            name='reservation_start_time',
+            field=models.DateTimeField(blank=True, help_text='Start time the message announces (a reminder is skipped if it changed)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('buffered', 'Buffered for digest'), ('sending', 'Sending'), ('retrying', 'Retrying'), ('sent', 'Sent'), ('dead', 'Dead'), ('skipped', 'Skipped')], default='queued', max_length=20),
+        ),
+    ]
@@ -2,5 +2,6 @@ from .user import User
 from .business import Business
 from .staff import Staff
 from .reservation import Reservation
+from .notification import NotificationJob
 
-__all__ = ['User', 'Business', 'Staff', 'Reservation']
+__all__ = ['User', 'Business', 'Staff', 'Reservation', 'NotificationJob']
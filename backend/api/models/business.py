@@ -1,7 +1,9 @@
 from django.db import models
-from django.core.validators import RegexValidator
+from django.core.validators import MaxValueValidator, MinValueValidator
 import uuid
 
+from api.utils.input_sanitizer import InputSanitizer
+
 BUSINESS_TYPE_CHOICES = [
     ('barbershop', 'Barbershop'),
     ('salon', 'Salon'),
@@ -26,12 +28,8 @@ class Business(models.Model):
     subdomain = models.CharField(
         max_length=50, 
         unique=True,
-        validators=[
-            RegexValidator(
-                regex=r'^[a-z0-9-]+$',
-                message='Subdomain can only contain lowercase letters, numbers, and hyphens'
-            )
-        ],
+        # Same rules as tenant lookup, which ignores hosts that break them
+        validators=[InputSanitizer.validate_subdomain],
         help_text="Subdomain for business (e.g., 'salon' for salon.yourdomain.com)"
     )
     
@@ -43,10 +41,23 @@ class Business(models.Model):
     business_hours_start = models.TimeField(default='09:00', help_text="Business opening time")
     business_hours_end = models.TimeField(default='18:00', help_text="Business closing time")
     timezone = models.CharField(max_length=50, default='Europe/Berlin')
+    serialize_bookings = models.BooleanField(
+        default=False,
+        help_text="Serialize concurrent bookings per staff and day with advisory locks (high-contention tenants)"
+    )
     
     # Email Configuration
     email_from_name = models.CharField(max_length=100, blank=True, help_text="Name shown in emails")
     email_from_address = models.EmailField(blank=True, help_text="Custom from email (optional)")
+    email_digest_enabled = models.BooleanField(
+        default=False,
+        help_text="Send one summary email per digest window instead of one email per new reservation"
+    )
+    email_digest_minutes = models.PositiveIntegerField(
+        default=60,
+        validators=[MinValueValidator(5), MaxValueValidator(1440)],
+        help_text="Digest window in minutes (5-1440)"
+    )
     
     # Branding
     primary_color = models.CharField(max_length=7, default='#3B82F6', help_text="Primary brand color (hex)")
@@ -0,0 +1,105 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class NotificationJob(models.Model):
+    """
+    One outgoing notification (email, SMS or WhatsApp) in the durable job queue.
+
+    Created in the same transaction as the change that triggers it, so a job
+    exists exactly when the change committed. The run_notification_worker
+    command claims due jobs with SELECT ... FOR UPDATE SKIP LOCKED, retries
+    failures with exponential backoff (run_after) and dead-letters a job after
+    max_attempts. The row doubles as the delivery ticket clients poll at
+    GET /api/notifications/<id>/.
+
+    Owner emails of businesses in digest mode are created 'buffered' and
+    later folded into one 'new_reservations_digest' job (digest); they take
+    that job's final status when it is sent or dead-lettered.
+
+    A reminder whose reservation is no longer confirmed, or was moved since
+    the reminder was queued, ends 'skipped' without being sent.
+    """
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+        ('whatsapp', 'WhatsApp'),
+    ]
+
+    KIND_CHOICES = [
+        ('new_reservation_owner', 'New reservation (owner)'),
+        ('reservation_confirmed', 'Reservation confirmed'),
+        ('reservation_cancelled', 'Reservation cancelled'),
+        ('reservation_reminder', 'Reservation reminder'),
+        ('new_reservations_digest', 'New reservations digest (owner)'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('buffered', 'Buffered for digest'),
+        ('sending', 'Sending'),
+        ('retrying', 'Retrying'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+        ('skipped', 'Skipped'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    business = models.ForeignKey(
+        'Business',
+        on_delete=models.CASCADE,
+        related_name='notification_jobs'
+    )
+    reservation = models.ForeignKey(
+        'Reservation',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notification_jobs'
+    )
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES, default='sms')
+    kind = models.CharField(max_length=40, choices=KIND_CHOICES)
+    recipient = models.CharField(max_length=254, help_text="Phone number or address the message goes to")
+    reservation_start_time = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Start time the message announces (a reminder is skipped if it changed)"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    digest = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='digest_items',
+        help_text="Digest email this buffered notification was folded into"
+    )
+    error = models.TextField(blank=True, help_text="Error of the last failed attempt")
+
+    # Queue bookkeeping
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not picked up before this time (backoff)")
+    locked_at = models.DateTimeField(null=True, blank=True, help_text="When a worker claimed the job")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Due-job scan of the worker
+            models.Index(fields=['status', 'run_after'], name='api_notif_due_idx'),
+            # Digest flush: buffered owner emails not yet folded into a digest
+            models.Index(
+                fields=['business', 'created_at'],
+                condition=models.Q(status='buffered', digest__isnull=True),
+                name='api_notif_buffered_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} → {self.recipient} ({self.status})"
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 
 User = settings.AUTH_USER_MODEL
@@ -7,6 +8,7 @@ class Reservation(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
         ("confirmed", "Confirmed"),
+        ("rejected", "Rejected"),
         ("canceled", "Canceled"),
         ("completed", "Completed"),
     ]
@@ -40,6 +42,9 @@ class Reservation(models.Model):
         help_text="Staff member assigned to this reservation"
     )
 
+    # Set when the reminder SMS is queued (run_reminder_scheduler); cleared on reschedule
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+
     # System fields
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -64,6 +69,21 @@ class Reservation(models.Model):
             models.Index(fields=['business', 'status']),
             models.Index(fields=['business', 'start_time']),
             models.Index(fields=['customer_phone']),
+            # Keyset pagination (see api/pagination.py): per business and across all businesses
+            models.Index(fields=['business', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id']),
+            # Calendar/slot queries only ever look at bookings that still hold a slot
+            models.Index(
+                fields=['business', 'start_time'],
+                condition=Q(status__in=['pending', 'confirmed']),
+                name='api_reserva_active_start_idx',
+            ),
+            # Reminder scan: only confirmed bookings still waiting for their reminder
+            models.Index(
+                fields=['start_time'],
+                condition=Q(status='confirmed', reminder_sent_at__isnull=True),
+                name='api_reserva_reminder_due_idx',
+            ),
         ]
 
     def __str__(self):
@@ -2,10 +2,12 @@ from .user import UserSerializer, RegisterSerializer
 from .reservation import ReservationSerializer, PublicReservationSerializer, ReservationListSerializer
 from .business import BusinessSerializer, BusinessCreateSerializer, BusinessListSerializer
 from .staff import StaffSerializer
+from .notification import NotificationJobSerializer
 
 __all__ = [
     'UserSerializer', 'RegisterSerializer',
     'ReservationSerializer', 'PublicReservationSerializer', 'ReservationListSerializer',
     'BusinessSerializer', 'BusinessCreateSerializer', 'BusinessListSerializer',
     'StaffSerializer',
+    'NotificationJobSerializer',
 ]
\ No newline at end of file
@@ -15,7 +15,9 @@ class BusinessSerializer(serializers.ModelSerializer):
             'id', 'name', 'subdomain', 'email', 'phone',
             'business_type',
             'business_hours_start', 'business_hours_end', 'timezone',
+            'serialize_bookings',
             'email_from_name', 'email_from_address',
+            'email_digest_enabled', 'email_digest_minutes',
             'primary_color', 'logo', 'logo_url',
             'is_active', 'subscription_status', 'subscription_expires',
             'created_at', 'updated_at',
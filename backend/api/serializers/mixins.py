@@ -0,0 +1,155 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _relation_path(model, parts):
+    """Longest prefix of parts that walks single-valued relations of model, joined with '__'."""
+    path = []
+    for part in parts:
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if not (field.many_to_one or field.one_to_one):
+            break
+        path.append(part)
+        model = field.related_model
+    return '__'.join(path), model
+
+
+def _property_lookups(serializer):
+    """
+    Meta.property_lookups: {source attribute: ORM lookups it reads}, for
+    sources (model properties) the field introspection cannot see through.
+    A lookup ending in a relation needs the whole related row.
+    """
+    meta = getattr(serializer, 'Meta', None)
+    return getattr(meta, 'property_lookups', {})
+
+
+def _select_related_paths(serializer, model, prefix=''):
+    paths = set()
+    declared = _property_lookups(serializer)
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        if field.source in declared:
+            for lookup in declared[field.source]:
+                path, _ = _relation_path(model, lookup.split('__'))
+                if path:
+                    paths.add(prefix + path)
+            continue
+        parts = field.source.split('.')
+        nested = isinstance(field, serializers.BaseSerializer)
+        # A dotted source reads an attribute of the related object; a nested
+        # serializer reads the related object itself and maybe its relations
+        walk = parts if nested else parts[:-1]
+        path, related_model = _relation_path(model, walk)
+        if not path:
+            continue
+        paths.add(prefix + path)
+        if nested and path == '__'.join(walk):
+            paths |= _select_related_paths(field, related_model, prefix + path + '__')
+    return paths
+
+
+def _only_columns(serializer, model):
+    """
+    Columns the readable fields map to, for QuerySet.only(); None when a field
+    reads something opaque (a property, a method) and every column is needed.
+    """
+    columns = set()
+    declared = _property_lookups(serializer)
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            return None
+        if field.source in declared:
+            for lookup in declared[field.source]:
+                parts = lookup.split('__')
+                path, related_model = _relation_path(model, parts)
+                rest = parts[len(path.split('__')):] if path else parts
+                if rest:
+                    try:
+                        target = related_model._meta.get_field(rest[0])
+                    except FieldDoesNotExist:
+                        return None
+                    if len(rest) > 1 or not target.concrete:
+                        return None
+                    if path:
+                        # The join column must stay loaded for select_related()
+                        columns.add(path)
+                columns.add(lookup)
+            continue
+        parts = field.source.split('.')
+        nested = isinstance(field, serializers.BaseSerializer)
+        walk = parts if nested else parts[:-1]
+        path, related_model = _relation_path(model, walk)
+        if path != '__'.join(walk):
+            return None
+        if nested:
+            # Related rows are loaded whole; only the join column is named here
+            columns.add(path)
+            continue
+        try:
+            target = related_model._meta.get_field(parts[-1])
+        except FieldDoesNotExist:
+            return None
+        if not target.concrete:
+            return None
+        columns.add(f'{path}__{target.name}' if path else target.name)
+    return columns
+
+
+class EagerLoadingMixin:
+    """
+    Derive select_related() and only() from the fields a ModelSerializer
+    actually reads, so list endpoints cost one query whatever the number of
+    rows and fetch no column nobody serializes. Fields backed by a model
+    property declare what it reads in Meta.property_lookups.
+    """
+    _eager_loading_cache = None
+
+    @classmethod
+    def get_eager_loading(cls, fields=None):
+        """(select_related paths, only() columns or None) for the given field subset"""
+        if fields is None and cls.__dict__.get('_eager_loading_cache') is not None:
+            return cls._eager_loading_cache
+
+        serializer = cls() if fields is None else cls(fields=fields)
+        model = cls.Meta.model
+        related = tuple(sorted(_select_related_paths(serializer, model)))
+        columns = _only_columns(serializer, model)
+        if columns is not None:
+            # Ordering columns stay loaded: pagination reads them from the last row
+            ordering = [name.lstrip('-') for name in model._meta.ordering]
+            columns = tuple(sorted({model._meta.pk.name, *ordering, *columns}))
+
+        if fields is None:
+            cls._eager_loading_cache = (related, columns)
+        return related, columns
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        related, columns = cls.get_eager_loading(fields)
+        if related:
+            # select_related() without arguments would follow every relation
+            queryset = queryset.select_related(*related)
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        return queryset
+
+
+class SparseFieldsetMixin:
+    """
+    Accept a `fields` keyword argument that restricts the representation to
+    the named fields (see ReservationViewSet's ?fields= parameter).
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from api.models import NotificationJob
+
+
+class NotificationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationJob
+        fields = [
+            'id', 'reservation', 'channel', 'kind', 'recipient',
+            'status', 'digest', 'error', 'created_at', 'updated_at', 'sent_at',
+        ]
+        read_only_fields = fields
@@ -1,9 +1,12 @@
 from rest_framework import serializers
 from api.models import Reservation
 from api.serializers.user import UserSerializer
+from api.serializers.mixins import EagerLoadingMixin, SparseFieldsetMixin
 from api.utils.input_sanitizer import InputSanitizer
-from api.middleware import get_current_tenant
-from api.utils.tenant_request import get_tenant_from_request
+from api.utils.overlap import (
+    OVERLAP_MESSAGE, database_enforces_overlaps, overlap_guard, overlapping_reservations,
+)
+from api.utils.tenant_request import resolve_request_tenant
 
 
 def _normalize_staff_id(staff):
@@ -12,29 +15,11 @@ def _normalize_staff_id(staff):
     return staff.pk if hasattr(staff, 'pk') else staff
 
 
-def _staff_blocks_slot(existing_staff_id, new_staff_id):
-    """Unassigned staff overlaps everyone; two assigned must match to conflict."""
-    if existing_staff_id is None or new_staff_id is None:
-        return True
-    return existing_staff_id == new_staff_id
-
-
 def _assert_no_overlapping_reservation(business, start_time, end_time, new_staff_id, exclude_pk=None):
-    qs = Reservation.objects.filter(
-        business=business,
-        status__in=['pending', 'confirmed'],
-        start_time__lt=end_time,
-        end_time__gt=start_time,
-    )
-    if exclude_pk is not None:
-        qs = qs.exclude(pk=exclude_pk)
-    for other in qs:
-        if _staff_blocks_slot(other.staff_id, new_staff_id):
-            raise serializers.ValidationError({
-                'start_time': 'This time overlaps an existing booking. Choose another time.',
-            })
+    if overlapping_reservations(business, start_time, end_time, new_staff_id, exclude_pk).exists():
+        raise serializers.ValidationError({'start_time': OVERLAP_MESSAGE})
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     customer_details = UserSerializer(source='customer', read_only=True)
     business_name = serializers.CharField(source='business.name', read_only=True)
     business_subdomain = serializers.CharField(source='business.subdomain', read_only=True)
@@ -55,6 +40,11 @@ class ReservationSerializer(serializers.ModelSerializer):
             'customer', 'customer_details'
         ]
         read_only_fields = ['created_at', 'updated_at', 'business']
+        # Model properties behind the *_display fields (see EagerLoadingMixin)
+        property_lookups = {
+            'customer_display_name': ['customer_name', 'customer'],
+            'customer_display_email': ['customer_email', 'customer'],
+        }
     
     def validate_customer_name(self, value):
         """Validate and sanitize customer name"""
@@ -87,9 +77,11 @@ class ReservationSerializer(serializers.ModelSerializer):
                     "End time must be after start time"
                 )
 
+        # On PostgreSQL the exclusion constraint rejects overlaps atomically
+        # at write time (see api/utils/overlap.py); elsewhere check up front
         request = self.context.get('request')
-        if request and start_time and end_time:
-            tenant = get_current_tenant() or get_tenant_from_request(request)
+        if request and start_time and end_time and not database_enforces_overlaps():
+            tenant = resolve_request_tenant(request)
             if not tenant and request.user.is_authenticated:
                 tenant = getattr(request.user, 'business', None)
             if tenant:
@@ -104,6 +96,17 @@ class ReservationSerializer(serializers.ModelSerializer):
 
         return data
 
+    def create(self, validated_data):
+        with overlap_guard():
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        if 'start_time' in validated_data and validated_data['start_time'] != instance.start_time:
+            # Rescheduled: remind again before the new time
+            validated_data['reminder_sent_at'] = None
+        with overlap_guard():
+            return super().update(instance, validated_data)
+
 class PublicReservationSerializer(serializers.ModelSerializer):
     """
     Serializer for public reservation creation (subdomain context)
@@ -131,18 +134,30 @@ class PublicReservationSerializer(serializers.ModelSerializer):
             return InputSanitizer.sanitize_text(value, max_length=1000)
         return value
 
-class ReservationListSerializer(serializers.ModelSerializer):
+class ReservationListSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
-    Simplified serializer for listing reservations
+    Compact default representation for the reservation list: the fields the
+    dashboards render, without the nested legacy customer/business payload.
+    Every field maps to a column or declares what it reads, so the list
+    query selects nothing else.
     """
-    customer_name_display = serializers.CharField(source='customer_display_name', read_only=True)
-    customer_email_display = serializers.CharField(source='customer_display_email', read_only=True)
     business_name = serializers.CharField(source='business.name', read_only=True)
-    
+    business_subdomain = serializers.CharField(source='business.subdomain', read_only=True)
+    # Dashboards fall back to it for reservations linked through the customer account
+    customer_name_display = serializers.CharField(source='customer_display_name', read_only=True)
+    staff_name = serializers.CharField(source='staff.name', read_only=True, default=None)
+
     class Meta:
         model = Reservation
         fields = [
-            'id', 'customer_name_display', 'customer_email_display',
-            'start_time', 'end_time', 'status', 'business_name',
-            'created_at'
-        ]
\ No newline at end of file
+            'id', 'business', 'business_name', 'business_subdomain',
+            'customer', 'customer_name', 'customer_email', 'customer_phone',
+            'customer_name_display',
+            'start_time', 'end_time', 'status', 'notes',
+            'staff', 'staff_name',
+            'created_at',
+        ]
+        read_only_fields = fields
+        property_lookups = {
+            'customer_display_name': ['customer_name', 'customer__first_name', 'customer__last_name'],
+        }
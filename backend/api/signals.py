@@ -1,20 +1,59 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
 from .models import Business, Reservation
+from .utils.slots import invalidate_booked_slots
+from .utils.tenant_cache import tenant_registry
 import logging
 
 logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Business)
 def business_saved(sender, instance, created, **kwargs):
-    """Log business creation/update"""
+    """Log business creation/update and drop its cached tenant snapshot"""
+    tenant_registry.invalidate_business(instance)
+    # Again after commit: a lookup that read the old row in between must not keep it
+    transaction.on_commit(lambda: tenant_registry.invalidate_business(instance))
     if created:
         logger.info(f'New business created: {instance.name}')
     else:
         logger.info(f'Business updated: {instance.name}')
 
+@receiver(post_delete, sender=Business)
+def business_deleted(sender, instance, **kwargs):
+    """Drop the cached tenant snapshot of a deleted business"""
+    tenant_registry.invalidate_business(instance)
+    transaction.on_commit(lambda: tenant_registry.invalidate_business(instance))
+    logger.info(f'Business deleted: {instance.name}')
+
+def _slot_fields(instance):
+    # Read from __dict__: a deferred field must not cost a query here
+    return tuple(instance.__dict__.get(name) for name in ('start_time', 'end_time', 'status'))
+
+@receiver(post_init, sender=Reservation)
+def remember_reservation_slot(sender, instance, **kwargs):
+    """Snapshot the slot fields so a save can tell which cached days changed"""
+    instance._slot_snapshot = _slot_fields(instance)
+
 @receiver(post_save, sender=Reservation)
 def reservation_saved(sender, instance, created, **kwargs):
-    """Log reservation creation"""
+    """Log reservation creation and invalidate cached booked slots it affects"""
+    snapshot = getattr(instance, '_slot_snapshot', (None, None, None))
+    current = _slot_fields(instance)
+    if created or current != snapshot:
+        # After commit, so a concurrent reader cannot re-cache the pre-commit state
+        transaction.on_commit(
+            lambda business_id=instance.business_id, old=snapshot[0], new=current[0]:
+                invalidate_booked_slots(business_id, old, new)
+        )
+    instance._slot_snapshot = current
     if created:
-        logger.info(f'New reservation created for {instance.business.name}')
+        logger.info(f'New reservation {instance.pk} created for business {instance.business_id}')
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    """Free the slot of a deleted reservation in the booked-slot cache"""
+    transaction.on_commit(
+        lambda business_id=instance.business_id, start=instance.__dict__.get('start_time'):
+            invalidate_booked_slots(business_id, start)
+    )
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from api.views import MeView, ReservationViewSet, UserViewSet, BusinessViewSet, dashboard_stats, StaffViewSet
+from api.views import MeView, ReservationViewSet, UserViewSet, BusinessViewSet, dashboard_stats, system_metrics, notification_status, provider_status, StaffViewSet
 
 router = DefaultRouter()
 router.register(r"reservations", ReservationViewSet, basename="reservation")
@@ -11,5 +11,8 @@ router.register(r"staff", StaffViewSet, basename="staff")
 urlpatterns = [
     path("auth/me/", MeView.as_view(), name="me"),
     path("dashboard/stats/", dashboard_stats, name="dashboard_stats"),
+    path("metrics/", system_metrics, name="system_metrics"),
+    path("notifications/<uuid:job_id>/", notification_status, name="notification_status"),
+    path("providers/", provider_status, name="provider_status"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Server-side availability: free time per staff member over a date range.
+
+Free time is business hours minus everything that blocks the staff member:
+their rest days, reservations assigned to them, and unassigned reservations
+(which block everyone, the same rule as the overlap check in
+api/serializers/reservation.py). Only pending and confirmed bookings block.
+
+Everything is computed from two queries (active staff, reservations in the
+range); the rest is interval arithmetic on sorted lists of epoch seconds,
+which avoids pytz offset lookups on every comparison.
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from api.models import Reservation, Staff
+from api.utils.slots import ACTIVE_STATUSES, LOCAL_TZ, local_day_start
+
+
+def merge_intervals(intervals):
+    """Sort and merge overlapping or touching (start, end) intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(window_start, window_end, busy, ends):
+    """
+    Free parts of [window_start, window_end) given merged busy intervals
+    and the list of their end times (for bisecting to the first relevant one).
+    """
+    free = []
+    cursor = window_start
+    for start, end in busy[bisect_right(ends, window_start):]:
+        if start >= window_end:
+            break
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
+
+
+def split_into_slots(free, duration):
+    """Start times of back-to-back bookings of `duration` seconds that fit in the free intervals"""
+    starts = []
+    for start, end in free:
+        starts.extend(range(start, end - duration + 1, duration))
+    return starts
+
+
+def _epoch(moment):
+    return int(moment.timestamp())
+
+
+def _local_at(day, clock):
+    return _epoch(LOCAL_TZ.localize(datetime.combine(day, clock)))
+
+
+def compute_availability(business, first_day, last_day, staff_id=None, duration=None):
+    """
+    Free intervals (and, with a duration, bookable start times) per active
+    staff member for each local day in [first_day, last_day].
+    A business without staff gets a single entry with id None.
+    """
+    staff_members = Staff.objects.filter(business=business, is_active=True)
+    if staff_id is not None:
+        staff_members = staff_members.filter(pk=staff_id)
+    staff_members = list(staff_members.only('id', 'name', 'rest_days'))
+
+    range_start = local_day_start(first_day)
+    range_end = local_day_start(last_day + timedelta(days=1))
+    reservations = Reservation.objects.filter(
+        business=business,
+        status__in=ACTIVE_STATUSES,
+        start_time__lt=range_end,
+        end_time__gt=range_start,
+    ).values_list('staff_id', 'start_time', 'end_time')
+
+    unassigned = []
+    by_staff = {}
+    for reserved_staff_id, start, end in reservations:
+        interval = (_epoch(start), _epoch(end))
+        if reserved_staff_id is None:
+            unassigned.append(interval)
+        else:
+            by_staff.setdefault(reserved_staff_id, []).append(interval)
+
+    columns = [(member.pk, member.name, set(member.rest_days or [])) for member in staff_members]
+    if not columns and staff_id is None:
+        # No staff configured: every booking blocks the one shared calendar
+        columns = [(None, None, set())]
+        unassigned = unassigned + [interval for intervals in by_staff.values() for interval in intervals]
+
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    windows = [
+        (day, _local_at(day, business.business_hours_start), _local_at(day, business.business_hours_end))
+        for day in days
+    ]
+
+    step = int(duration.total_seconds()) if duration is not None else None
+
+    # Staff share most boundaries (opening, closing, slot grid), so each
+    # instant is converted to a local HH:MM label once per call
+    labels = {}
+
+    def label(seconds):
+        text = labels.get(seconds)
+        if text is None:
+            text = labels[seconds] = datetime.fromtimestamp(seconds, LOCAL_TZ).strftime('%H:%M')
+        return text
+
+    result = []
+    for member_id, name, rest_days in columns:
+        busy = merge_intervals(unassigned + by_staff.get(member_id, []))
+        ends = [end for _, end in busy]
+        member_days = OrderedDict()
+        for day, opens, closes in windows:
+            free = []
+            if day.weekday() not in rest_days and opens < closes:
+                free = subtract_intervals(opens, closes, busy, ends)
+            entry = {
+                'free': [
+                    {'start': label(start), 'end': label(end)} for start, end in free
+                ],
+            }
+            if step is not None:
+                entry['slots'] = [label(start) for start in split_into_slots(free, step)]
+            member_days[day.isoformat()] = entry
+        result.append({'id': member_id, 'name': name, 'days': member_days})
+    return result
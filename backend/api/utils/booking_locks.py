@@ -0,0 +1,148 @@
+"""
+Advisory-lock booking mode for high-contention tenants (Business.serialize_bookings).
+
+Creates for such a business take transaction-scoped PostgreSQL advisory locks
+before the in-lock overlap check and the INSERT, so a burst of attempts for
+the same staff member and morning queues up instead of racing into the
+exclusion constraint:
+
+- an assigned booking takes the (business, day) key SHARED and the
+  (business, staff, day) key EXCLUSIVE: different staff book in parallel,
+  the same staff member is serialized;
+- an unassigned booking blocks every staff member, so it takes the
+  (business, day) key EXCLUSIVE.
+
+Bookings that span several local days lock every day, always in the same
+order (day key before staff key, days ascending), so two creates cannot
+deadlock. Locks are released at COMMIT/ROLLBACK.
+
+Bulk imports (api/utils/reservation_import.py) take the (business, day) key
+EXCLUSIVE for every day their rows touch, in the same ascending order, so
+no locked create for those days runs between the import's conflict check
+and its INSERT.
+
+Lock waits are timed per tenant and exposed through /api/metrics/.
+"""
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+
+from api.utils.slots import LOCAL_TZ
+
+# Waits above this count as contention in the per-tenant stats
+CONTENDED_WAIT_MS = getattr(settings, 'BOOKING_LOCK_CONTENDED_MS', 5)
+
+
+def _lock_key(*parts):
+    """Stable signed 64-bit key for pg_advisory_xact_lock(bigint)"""
+    digest = hashlib.blake2b(':'.join(str(part) for part in parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _local_days(start_time, end_time):
+    day = start_time.astimezone(LOCAL_TZ).date()
+    # end_time is exclusive: a booking ending at midnight does not touch the next day
+    last_day = (end_time - timedelta(microseconds=1)).astimezone(LOCAL_TZ).date()
+    while day <= last_day:
+        yield day
+        day += timedelta(days=1)
+
+
+def lock_plan(business_id, staff_id, start_time, end_time):
+    """Ordered (key, shared) pairs a create for this slot must acquire"""
+    plan = []
+    for day in _local_days(start_time, end_time):
+        day_key = _lock_key(business_id, day.isoformat())
+        if staff_id is None:
+            plan.append((day_key, False))
+        else:
+            plan.append((day_key, True))
+            plan.append((_lock_key(business_id, staff_id, day.isoformat()), False))
+    return plan
+
+
+class BookingLockStats:
+    """Per-tenant lock-wait counters of this worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tenants = {}
+
+    def record(self, subdomain, wait_ms):
+        with self._lock:
+            entry = self._tenants.setdefault(subdomain, {
+                'acquisitions': 0,
+                'contended': 0,
+                'total_wait_ms': 0.0,
+                'max_wait_ms': 0.0,
+            })
+            entry['acquisitions'] += 1
+            entry['total_wait_ms'] += wait_ms
+            entry['max_wait_ms'] = max(entry['max_wait_ms'], wait_ms)
+            if wait_ms >= CONTENDED_WAIT_MS:
+                entry['contended'] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'contended_threshold_ms': CONTENDED_WAIT_MS,
+                'tenants': {
+                    subdomain: {
+                        'acquisitions': entry['acquisitions'],
+                        'contended': entry['contended'],
+                        'avg_wait_ms': round(entry['total_wait_ms'] / entry['acquisitions'], 3),
+                        'max_wait_ms': round(entry['max_wait_ms'], 3),
+                    }
+                    for subdomain, entry in self._tenants.items()
+                },
+            }
+
+
+booking_lock_stats = BookingLockStats()
+
+
+def _acquire(business, plan):
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        for key, shared in plan:
+            if shared:
+                cursor.execute('SELECT pg_advisory_xact_lock_shared(%s)', [key])
+            else:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+    booking_lock_stats.record(business.subdomain, (time.perf_counter() - started) * 1000)
+
+
+@contextmanager
+def booking_days_lock(business, intervals):
+    """
+    Exclusive (business, day) locks for every local day any of the
+    (start_time, end_time) intervals touches, for the current transaction.
+    Same requirements as booking_lock().
+    """
+    if connection.vendor != 'postgresql':
+        yield
+        return
+
+    days = sorted({day for start_time, end_time in intervals for day in _local_days(start_time, end_time)})
+    _acquire(business, [(_lock_key(business.pk, day.isoformat()), False) for day in days])
+    yield
+
+
+@contextmanager
+def booking_lock(business, staff_id, start_time, end_time):
+    """
+    Acquire the advisory locks of lock_plan() for the current transaction.
+    Must run inside transaction.atomic(); a no-op on databases without
+    advisory locks.
+    """
+    if connection.vendor != 'postgresql':
+        yield
+        return
+
+    _acquire(business, lock_plan(business.pk, staff_id, start_time, end_time))
+    yield
@@ -1,53 +1,62 @@
 """
-Email utilities. New-reservation owner emails can be sent in a background thread
-so the HTTP response is not blocked on SMTP (can take many seconds).
+Email utilities. New-reservation owner emails are sent from the notification
+job queue (api/utils/notifications.py) so the HTTP response is not blocked on
+SMTP (can take many seconds). Businesses in digest mode get one summary email
+per window instead (send_new_reservations_digest).
 """
-import threading
-
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 import logging
 
+from api.utils.mail_pool import mail_connection
+
 logger = logging.getLogger(__name__)
 
 
-def send_new_reservation_email(reservation):
+def build_new_reservation_email(reservation):
+    """Owner notification for a new reservation as an EmailMultiAlternatives"""
+    business = reservation.business
+
+    subject = f'Rezervim i Ri #{reservation.id} - {business.name}'
+
+    # Render HTML email template
+    html_message = render_to_string('new_reservation_admin.html', {
+        'customer_name': reservation.customer_name,
+        'customer_email': getattr(reservation, 'customer_email', ''),
+        'customer_phone': reservation.customer_phone,
+        'reservation_id': reservation.id,
+        'reservation_date': reservation.start_time.date() if reservation.start_time else '',
+        'reservation_time': reservation.start_time.strftime('%H:%M') if reservation.start_time else '',
+        'business_name': business.name,
+    })
+
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body='',  # Plain text version (empty, we use HTML)
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[business.email],
+    )
+    message.attach_alternative(html_message, 'text/html')
+    return message
+
+
+def send_new_reservation_email(reservation, raise_errors=False):
     """
-    Send email to business owner when new reservation is created
+    Send email to business owner when new reservation is created, over the
+    calling thread's pooled SMTP connection (see mail_pool.py)
     
     Args:
         reservation: Reservation object
+        raise_errors: Raise the SMTP error instead of returning False, so the
+            notification job records what went wrong
         
     Returns:
         bool: True if email sent successfully, False otherwise
     """
     try:
-        business = reservation.business
-        recipient_email = business.email
-        
-        subject = f'Rezervim i Ri #{reservation.id} - {business.name}'
-        
-        # Render HTML email template
-        html_message = render_to_string('new_reservation_admin.html', {
-            'customer_name': reservation.customer_name,
-            'customer_email': getattr(reservation, 'customer_email', ''),
-            'customer_phone': reservation.customer_phone,
-            'reservation_id': reservation.id,
-            'reservation_date': reservation.start_time.date() if reservation.start_time else '',
-            'reservation_time': reservation.start_time.strftime('%H:%M') if reservation.start_time else '',
-            'business_name': business.name,
-        })
-        
-        # Send email
-        result = send_mail(
-            subject=subject,
-            message='',  # Plain text version (empty, we use HTML)
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        recipient_email = reservation.business.email
+        result = mail_connection().send_messages([build_new_reservation_email(reservation)])
         
         if result:
             logger.info(f'✅ Email sent to {recipient_email} for reservation {reservation.id}')
@@ -57,58 +66,66 @@ def send_new_reservation_email(reservation):
             return False
         
     except Exception as e:
+        if raise_errors:
+            raise
         logger.error(f'❌ Failed to send email for reservation {reservation.id}: {str(e)}')
         return False
 
 
-def send_new_reservation_email_async(reservation_id):
-    """
-    Queue owner notification on a short-lived daemon thread.
+def build_new_reservations_digest(business, reservations):
+    """One owner email listing several new reservations (a single template render)"""
+    html_message = render_to_string('new_reservations_digest.html', {
+        'business_name': business.name,
+        'reservation_count': len(reservations),
+        'reservations': [
+            {
+                'reservation_id': reservation.id,
+                'customer_name': reservation.customer_name,
+                'customer_phone': reservation.customer_phone,
+                'reservation_date': reservation.start_time.date(),
+                'reservation_time': reservation.start_time.strftime('%H:%M'),
+                'staff_name': reservation.staff.name if reservation.staff else '',
+            }
+            for reservation in reservations
+        ],
+    })
+
+    message = EmailMultiAlternatives(
+        subject=f'{len(reservations)} Rezervime të Reja - {business.name}',
+        body='',  # Plain text version (empty, we use HTML)
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[business.email],
+    )
+    message.attach_alternative(html_message, 'text/html')
+    return message
 
-    Why: send_new_reservation_email() calls SMTP (send_mail) and can take many
-    seconds. Running it in the request would block the HTTP 201 until the mail
-    server answers. The API returns immediately after commit; the thread runs
-    after on_commit so the reservation row exists. Logs for success/failure still
-    come from send_new_reservation_email (and from this wrapper for job outcome).
+
+def send_new_reservations_digest(business, reservations, raise_errors=False):
+    """
+    Send one digest email about `reservations` to the business owner over the
+    calling thread's pooled SMTP connection. Nothing is sent for an empty list.
+    With raise_errors the SMTP error is raised instead of returning False.
+    
+    Returns:
+        bool: True if the email was sent (or there was nothing to send)
     """
-    from django.db import close_old_connections
-    from api.models import Reservation
-
-    def _run():
-        close_old_connections()
-        try:
-            r = Reservation.objects.select_related('business').get(pk=reservation_id)
-        except Reservation.DoesNotExist:
-            logger.error(
-                '❌ New-reservation email (async): reservation %s not found after commit',
-                reservation_id,
-            )
-            close_old_connections()
-            return
-        try:
-            # send_new_reservation_email already logs per attempt (recipient, errors)
-            ok = send_new_reservation_email(r)
-            if ok:
-                logger.info(
-                    'New-reservation email (async) finished OK for owner of reservation %s',
-                    reservation_id,
-                )
-            else:
-                logger.error(
-                    'New-reservation email (async) reported failure for reservation %s (see log lines above)',
-                    reservation_id,
-                )
-        except Exception as e:
-            logger.error(
-                '❌ New-reservation email (async) crashed for reservation %s: %s',
-                reservation_id,
-                str(e),
-                exc_info=True,
-            )
-        finally:
-            close_old_connections()
-
-    threading.Thread(target=_run, daemon=True).start()
+    if not reservations:
+        return True
+    try:
+        result = mail_connection().send_messages([build_new_reservations_digest(business, reservations)])
+        
+        if result:
+            logger.info(f'✅ Digest of {len(reservations)} reservation(s) sent to {business.email}')
+            return True
+        else:
+            logger.error(f'❌ Digest email failed for {business.name}')
+            return False
+        
+    except Exception as e:
+        if raise_errors:
+            raise
+        logger.error(f'❌ Failed to send digest email for {business.name}: {str(e)}')
+        return False
 
 
 def test_email_configuration():
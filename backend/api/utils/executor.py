@@ -0,0 +1,150 @@
+"""
+Bounded in-process executor for background work of the web process.
+
+A fixed number of daemon threads consume a capped queue. submit() never
+blocks and never grows the queue past its cap: when the pool is saturated
+(e.g. SMTP is down and every thread is stuck in a timeout) it returns False
+and the caller falls back to something durable. shutdown() stops accepting
+work and lets the threads drain the queue for a bounded time; it is called
+from gunicorn's worker_exit hook (gunicorn.conf.py) and at interpreter exit.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BoundedExecutor:
+    """Fixed thread pool over a bounded queue, with depth and latency counters"""
+
+    def __init__(self, name, max_workers, max_queue):
+        self.name = name
+        self.max_workers = max_workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._accepting = True
+        self._active = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    def _start_threads(self):
+        # Threads start on first submit: processes that never submit (migrate,
+        # shell) spawn none. Management commands that enqueue notifications
+        # (run_reminder_scheduler, flush_notification_digests) do, and the
+        # atexit drain lets their tasks finish before the command exits.
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._work, name=f'{self.name}-{len(self._threads)}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, fn, *args):
+        """Queue fn(*args); False when saturated or shutting down (nothing queued)"""
+        with self._lock:
+            if not self._accepting:
+                self.rejected += 1
+                return False
+            self._start_threads()
+            try:
+                self._queue.put_nowait((fn, args, time.monotonic()))
+            except queue.Full:
+                self.rejected += 1
+                return False
+            self.submitted += 1
+            return True
+
+    def free_slots(self):
+        return self._queue.maxsize - self._queue.qsize()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            fn, args, queued_at = item
+            started = time.monotonic()
+            with self._lock:
+                self._active += 1
+            ok = True
+            try:
+                fn(*args)
+            except Exception:
+                ok = False
+                logger.exception(f'❌ {self.name} task {getattr(fn, "__name__", fn)} crashed')
+            finished = time.monotonic()
+            with self._lock:
+                self._active -= 1
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._wait_total += started - queued_at
+                self._wait_max = max(self._wait_max, started - queued_at)
+                self._run_total += finished - started
+                self._run_max = max(self._run_max, finished - started)
+            self._queue.task_done()
+
+    def shutdown(self, timeout):
+        """Stop accepting work and wait up to timeout seconds for the queue to drain"""
+        with self._lock:
+            if not self._accepting:
+                return True
+            self._accepting = False
+            threads = list(self._threads)
+        if not threads:
+            return True
+
+        deadline = time.monotonic() + timeout
+        pending = self._queue.qsize()
+        for _ in threads:
+            # Sentinels queue behind the pending tasks, so every task runs first
+            while True:
+                try:
+                    self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+                    break
+                except queue.Full:
+                    if time.monotonic() >= deadline:
+                        break
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        drained = not any(thread.is_alive() for thread in threads)
+        log = logger.info if drained else logger.warning
+        log(f'{self.name}: shutdown with {pending} queued tasks, drained={drained}')
+        return drained
+
+    def stats(self):
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                'threads': self.max_workers,
+                'started_threads': len(self._threads),
+                'active': self._active,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed,
+                'avg_queue_wait_ms': round(self._wait_total / finished * 1000, 3) if finished else None,
+                'max_queue_wait_ms': round(self._wait_max * 1000, 3),
+                'avg_run_ms': round(self._run_total / finished * 1000, 3) if finished else None,
+                'max_run_ms': round(self._run_max * 1000, 3),
+                'accepting': self._accepting,
+            }
+
+    def drain_at_exit(self, timeout):
+        atexit.register(self.shutdown, timeout)
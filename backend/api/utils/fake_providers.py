@@ -0,0 +1,168 @@
+"""
+Local stand-ins for the notification providers, for benchmarks and manual tests.
+
+- FakeSMTPServer: a minimal SMTP sink (EHLO/HELO, MAIL, RCPT, DATA, RSET,
+  NOOP, QUIT, no TLS/AUTH) that accepts and discards messages.
+- FakeProviderServer: an HTTP server answering the Twilio Messages API
+  (POST /2010-04-01/Accounts/<sid>/Messages.json) and the Ultramsg chat API
+  (POST /<instance>/messages/chat) like the real ones, with keep-alive.
+
+Both take latency_ms (plus up to jitter_ms at random) per message/request and
+failure_rate, the share of messages refused like an unhealthy provider does
+(SMTP 451, HTTP 503). FakeProviderServer also charges handshake_ms on every
+new connection in place of the TLS setup of a real provider.
+
+Only the standard library is used; run them with run_fake_providers or start
+them in-process (.start()) as benchmark_notifications does.
+"""
+import json
+import random
+import socketserver
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _FakeStats:
+    """Counters shared by the two fakes"""
+
+    def _init_stats(self, latency_ms, jitter_ms, failure_rate):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+
+    def record(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def delay(self):
+        time.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+
+    def should_fail(self):
+        failed = random.random() < self.failure_rate
+        if failed:
+            self.record(failures=1)
+        return failed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'connections': self.connections,
+                'messages': self.requests,
+                'injected_failures': self.failures,
+            }
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def _reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        server.record(connections=1)
+        self._reply('220 fake-smtp ESMTP ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.wfile.write(b'250-fake-smtp\r\n250-8BITMIME\r\n250 SIZE 10485760\r\n')
+            elif verb in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                server.record(requests=1)
+                server.delay()
+                if server.should_fail():
+                    self._reply('451 4.3.0 Injected failure, try again later')
+                else:
+                    self._reply(f'250 OK queued as {uuid.uuid4().hex[:12]}')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class FakeSMTPServer(_FakeStats, socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, latency_ms=0, jitter_ms=0, failure_rate=0.0):
+        socketserver.ThreadingTCPServer.__init__(self, ('127.0.0.1', port), _SMTPHandler)
+        self._init_stats(latency_ms, jitter_ms, failure_rate)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class _ProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.record(connections=1)
+        time.sleep(self.server.handshake_ms / 1000)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        server = self.server
+        server.record(requests=1)
+        server.delay()
+
+        if server.should_fail():
+            self._reply(503, {'code': 20503, 'message': 'Injected failure', 'status': 503})
+        elif self.path.endswith('/Messages.json'):
+            self._reply(201, {
+                'sid': f'SM{uuid.uuid4().hex}',
+                'status': 'queued',
+                'account_sid': self.path.split('/')[3],
+            })
+        elif self.path.endswith('/messages/chat'):
+            self._reply(200, {'sent': 'true', 'message': 'ok', 'id': server.requests})
+        else:
+            self._reply(404, {'message': 'Not found'})
+
+
+class FakeProviderServer(_FakeStats, ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=0, jitter_ms=0, failure_rate=0.0, handshake_ms=0):
+        ThreadingHTTPServer.__init__(self, ('127.0.0.1', port), _ProviderHandler)
+        self._init_stats(latency_ms, jitter_ms, failure_rate)
+        self.handshake_ms = handshake_ms
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
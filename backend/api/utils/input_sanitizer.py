@@ -6,6 +6,12 @@ import re
 import bleach
 from django.core.exceptions import ValidationError
 
+# DNS label rules for business subdomains (shared by validation and tenant lookup)
+SUBDOMAIN_MIN_LENGTH = 3
+SUBDOMAIN_MAX_LENGTH = 63
+SUBDOMAIN_PATTERN = re.compile(r'^[a-z0-9]([a-z0-9-]*[a-z0-9])?$')
+RESERVED_SUBDOMAINS = frozenset(['www', 'api', 'admin', 'mail', 'ftp', 'localhost', 'staging', 'dev'])
+
 
 class InputSanitizer:
     """Sanitize and validate user inputs to prevent XSS and ensure data quality"""
@@ -126,21 +132,42 @@ class InputSanitizer:
         subdomain = subdomain.strip().lower()
         
         # Length validation
-        if len(subdomain) < 3:
+        if len(subdomain) < SUBDOMAIN_MIN_LENGTH:
             raise ValidationError("Subdomain must be at least 3 characters")
-        if len(subdomain) > 63:  # DNS label limit
+        if len(subdomain) > SUBDOMAIN_MAX_LENGTH:  # DNS label limit
             raise ValidationError("Subdomain must not exceed 63 characters")
         
         # Format validation: alphanumeric and hyphens, not starting/ending with hyphen
-        if not re.match(r'^[a-z0-9]([a-z0-9-]*[a-z0-9])?$', subdomain):
+        if not SUBDOMAIN_PATTERN.match(subdomain):
             raise ValidationError(
                 "Subdomain must contain only lowercase letters, numbers, and hyphens "
                 "(not at the beginning or end)"
             )
         
         # Reserved subdomains
-        reserved = ['www', 'api', 'admin', 'mail', 'ftp', 'localhost', 'staging', 'dev']
-        if subdomain in reserved:
+        if subdomain in RESERVED_SUBDOMAINS:
             raise ValidationError(f"Subdomain '{subdomain}' is reserved")
         
         return subdomain
+    
+    @staticmethod
+    def validate_subdomain(subdomain):
+        """
+        Model-field validator: the stored value must already be what
+        sanitize_subdomain() returns, so tenant lookup (is_valid_subdomain)
+        can never reject a saved business.
+        """
+        if InputSanitizer.sanitize_subdomain(subdomain) != subdomain:
+            raise ValidationError("Subdomain must be lowercase without surrounding spaces")
+
+    @staticmethod
+    def is_valid_subdomain(subdomain):
+        """
+        Cheap boolean form of sanitize_subdomain() for already-lowercased input.
+        Used on the request path to reject hosts that could never belong to a business.
+        """
+        return (
+            SUBDOMAIN_MIN_LENGTH <= len(subdomain) <= SUBDOMAIN_MAX_LENGTH
+            and subdomain not in RESERVED_SUBDOMAINS
+            and SUBDOMAIN_PATTERN.match(subdomain) is not None
+        )
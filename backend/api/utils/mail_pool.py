@@ -0,0 +1,138 @@
+"""
+Reusable SMTP connection per delivery thread.
+
+send_mail() opens a TLS connection, logs in, sends one message and quits -
+seconds per email against smtp.gmail.com. Delivery threads (the notification
+worker and the in-process executor) instead keep one authenticated
+connection each, obtained with get_connection() and reused for every message
+they send. A connection idle for more than SMTP_KEEPALIVE_SECONDS is probed
+with NOOP before reuse. Messages are sent one at a time, so when the server
+drops the connection mid-batch only the messages not yet sent are retried,
+once, over a fresh connection; any other SMTP error is raised to the caller
+(the job records it). Non-SMTP backends (console, locmem in tests) are used as-is.
+"""
+import logging
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = getattr(settings, 'SMTP_KEEPALIVE_SECONDS', 30)
+
+# Errors of the NOOP probe after which the connection is not reused
+# (smtplib errors are OSErrors too)
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPHeloError, ConnectionError, OSError)
+
+# The server closed the connection: the message was not taken, a fresh
+# connection may send it. Refusals, timeouts and the like are not retried.
+DISCONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+class SMTPPoolStats:
+    """Connection reuse counters of this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reconnects = 0
+        self.messages = 0
+        self.reused = 0
+
+    def record(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keepalive_seconds': KEEPALIVE_SECONDS,
+                'connects': self.connects,
+                'reconnects': self.reconnects,
+                'messages': self.messages,
+                'messages_on_reused_connection': self.reused,
+            }
+
+
+smtp_pool_stats = SMTPPoolStats()
+
+
+class PooledMailConnection:
+    """A mail backend kept open between sends (one per thread, see mail_connection())"""
+
+    def __init__(self):
+        self.backend = None
+        self.last_used = 0.0
+
+    def _is_smtp(self):
+        return hasattr(self.backend, 'connection')
+
+    def _open(self):
+        self.backend = get_connection(fail_silently=False)
+        self.backend.open()
+        self.last_used = time.monotonic()
+        smtp_pool_stats.record(connects=1)
+
+    def _alive(self):
+        if self.backend is None:
+            return False
+        if not self._is_smtp():
+            return True
+        if self.backend.connection is None:
+            return False
+        if time.monotonic() - self.last_used < KEEPALIVE_SECONDS:
+            return True
+        try:
+            return self.backend.connection.noop()[0] == 250
+        except CONNECTION_ERRORS:
+            return False
+
+    def close(self):
+        if self.backend is not None:
+            try:
+                self.backend.close()
+            except Exception:
+                pass
+        self.backend = None
+
+    def send_messages(self, messages):
+        """Send EmailMessages over the kept connection; returns the number sent"""
+        reused = self._alive()
+        if not reused:
+            self.close()
+            self._open()
+        reconnected = False
+        total = 0
+        for message in messages:
+            try:
+                sent = self.backend.send_messages([message])
+            except DISCONNECT_ERRORS as e:
+                if reconnected:
+                    raise
+                # The server dropped us (idle timeout, restart): one fresh
+                # connection for this message and the ones after it
+                logger.warning(f'⚠️ SMTP connection lost ({e}), reconnecting')
+                self.close()
+                self._open()
+                smtp_pool_stats.record(reconnects=1)
+                reconnected, reused = True, False
+                sent = self.backend.send_messages([message])
+            self.last_used = time.monotonic()
+            smtp_pool_stats.record(messages=sent, reused=sent if reused else 0)
+            total += sent
+        return total
+
+
+_local = threading.local()
+
+
+def mail_connection():
+    """The calling thread's pooled mail connection"""
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = _local.connection = PooledMailConnection()
+    return connection
@@ -0,0 +1,462 @@
+"""
+Durable notification queue on the NotificationJob table.
+
+Every email, SMS and WhatsApp message is a NotificationJob created inside the
+transaction of the change that triggers it:
+
+- with NOTIFICATION_WORKER_ENABLED the request does nothing else; the
+  run_notification_worker command claims due jobs with
+  SELECT ... FOR UPDATE SKIP LOCKED (several workers/threads never take the
+  same job) and sends them;
+- without it (small single-service setups) the jobs of a commit are handed
+  to a bounded in-process executor after commit (api/utils/executor.py).
+  When its queue is full the jobs simply stay queued in the table, and a
+  sweeper thread claims due jobs (those and retries) whenever the executor
+  has room, so an SMTP outage cannot pile up threads or memory. The sweeper
+  runs in web processes only: gunicorn's post_worker_init hook and
+  runserver start it (start_sweeper()); management commands that enqueue
+  jobs hand them to their own executor but never sweep, so a command that
+  exits leaves no claimed batch behind.
+
+A failed attempt is rescheduled with exponential backoff and jitter; after
+max_attempts the job is dead-lettered (status 'dead', last error kept).
+A job whose providers were all skipped because their circuits are open
+(api/utils/provider_routing.py) was never attempted: it is put back until
+a circuit may close, and the claim's attempt is given back.
+A job left in 'sending' by a killed worker is claimed again once
+NOTIFICATION_LOCK_TIMEOUT has passed. A live batch renews the claim of its
+unsent jobs every half lock timeout, so a batch that takes longer than the
+timeout (50 slow emails at EMAIL_TIMEOUT each) is not handed to a second
+worker and sent twice.
+
+Businesses with email_digest_enabled get their new-reservation emails
+'buffered' instead. flush_digests() (run by the worker, the sweeper and the
+flush_notification_digests command) folds every business's buffered jobs
+into one 'new_reservations_digest' job once the oldest of them has waited
+email_digest_minutes; that job is delivered like any other.
+"""
+import logging
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from api.models import NotificationJob, Reservation
+from api.utils.executor import BoundedExecutor
+from api.utils.provider_routing import ProviderNotConfigured, ProvidersUnavailable
+from api.utils.email_utils import send_new_reservation_email, send_new_reservations_digest
+from api.utils.sms_utils import (
+    send_reservation_cancelled_sms, send_reservation_confirmation_sms, send_reservation_reminder_sms
+)
+from api.utils.whatsapp_utils import send_whatsapp_message
+
+logger = logging.getLogger(__name__)
+
+WORKER_ENABLED = getattr(settings, 'NOTIFICATION_WORKER_ENABLED', False)
+MAX_ATTEMPTS = getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 5)
+BACKOFF_BASE = getattr(settings, 'NOTIFICATION_BACKOFF_BASE', 30)  # seconds
+BACKOFF_MAX = getattr(settings, 'NOTIFICATION_BACKOFF_MAX', 3600)  # seconds
+LOCK_TIMEOUT = getattr(settings, 'NOTIFICATION_LOCK_TIMEOUT', 300)  # seconds
+
+# In-process delivery when no worker runs
+EXECUTOR_THREADS = getattr(settings, 'NOTIFICATION_EXECUTOR_THREADS', 4)
+EXECUTOR_QUEUE_SIZE = getattr(settings, 'NOTIFICATION_EXECUTOR_QUEUE_SIZE', 200)
+EXECUTOR_DRAIN_TIMEOUT = getattr(settings, 'NOTIFICATION_EXECUTOR_DRAIN_TIMEOUT', 10)  # seconds
+SWEEP_INTERVAL = getattr(settings, 'NOTIFICATION_SWEEP_INTERVAL', 60)  # seconds
+SWEEP_BATCH_SIZE = 50
+DIGEST_FLUSH_INTERVAL = getattr(settings, 'NOTIFICATION_DIGEST_FLUSH_INTERVAL', 60)  # seconds (worker)
+
+# Channel for customer status messages: 'sms' or 'whatsapp'
+CUSTOMER_CHANNEL = getattr(settings, 'CUSTOMER_NOTIFICATION_CHANNEL', 'sms')
+
+# Reservation status -> job kind (statuses not listed notify nobody)
+KIND_FOR_STATUS = {
+    'confirmed': 'reservation_confirmed',
+    'rejected': 'reservation_cancelled',
+    'canceled': 'reservation_cancelled',
+}
+
+WHATSAPP_MESSAGE_TYPES = {
+    'reservation_confirmed': 'confirmed',
+    'reservation_cancelled': 'rejected',
+}
+
+DIGEST_KIND = 'new_reservations_digest'
+REMINDER_KIND = 'reservation_reminder'
+
+
+def _digest_reservations(job):
+    return list(
+        Reservation.objects.select_related('staff')
+        .filter(notification_jobs__digest=job)
+        .order_by('start_time')
+    )
+
+
+# (channel, kind) -> callable(job) returning True when the provider accepted the message;
+# raises ProviderNotConfigured when the channel has no credentials (not retried)
+# and ProvidersUnavailable when every provider's circuit is open (deferred)
+SENDERS = {
+    ('email', 'new_reservation_owner'): lambda job: send_new_reservation_email(
+        job.reservation, raise_errors=True
+    ),
+    ('email', DIGEST_KIND): lambda job: send_new_reservations_digest(
+        job.business, _digest_reservations(job), raise_errors=True
+    ),
+    ('sms', 'reservation_confirmed'): lambda job: send_reservation_confirmation_sms(
+        job.reservation, raise_errors=True
+    ),
+    ('sms', 'reservation_cancelled'): lambda job: send_reservation_cancelled_sms(
+        job.reservation, raise_errors=True
+    ),
+    ('sms', REMINDER_KIND): lambda job: send_reservation_reminder_sms(
+        job.reservation, raise_errors=True
+    ),
+    ('whatsapp', 'reservation_confirmed'): lambda job: send_whatsapp_message(
+        job.recipient, WHATSAPP_MESSAGE_TYPES[job.kind], job.reservation, job.reservation.business,
+        raise_errors=True
+    ),
+    ('whatsapp', 'reservation_cancelled'): lambda job: send_whatsapp_message(
+        job.recipient, WHATSAPP_MESSAGE_TYPES[job.kind], job.reservation, job.reservation.business,
+        raise_errors=True
+    ),
+}
+
+DUE_STATUSES = ('queued', 'retrying')
+
+
+def _enqueue(jobs):
+    """Insert jobs in the current transaction and schedule their delivery"""
+    for job in jobs:
+        job.max_attempts = MAX_ATTEMPTS
+    jobs = NotificationJob.objects.bulk_create(jobs)
+    job_ids = [job.pk for job in jobs if job.status in DUE_STATUSES]
+    if not WORKER_ENABLED:
+        if job_ids:
+            transaction.on_commit(lambda: deliver_jobs_async(job_ids))
+    # Buffered digest emails are flushed by the sweeper or the worker
+    return jobs
+
+
+def enqueue_status_notifications(reservations, new_status, channel=None):
+    """
+    One customer message per reservation for new_status, on `channel`
+    (default CUSTOMER_NOTIFICATION_CHANNEL). Returns the jobs (empty when the
+    status does not notify the customer).
+    """
+    kind = KIND_FOR_STATUS.get(new_status)
+    if kind is None:
+        return []
+    return _enqueue([
+        NotificationJob(
+            business_id=reservation.business_id,
+            reservation_id=reservation.pk,
+            channel=channel or CUSTOMER_CHANNEL,
+            kind=kind,
+            recipient=reservation.customer_phone,
+        )
+        for reservation in reservations
+    ])
+
+
+def enqueue_new_reservation_email(reservation, business):
+    """Owner email about a new booking (buffered for the digest in digest mode)"""
+    return _enqueue([
+        NotificationJob(
+            business=business,
+            reservation=reservation,
+            channel='email',
+            kind='new_reservation_owner',
+            recipient=business.email,
+            status='buffered' if business.email_digest_enabled else 'queued',
+        )
+    ])[0]
+
+
+def flush_digests(force=False):
+    """
+    Fold buffered owner emails into one digest job per business whose oldest
+    buffered email has waited its digest window (every business with
+    buffered emails when force). Returns the digest jobs created.
+    """
+    now = timezone.now()
+    pending = (
+        NotificationJob.objects.filter(status='buffered', digest__isnull=True)
+        .values('business_id', 'business__email', 'business__email_digest_minutes')
+        .annotate(oldest=Min('created_at'))
+        .order_by()
+    )
+    digests = []
+    for row in pending:
+        if not force and row['oldest'] > now - timedelta(minutes=row['business__email_digest_minutes']):
+            continue
+        with transaction.atomic():
+            # Locked rows belong to a concurrent flush; it folds them
+            item_ids = list(
+                NotificationJob.objects.select_for_update(skip_locked=True)
+                .filter(business_id=row['business_id'], status='buffered', digest__isnull=True)
+                .values_list('pk', flat=True)
+            )
+            if not item_ids:
+                continue
+            digest = _enqueue([
+                NotificationJob(
+                    business_id=row['business_id'],
+                    channel='email',
+                    kind=DIGEST_KIND,
+                    recipient=row['business__email'],
+                )
+            ])[0]
+            NotificationJob.objects.filter(pk__in=item_ids).update(digest=digest, updated_at=now)
+        logger.info(f'📦 Folded {len(item_ids)} new-reservation email(s) into digest job {digest.pk}')
+        digests.append(digest)
+    return digests
+
+
+def enqueue_reminders(reservations):
+    """
+    Reminder SMS for (pk, business_id, customer_phone, start_time) tuples of
+    claimed reservations (api/utils/reminders.py). One bulk insert per batch.
+    """
+    return _enqueue([
+        NotificationJob(
+            business_id=business_id,
+            reservation_id=pk,
+            channel='sms',
+            kind=REMINDER_KIND,
+            recipient=customer_phone,
+            reservation_start_time=start_time,
+        )
+        for pk, business_id, customer_phone, start_time in reservations
+    ])
+
+
+def backoff_delay(attempts):
+    """Seconds before the next attempt after `attempts` failures (±10% jitter)"""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def claim_due_jobs(limit, business_id=None):
+    """
+    Lock up to `limit` due jobs (of one business if given), mark them
+    'sending' and return their ids. Concurrent claimers skip each other's
+    locked rows instead of waiting.
+    """
+    now = timezone.now()
+    due = Q(status__in=DUE_STATUSES, run_after__lte=now) | Q(
+        status='sending', locked_at__lt=now - timedelta(seconds=LOCK_TIMEOUT)
+    )
+    if business_id is not None:
+        due &= Q(business_id=business_id)
+    with transaction.atomic():
+        job_ids = list(
+            NotificationJob.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('run_after')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if job_ids:
+            NotificationJob.objects.filter(pk__in=job_ids).update(
+                status='sending', locked_at=now, attempts=F('attempts') + 1
+            )
+    return job_ids
+
+
+def release_claims(job_ids):
+    """Put claimed jobs back unsent, giving back the claim's attempt"""
+    return NotificationJob.objects.filter(pk__in=job_ids, status='sending').update(
+        status='queued', locked_at=None, attempts=F('attempts') - 1, updated_at=timezone.now()
+    )
+
+
+def claim_job(job_id):
+    """Claim one specific job if it is still waiting (in-process delivery)"""
+    return bool(NotificationJob.objects.filter(pk=job_id, status__in=DUE_STATUSES).update(
+        status='sending', locked_at=timezone.now(), attempts=F('attempts') + 1
+    ))
+
+
+def run_jobs(job_ids):
+    """
+    Send claimed jobs and record each outcome. The jobs are loaded with one
+    query and sent back to back on this thread, so consecutive emails share
+    its pooled SMTP connection (api/utils/mail_pool.py).
+    Returns {job_id: final status}.
+    """
+    jobs = list(NotificationJob.objects.select_related(
+        'business', 'reservation__business', 'reservation__staff'
+    ).filter(pk__in=job_ids).order_by('channel', 'created_at'))
+    statuses = {}
+    lost = set()
+    for index, job in enumerate(jobs):
+        if job.locked_at and timezone.now() - job.locked_at > timedelta(seconds=LOCK_TIMEOUT / 2):
+            lost |= _renew_claims([waiting for waiting in jobs[index:] if waiting.pk not in lost])
+        if job.pk not in lost:
+            statuses[job.pk] = _run_loaded_job(job)
+    return statuses
+
+
+def _renew_claims(jobs):
+    """
+    Push back the lock timeout of the jobs still waiting in a long batch.
+    Returns the ids of jobs whose claim changed meanwhile: another worker
+    took them over and sends them, so this batch must not.
+    """
+    current = dict(NotificationJob.objects.filter(
+        pk__in=[job.pk for job in jobs], status='sending'
+    ).values_list('pk', 'locked_at'))
+    lost = {job.pk for job in jobs if current.get(job.pk) != job.locked_at}
+    now = timezone.now()
+    NotificationJob.objects.filter(
+        pk__in=[job.pk for job in jobs if job.pk not in lost]
+    ).update(locked_at=now)
+    for job in jobs:
+        if job.pk in lost:
+            logger.warning(f'⚠️ Job {job.pk} was claimed again by another worker, leaving it to that one')
+        else:
+            job.locked_at = now
+    return lost
+
+
+def run_job(job_id):
+    """Send one claimed job and record the outcome. Returns the final status."""
+    return run_jobs([job_id]).get(job_id)
+
+
+def _stale_reminder(job):
+    """Why a reminder no longer applies ('' when it still does)"""
+    reservation = job.reservation
+    if reservation.status != 'confirmed':
+        return f'Skipped: reservation is {reservation.status} now'
+    if job.reservation_start_time and reservation.start_time != job.reservation_start_time:
+        return 'Skipped: reservation was moved after the reminder was queued'
+    return ''
+
+
+def _run_loaded_job(job):
+    sender = SENDERS.get((job.channel, job.kind))
+    retryable = True
+    deferred_for = None
+    skip_reason = ''
+    if job.kind == REMINDER_KIND and job.reservation is not None:
+        skip_reason = _stale_reminder(job)
+    if sender is None:
+        ok, error, retryable = False, f'No sender for {job.channel}/{job.kind}', False
+    elif job.reservation is None and job.kind != DIGEST_KIND:
+        ok, error, retryable = False, 'Reservation no longer exists', False
+    elif skip_reason:
+        ok, error, retryable = False, skip_reason, False
+    else:
+        try:
+            ok = sender(job)
+            error = '' if ok else 'Provider did not accept the message'
+        except ProviderNotConfigured as e:
+            ok, error, retryable = False, str(e), False
+        except ProvidersUnavailable as e:
+            ok, error, deferred_for = False, str(e), e.retry_in
+        except Exception as e:
+            ok, error = False, str(e)
+
+    now = timezone.now()
+    job.error = error
+    job.locked_at = None
+    if ok:
+        job.status = 'sent'
+        job.sent_at = now
+        logger.info(f'✅ {job.get_kind_display()} ({job.channel}) sent to {job.recipient} (job {job.pk})')
+    elif skip_reason:
+        job.status = 'skipped'
+        logger.info(f'⏭️ Job {job.pk} not sent: {error}')
+    elif deferred_for is not None:
+        # Nothing was called: not an attempt. Spread the wake-ups so the
+        # half-open trial is not met by every deferred job at once.
+        job.status = 'retrying'
+        job.attempts = max(0, job.attempts - 1)
+        job.run_after = now + timedelta(seconds=max(deferred_for, 1) * random.uniform(1, 1.5))
+        logger.info(f'⏸️ Job {job.pk} deferred until {job.run_after:%H:%M:%S}: {error}')
+    elif retryable and job.attempts < job.max_attempts:
+        job.status = 'retrying'
+        job.run_after = now + timedelta(seconds=backoff_delay(job.attempts))
+        logger.warning(
+            f'⚠️ Job {job.pk} attempt {job.attempts}/{job.max_attempts} failed, '
+            f'retrying after {job.run_after:%H:%M:%S}: {error}'
+        )
+    else:
+        job.status = 'dead'
+        logger.error(f'❌ Job {job.pk} dead-lettered after {job.attempts} attempt(s): {error}')
+    job.save(update_fields=['status', 'error', 'attempts', 'locked_at', 'sent_at', 'run_after', 'updated_at'])
+    if job.kind == DIGEST_KIND and job.status in ('sent', 'dead'):
+        # The buffered emails' tickets report the digest's outcome
+        job.digest_items.update(status=job.status, sent_at=job.sent_at, error=job.error, updated_at=now)
+    return job.status
+
+
+notification_executor = BoundedExecutor('notification-executor', EXECUTOR_THREADS, EXECUTOR_QUEUE_SIZE)
+notification_executor.drain_at_exit(EXECUTOR_DRAIN_TIMEOUT)
+
+_sweeper_lock = threading.Lock()
+_sweeper_started = False
+
+
+def _deliver(job_ids):
+    close_old_connections()
+    try:
+        run_jobs([job_id for job_id in job_ids if claim_job(job_id)])
+    finally:
+        close_old_connections()
+
+
+def _deliver_claimed(job_ids):
+    close_old_connections()
+    try:
+        run_jobs(job_ids)
+    finally:
+        close_old_connections()
+
+
+def _sweep():
+    """Hand due jobs from the table to the executor while it has room"""
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        if not notification_executor.stats()['accepting']:
+            return
+        if notification_executor.free_slots() <= 0:
+            continue
+        close_old_connections()
+        try:
+            flush_digests()
+            # One task per sweep: the batch goes out over one SMTP connection
+            job_ids = claim_due_jobs(SWEEP_BATCH_SIZE)
+            if job_ids and not notification_executor.submit(_deliver_claimed, job_ids):
+                # Filled up (or shut down) since the free_slots() check
+                release_claims(job_ids)
+        except Exception as e:
+            logger.error(f'❌ Notification sweep failed: {str(e)}')
+        finally:
+            close_old_connections()
+
+
+def start_sweeper():
+    """Start this process's sweeper thread (in-process mode, once per process)"""
+    global _sweeper_started
+    if WORKER_ENABLED:
+        return
+    with _sweeper_lock:
+        if not _sweeper_started:
+            threading.Thread(target=_sweep, name='notification-sweeper', daemon=True).start()
+            _sweeper_started = True
+
+
+def deliver_jobs_async(job_ids):
+    """
+    In-process mode: deliver the jobs of a commit as one executor task.
+    If the executor is saturated they stay queued for the sweeper (or a worker).
+    """
+    if not notification_executor.submit(_deliver, job_ids):
+        logger.warning(f'⚠️ Notification executor saturated, {len(job_ids)} job(s) left queued for the sweeper')
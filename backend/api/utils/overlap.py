@@ -0,0 +1,134 @@
+"""
+Double-booking guard.
+
+On PostgreSQL the api_reservation_no_overlap exclusion constraint (migration
+0011) rejects overlapping active reservations inside the INSERT/UPDATE itself,
+so two concurrent creates for the same slot cannot both succeed. The staff
+rule is encoded as int8range(staff_id, staff_id, '[]'): an unassigned booking
+(NULL staff) is an unbounded range and overlaps every staff member, two
+assigned bookings overlap only when the staff ids are equal.
+
+Other databases (local SQLite) have no such constraint and keep the
+validate-time EXISTS check in api/serializers/reservation.py.
+"""
+from contextlib import contextmanager
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api.models import Reservation
+
+OVERLAP_CONSTRAINT = 'api_reservation_no_overlap'
+
+OVERLAP_MESSAGE = 'This time overlaps an existing booking. Choose another time.'
+
+
+class ReservationOverlap(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = {'start_time': [OVERLAP_MESSAGE]}
+    default_code = 'reservation_overlap'
+
+
+def _staff_blocking_q(new_staff_id):
+    """Unassigned staff overlaps everyone; two assigned must match to conflict."""
+    if new_staff_id is None:
+        return Q()
+    return Q(staff__isnull=True) | Q(staff_id=new_staff_id)
+
+
+def overlapping_reservations(business, start_time, end_time, new_staff_id, exclude_pk=None):
+    """
+    Active reservations that block [start_time, end_time) for the given staff.
+    .exists() on it is a single EXISTS on the (business, start_time)
+    active-status index, whatever the number of overlapping bookings.
+    """
+    qs = Reservation.objects.filter(
+        _staff_blocking_q(new_staff_id),
+        business=business,
+        status__in=['pending', 'confirmed'],
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    return qs
+
+
+def database_enforces_overlaps(using='default'):
+    """True when the exclusion constraint exists on this database backend"""
+    return connections[using].vendor == 'postgresql'
+
+
+def is_overlap_violation(exc):
+    diag = getattr(exc.__cause__, 'diag', None)
+    if diag is not None and getattr(diag, 'constraint_name', None):
+        return diag.constraint_name == OVERLAP_CONSTRAINT
+    return OVERLAP_CONSTRAINT in str(exc)
+
+
+@contextmanager
+def overlap_guard():
+    """
+    Run a reservation write in a savepoint and turn an exclusion-constraint
+    violation into a 409 ReservationOverlap.
+    """
+    if not database_enforces_overlaps():
+        yield
+        return
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as exc:
+        if is_overlap_violation(exc):
+            raise ReservationOverlap() from exc
+        raise
+
+
+# Pairs of active reservations that overlap under the staff rule above: what
+# migration 0011 refuses to add the constraint over (it runs the same query)
+OVERLAPPING_PAIRS_SQL = """
+SELECT a.business_id, a.id, b.id
+FROM api_reservation a
+JOIN api_reservation b
+    ON b.business_id = a.business_id
+    AND b.id > a.id
+    AND b.start_time < a.end_time
+    AND a.start_time < b.end_time
+    AND (a.staff_id IS NULL OR b.staff_id IS NULL OR a.staff_id = b.staff_id)
+WHERE a.status IN ('pending', 'confirmed') AND b.status IN ('pending', 'confirmed')
+ORDER BY a.business_id, a.id, b.id
+"""
+
+
+def overlapping_pairs(using='default'):
+    """(business_id, reservation id, reservation id) of every overlapping active pair"""
+    business_pk = Reservation._meta.get_field('business').target_field
+    with connections[using].cursor() as cursor:
+        cursor.execute(OVERLAPPING_PAIRS_SQL)
+        # Raw rows carry the database's UUID form (a hex string on SQLite)
+        return [(business_pk.to_python(business_id), first, second) for business_id, first, second in cursor.fetchall()]
+
+
+def plan_overlap_resolution(pairs, created):
+    """
+    Which reservations give way so no overlapping pair is left.
+    created maps reservation id -> created_at. Reservations are taken in
+    booking order: one keeps its slot unless it overlaps a reservation
+    already kept. Returns {canceled id: id of the kept reservation it lost to}.
+    """
+    neighbours = {}
+    for _, first, second in pairs:
+        neighbours.setdefault(first, set()).add(second)
+        neighbours.setdefault(second, set()).add(first)
+
+    kept = set()
+    canceled = {}
+    for pk in sorted(neighbours, key=lambda pk: (created[pk], pk)):
+        winners = sorted(neighbours[pk] & kept)
+        if winners:
+            canceled[pk] = winners[0]
+        else:
+            kept.add(pk)
+    return canceled
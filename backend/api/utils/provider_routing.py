@@ -0,0 +1,280 @@
+"""
+Provider routing with per-provider circuit breakers (SMS/WhatsApp).
+
+Every call to a provider goes through provider_router.route(), which tries
+the candidate providers in order and records how each call went:
+
+- failures (connection errors, timeouts, 5xx/429 answers, and any error
+  that is not a recognised refusal) count against the provider; after PROVIDER_BREAKER_FAILURES consecutive ones its
+  breaker opens and the provider is skipped without a call for
+  PROVIDER_BREAKER_COOLDOWN seconds. Then one trial call is let through
+  (half-open): success closes the breaker, failure opens it again;
+- a refused message (a 4xx answer other than 429 in a TwilioRestException
+  or ProviderError, e.g. an invalid number) means the provider is up:
+  it does not count as a failure, but the next provider is still tried;
+- successful calls feed an exponentially weighted latency, and available
+  providers are tried fastest first. Every PROVIDER_PROBE_EVERY-th message
+  uses the configured order instead, so a provider that was slow once gets
+  measured again.
+
+When every provider that was called failed, route() returns None and the
+notification job is retried with backoff (api/utils/notifications.py).
+When no provider could be called at all (every circuit open) it raises
+ProvidersUnavailable instead: the job is deferred until the first circuit
+may let a call through, without using up one of its attempts. An outage
+costs one quick skip per message instead of a timeout each.
+State is per process, like the other in-process counters.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from twilio.base.exceptions import TwilioRestException
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = getattr(settings, 'PROVIDER_BREAKER_FAILURES', 3)
+COOLDOWN = getattr(settings, 'PROVIDER_BREAKER_COOLDOWN', 30)  # seconds
+PROBE_EVERY = getattr(settings, 'PROVIDER_PROBE_EVERY', 20)
+LATENCY_ALPHA = 0.2
+
+
+class ProviderError(Exception):
+    """A provider HTTP API answered with an error status"""
+
+    def __init__(self, provider, status, detail=''):
+        super().__init__(f'{provider} answered HTTP {status}: {detail}'[:500])
+        self.status = status
+
+
+class ProviderNotConfigured(Exception):
+    """No provider of the channel has credentials: retrying cannot help"""
+
+
+class ProvidersUnavailable(Exception):
+    """Every candidate provider was skipped without a call (circuit open)"""
+
+    def __init__(self, names, retry_in):
+        super().__init__(
+            f'Not sent: circuit open for {", ".join(names)}, next try possible in {retry_in:.0f}s'
+        )
+        self.retry_in = retry_in
+
+
+def is_rejection(error):
+    """
+    True when the provider answered and refused this one message (4xx other
+    than 429). Anything else - transport errors, 5xx/429, errors of unknown
+    kind - is treated as a provider failure.
+    """
+    if not isinstance(error, (TwilioRestException, ProviderError)):
+        return False
+    status = getattr(error, 'status', None)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+class CircuitBreaker:
+    """Health of one provider: closed (in use), open (skipped) or half_open (one trial call)"""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self.latency_ms = None
+        self.successes = 0
+        self.failures = 0
+        self.rejections = 0
+        self.skipped = 0
+        self.times_opened = 0
+        self.last_error = ''
+        self.last_failure_at = None
+
+    def _cooled_down(self):
+        return time.monotonic() - self.opened_at >= COOLDOWN
+
+    def available(self):
+        """Whether a call may be routed here now (does not take the trial slot)"""
+        with self._lock:
+            if self.state == 'open':
+                return self._cooled_down()
+            return not (self.state == 'half_open' and self._trial_running)
+
+    def allow(self):
+        """Take permission for one call; False means skip this provider"""
+        with self._lock:
+            if self.state == 'open' and self._cooled_down():
+                self.state = 'half_open'
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.skipped += 1
+            return False
+
+    def retry_in(self):
+        """Seconds until a call may be routed here (0 when only waiting for a running trial)"""
+        with self._lock:
+            if self.state == 'open':
+                return max(0.0, COOLDOWN - (time.monotonic() - self.opened_at))
+            return 0.0
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def _observe_latency(self, latency_ms):
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += LATENCY_ALPHA * (latency_ms - self.latency_ms)
+
+    def record_success(self, latency_ms):
+        with self._lock:
+            self.successes += 1
+            self._observe_latency(latency_ms)
+            self._close()
+
+    def record_rejection(self, latency_ms, error):
+        """The provider answered but refused this message: it is healthy"""
+        with self._lock:
+            self.rejections += 1
+            self.last_error = error
+            self._observe_latency(latency_ms)
+            self._close()
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            self.last_failure_at = time.time()
+            self._trial_running = False
+            if self.state == 'half_open' or self.consecutive_failures >= FAILURE_THRESHOLD:
+                if self.state != 'open':
+                    self.times_opened += 1
+                    logger.warning(f'⚠️ Circuit for {self.name} opened after {self.consecutive_failures} failure(s): {error}')
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def _close(self):
+        if self.state != 'closed':
+            logger.info(f'✅ Circuit for {self.name} closed again')
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def reset(self):
+        with self._lock:
+            self._close()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == 'open':
+                retry_in = round(max(0.0, COOLDOWN - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in_seconds': retry_in,
+                'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejections': self.rejections,
+                'skipped': self.skipped,
+                'times_opened': self.times_opened,
+                'last_error': self.last_error,
+                'last_failure_at': self.last_failure_at,
+            }
+
+
+class ProviderRouter:
+    """Orders providers by health and latency and records every call's outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._routed = 0
+
+    def breaker(self, name):
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            return self._breakers[name]
+
+    def order(self, names):
+        """Available providers of `names`, fastest first (or as given on a probe turn)"""
+        available = []
+        for name in names:
+            breaker = self.breaker(name)
+            if breaker.available():
+                available.append(name)
+            else:
+                breaker.record_skip()
+        with self._lock:
+            self._routed += 1
+            probe = self._routed % PROBE_EVERY == 0
+        if probe:
+            return available
+        latency = {name: self.breaker(name).latency_ms for name in available}
+        return sorted(
+            available,
+            key=lambda name: (latency[name] is None, latency[name] or 0, names.index(name)),
+        )
+
+    def route(self, names, send):
+        """
+        Call send(provider) for providers of `names` until one accepts.
+        send returns True when the message was accepted, False when it was
+        refused, and raises on transport/API errors.
+        Returns the provider that accepted, or None when every call failed;
+        raises ProvidersUnavailable when no provider could be called.
+        """
+        called = False
+        for name in self.order(names):
+            breaker = self.breaker(name)
+            if not breaker.allow():
+                continue
+            called = True
+            started = time.monotonic()
+            try:
+                accepted = send(name)
+            except Exception as e:
+                if is_rejection(e):
+                    breaker.record_rejection((time.monotonic() - started) * 1000, str(e))
+                    logger.error(f'❌ {name} refused the message: {str(e)}')
+                else:
+                    breaker.record_failure(str(e))
+                    logger.warning(f'⚠️ {name} call failed: {str(e)}')
+                continue
+            latency_ms = (time.monotonic() - started) * 1000
+            if accepted:
+                breaker.record_success(latency_ms)
+                return name
+            breaker.record_rejection(latency_ms, 'Message not accepted')
+        if not called:
+            raise ProvidersUnavailable(names, min(self.breaker(name).retry_in() for name in names))
+        return None
+
+    def reset(self, name):
+        self.breaker(name).reset()
+
+    def stats(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+            routed = self._routed
+        return {
+            'failure_threshold': FAILURE_THRESHOLD,
+            'cooldown_seconds': COOLDOWN,
+            'probe_every': PROBE_EVERY,
+            'messages_routed': routed,
+            'providers': {name: breaker.snapshot() for name, breaker in sorted(breakers.items())},
+        }
+
+
+provider_router = ProviderRouter()
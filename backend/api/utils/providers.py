@@ -0,0 +1,85 @@
+"""
+Provider clients for SMS/WhatsApp (Twilio, Ultramsg), reused across messages.
+
+Building a twilio.rest.Client and a fresh HTTPS connection for every message
+costs client construction plus a TCP and TLS handshake each time. Here every
+delivery thread keeps one configured Twilio client and one requests.Session,
+both with keep-alive connection pools, and every call has a connect and a
+read timeout so a slow provider cannot hold a delivery thread indefinitely.
+
+TWILIO_API_BASE_URL / ULTRAMSG_API_URL point the clients at a local stand-in
+(run_fake_providers, api/utils/fake_providers.py); leave them unset in production.
+"""
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+TWILIO_DEFAULT_BASE_URL = 'https://api.twilio.com'
+
+_local = threading.local()
+
+
+def http_timeout():
+    """(connect, read) seconds for provider calls"""
+    return (
+        getattr(settings, 'PROVIDER_CONNECT_TIMEOUT', 3.05),
+        getattr(settings, 'PROVIDER_READ_TIMEOUT', 10),
+    )
+
+
+def _pooled_session(session=None):
+    session = session or requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=getattr(settings, 'PROVIDER_POOL_SIZE', 10),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class _TwilioHttpClient(TwilioHttpClient):
+    """Pooled Twilio transport that can be pointed at a stand-in base URL"""
+
+    def __init__(self, base_url):
+        super().__init__(pool_connections=True)
+        self.session = _pooled_session(self.session)
+        # Set after __init__, which only accepts a single number
+        self.timeout = http_timeout()
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, url, *args, **kwargs):
+        if self.base_url != TWILIO_DEFAULT_BASE_URL and url.startswith(TWILIO_DEFAULT_BASE_URL):
+            url = self.base_url + url[len(TWILIO_DEFAULT_BASE_URL):]
+        return super().request(method, url, *args, **kwargs)
+
+
+def twilio_client():
+    """
+    This thread's Twilio client, or None when Twilio is not configured.
+    Rebuilt only when the credentials or base URL change.
+    """
+    account_sid = settings.TWILIO_ACCOUNT_SID
+    auth_token = settings.TWILIO_AUTH_TOKEN
+    if not account_sid or not auth_token:
+        return None
+
+    base_url = getattr(settings, 'TWILIO_API_BASE_URL', '') or TWILIO_DEFAULT_BASE_URL
+    key = (account_sid, auth_token, base_url)
+    cached = getattr(_local, 'twilio', None)
+    if cached is None or cached[0] != key:
+        http_client = _TwilioHttpClient(base_url)
+        cached = _local.twilio = (key, Client(account_sid, auth_token, http_client=http_client))
+    return cached[1]
+
+
+def http_session():
+    """This thread's keep-alive requests.Session for plain HTTP provider APIs"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = _pooled_session()
+    return session
@@ -0,0 +1,55 @@
+"""
+Appointment reminders, claimed in batches by run_reminder_scheduler.
+
+A confirmed reservation is due for its reminder once its start_time is
+within REMINDER_HOURS_BEFORE hours. Each scan reads only the window
+(now, now + lead] of the partial index api_reserva_reminder_due_idx, which
+holds confirmed reservations whose reminder_sent_at is still NULL, so rows
+already reminded drop out of the index and a scan only sees new work.
+
+A batch is claimed in one transaction: the due rows are locked with
+SELECT ... FOR UPDATE SKIP LOCKED (concurrent schedulers take disjoint
+batches), stamped with reminder_sent_at and turned into reminder SMS jobs
+of the notification queue, which does the sending and retrying. Either all
+of that commits or none of it, so a reminder is queued exactly once.
+The job keeps the start time it was claimed for; the sender skips it when
+the reservation was canceled or moved in the meantime.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Reservation
+from api.utils.notifications import enqueue_reminders
+
+HOURS_BEFORE = getattr(settings, 'REMINDER_HOURS_BEFORE', 24)
+
+
+def due_reminders(now=None):
+    """Confirmed reservations inside the reminder window that were not reminded yet"""
+    now = now or timezone.now()
+    return Reservation.objects.filter(
+        status='confirmed',
+        reminder_sent_at__isnull=True,
+        start_time__gt=now,
+        start_time__lte=now + timedelta(hours=HOURS_BEFORE),
+    )
+
+
+def claim_reminder_batch(batch_size, now=None):
+    """Claim up to batch_size due reminders and queue their SMS. Returns the number queued."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            due_reminders(now)
+            .select_for_update(skip_locked=True)
+            .order_by('start_time')
+            .values_list('pk', 'business_id', 'customer_phone', 'start_time')[:batch_size]
+        )
+        if not rows:
+            return 0
+        Reservation.objects.filter(pk__in=[row[0] for row in rows]).update(reminder_sent_at=now)
+        enqueue_reminders(rows)
+    return len(rows)
@@ -0,0 +1,278 @@
+"""
+Bulk import of existing appointments (businesses migrating to us).
+
+Rows come from CSV (header line) or JSON (a list of objects, or an object
+with a "reservations" list) with the columns:
+
+    customer_name, customer_phone, start_time, end_time
+    customer_email, status, notes, staff          (optional)
+
+start_time/end_time are ISO 8601; times without an offset are Europe/Berlin
+local time. staff is a staff id or name of the business. status defaults to
+confirmed (these are appointments that already exist).
+
+Every field goes through InputSanitizer, like the single create endpoint.
+Conflicts - within the batch and against existing bookings, with the usual
+staff rule - are found by one sort-and-sweep pass instead of one overlap
+query per row. Valid rows are inserted with bulk_create in chunks; the
+result is a per-row error report. No notification is sent for imported rows.
+
+The existing bookings are read and the rows inserted in one transaction that
+holds the (business, day) booking locks of every day the rows touch (see
+api/utils/booking_locks.py). A create that takes no lock and commits in
+between trips the exclusion constraint; the import then reads again, so
+only the rows conflicting with that booking are reported, not the batch.
+"""
+import bisect
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from api.models import Reservation, Staff
+from api.utils.booking_locks import booking_days_lock
+from api.utils.input_sanitizer import InputSanitizer
+from api.utils.overlap import OVERLAP_MESSAGE, ReservationOverlap, overlap_guard
+from api.utils.slots import ACTIVE_STATUSES, LOCAL_TZ, invalidate_booked_slots
+
+IMPORT_STATUSES = [value for value, _ in Reservation.STATUS_CHOICES]
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Reads of the existing bookings per import when concurrent creates keep winning
+CONFLICT_ATTEMPTS = 3
+
+
+class ImportFormatError(ValueError):
+    """The payload as a whole cannot be read (not a per-row problem)"""
+
+
+def parse_rows(content, fmt):
+    """List of row dicts from CSV or JSON text"""
+    if fmt == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames:
+            raise ImportFormatError('CSV file has no header line')
+        return [
+            {(key or '').strip(): (value or '').strip() for key, value in row.items()}
+            for row in reader
+        ]
+    if fmt == 'json':
+        try:
+            payload = json.loads(content)
+        except ValueError as exc:
+            raise ImportFormatError(f'Invalid JSON: {exc}')
+        return rows_from_payload(payload)
+    raise ImportFormatError(f'Unsupported format: {fmt}')
+
+
+def rows_from_payload(payload):
+    if isinstance(payload, dict):
+        payload = payload.get('reservations')
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise ImportFormatError('Expected a list of reservation objects')
+    return payload
+
+
+def _text(row, name):
+    value = row.get(name)
+    return '' if value is None else str(value).strip()
+
+
+def _parse_time(value):
+    moment = parse_datetime(value) if value else None
+    if moment is None:
+        raise ValidationError('Expected an ISO 8601 date and time')
+    if moment.tzinfo is None:
+        moment = LOCAL_TZ.localize(moment)
+    return moment
+
+
+def _staff_lookup(business):
+    """{id string or lower-cased name: staff id} from one query"""
+    lookup = {}
+    for staff_id, name in Staff.objects.filter(business=business).values_list('id', 'name'):
+        lookup[str(staff_id)] = staff_id
+        lookup[name.strip().lower()] = staff_id
+    return lookup
+
+
+def _clean_row(row, staff_lookup):
+    """(field values for Reservation, {field: error})"""
+    values, errors = {}, {}
+    sanitizers = (
+        ('customer_name', lambda value: InputSanitizer.sanitize_name(value, max_length=100)),
+        ('customer_phone', InputSanitizer.sanitize_phone),
+        ('customer_email', InputSanitizer.sanitize_email),
+        ('notes', lambda value: InputSanitizer.sanitize_text(value, max_length=1000)),
+        ('start_time', _parse_time),
+        ('end_time', _parse_time),
+    )
+    for name, sanitize in sanitizers:
+        try:
+            values[name] = sanitize(_text(row, name))
+        except ValidationError as exc:
+            errors[name] = exc.messages[0]
+
+    if 'start_time' in values and 'end_time' in values and values['start_time'] >= values['end_time']:
+        errors['end_time'] = 'End time must be after start time'
+
+    status = _text(row, 'status').lower() or 'confirmed'
+    if status in IMPORT_STATUSES:
+        values['status'] = status
+    else:
+        errors['status'] = f"Must be one of: {', '.join(IMPORT_STATUSES)}"
+
+    staff = _text(row, 'staff')
+    values['staff_id'] = None
+    if staff:
+        staff_id = staff_lookup.get(staff) or staff_lookup.get(staff.lower())
+        if staff_id is None:
+            errors['staff'] = f"Unknown staff member '{staff}'"
+        values['staff_id'] = staff_id
+
+    return values, errors
+
+
+class _IntervalIndex:
+    """Intervals sorted by start, answering "does any overlap [start, end)?" in O(log n)"""
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _ in intervals]
+        # max_ends[i]: latest end among the first i + 1 intervals
+        self.max_ends = []
+        for _, end in intervals:
+            self.max_ends.append(max(end, self.max_ends[-1]) if self.max_ends else end)
+
+    def overlaps(self, start, end):
+        count = bisect.bisect_left(self.starts, end)  # intervals starting before end
+        return count > 0 and self.max_ends[count - 1] > start
+
+
+def find_conflicts(candidates, existing):
+    """
+    Row numbers of candidates that must be rejected.
+
+    candidates maps row number -> (start, end, staff_id), existing is a list
+    of such intervals already in the database. Unassigned staff (None)
+    overlaps everyone; two assigned bookings conflict only for the same staff.
+
+    1. A candidate overlapping an existing booking always loses. Existing
+       intervals are indexed per staff id, plus once for all of them (what an
+       unassigned candidate is checked against), so each check is a bisect.
+    2. The surviving candidates are swept in (start, row number) order: the
+       one that starts first wins. Every accepted interval started no later
+       than the current one, so it overlaps exactly when its end is past the
+       current start: the sweep keeps the latest accepted end per staff id.
+
+    Runs in O(n log n) for n candidates plus existing bookings.
+    """
+    by_staff = {}
+    for start, end, staff in existing:
+        by_staff.setdefault(staff, []).append((start, end))
+    unassigned = _IntervalIndex(by_staff.pop(None, []))
+    everyone = _IntervalIndex([(start, end) for start, end, _ in existing])
+    by_staff = {staff: _IntervalIndex(intervals) for staff, intervals in by_staff.items()}
+
+    rejected = set()
+    survivors = []
+    for row, (start, end, staff) in candidates.items():
+        if staff is None:
+            blocked = everyone.overlaps(start, end)
+        else:
+            blocked = unassigned.overlaps(start, end) or (
+                staff in by_staff and by_staff[staff].overlaps(start, end)
+            )
+        if blocked:
+            rejected.add(row)
+        else:
+            survivors.append((start, row, end, staff))
+
+    latest_end = {}  # staff id (None: unassigned) -> latest end of accepted candidates
+    latest_any = None
+    for start, row, end, staff in sorted(survivors):
+        if staff is None:
+            blocked = latest_any is not None and latest_any > start
+        else:
+            blocked = any(
+                key in latest_end and latest_end[key] > start for key in (None, staff)
+            )
+        if blocked:
+            rejected.add(row)
+            continue
+        latest_end[staff] = max(end, latest_end.get(staff, end))
+        latest_any = end if latest_any is None else max(end, latest_any)
+
+    return rejected
+
+
+def _conflicting_rows(business, candidates):
+    """Row numbers of candidates that overlap each other or an existing booking"""
+    if not candidates:
+        return set()
+    existing = list(Reservation.objects.filter(
+        business=business,
+        status__in=ACTIVE_STATUSES,
+        start_time__lt=max(end for _, end, _ in candidates.values()),
+        end_time__gt=min(start for start, _, _ in candidates.values()),
+    ).values_list('start_time', 'end_time', 'staff_id'))
+    return find_conflicts(candidates, existing)
+
+
+def import_reservations(business, rows, dry_run=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate, conflict-check and insert rows for business.
+    Returns {'total', 'created', 'failed', 'dry_run', 'errors': [{'row', 'errors'}]};
+    row numbers are 1-based positions in the input.
+    """
+    staff_lookup = _staff_lookup(business)
+
+    cleaned, errors = {}, {}
+    for row_number, row in enumerate(rows, 1):
+        values, row_errors = _clean_row(row, staff_lookup)
+        if row_errors:
+            errors[row_number] = row_errors
+        else:
+            cleaned[row_number] = values
+
+    candidates = {
+        row_number: (values['start_time'], values['end_time'], values['staff_id'])
+        for row_number, values in cleaned.items()
+        if values['status'] in ACTIVE_STATUSES
+    }
+    intervals = [(values['start_time'], values['end_time']) for values in cleaned.values()]
+
+    for attempt in range(1, CONFLICT_ATTEMPTS + 1):
+        try:
+            with overlap_guard(), transaction.atomic(), booking_days_lock(business, intervals):
+                conflicts = _conflicting_rows(business, candidates)
+                reservations = [
+                    Reservation(business=business, **cleaned[row_number])
+                    for row_number in sorted(cleaned) if row_number not in conflicts
+                ]
+                if reservations and not dry_run:
+                    Reservation.objects.bulk_create(reservations, batch_size=chunk_size)
+                    # bulk_create skips post_save, so the slot cache is cleared here
+                    start_times = [reservation.start_time for reservation in reservations]
+                    transaction.on_commit(lambda: invalidate_booked_slots(business.pk, *start_times))
+            break
+        except ReservationOverlap:
+            # A create without the lock committed after our read: read again
+            if attempt == CONFLICT_ATTEMPTS:
+                raise
+    for row_number in conflicts:
+        errors[row_number] = {'start_time': OVERLAP_MESSAGE}
+
+    return {
+        'total': len(rows),
+        'created': 0 if dry_run else len(reservations),
+        'failed': len(errors),
+        'dry_run': dry_run,
+        'errors': [
+            {'row': row_number, 'errors': errors[row_number]} for row_number in sorted(errors)
+        ],
+    }
@@ -0,0 +1,174 @@
+"""
+Booked-slot lookups for the public booking calendar.
+
+Times are grouped and formatted in Europe/Berlin (same as settings.TIME_ZONE),
+which is how the booking page displays them.
+
+The formatted slot list of each (business, local day) is kept in the Django
+cache under a per-day version. Reservation signals (api/signals.py) bump the
+versions of the affected days after commit whenever a booking is created,
+deleted, rescheduled or changes status; bulk writes that bypass signals call
+invalidate_booked_slots() themselves. A lookup that read the database before
+such a commit stores its result under the version it started with, which is
+never read again, so a late store cannot bring back a stale day.
+With a shared cache (REDIS_URL) invalidation reaches every gunicorn worker;
+BOOKED_SLOTS_CACHE_TTL bounds staleness in any other setup.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pytz
+from django.conf import settings
+from django.core.cache import cache
+
+from api.models import Reservation
+
+LOCAL_TZ = pytz.timezone('Europe/Berlin')
+
+SLOT_CACHE_TTL = getattr(settings, 'BOOKED_SLOTS_CACHE_TTL', 300)
+# Version keys outlive the slot lists stored under them
+SLOT_VERSION_TTL = 24 * 60 * 60
+
+# Statuses that keep a slot taken in the picker (confirmed stays blocked after acceptance)
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+# Longest range served by one booked_slots call (a calendar month view)
+MAX_RANGE_DAYS = 31
+
+
+def local_day_start(day):
+    """Aware datetime of local midnight at the start of day"""
+    return LOCAL_TZ.localize(datetime.combine(day, datetime.min.time()))
+
+
+class SlotCacheStats:
+    """Hit/miss counters of the booked-slot cache in this worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def record(self, hits=0, misses=0, invalidations=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.invalidations += invalidations
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'ttl_seconds': SLOT_CACHE_TTL,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+            }
+
+
+slot_cache_stats = SlotCacheStats()
+
+
+def _version_key(business_id, day):
+    return f'booked_slots_version:{business_id}:{day.isoformat()}'
+
+
+def _cache_key(business_id, day, version):
+    return f'booked_slots:{business_id}:{day.isoformat()}:{version}'
+
+
+def _new_version():
+    # Never reused, so a version key that expired or was evicted cannot
+    # make a slot list stored before an invalidation current again
+    return time.time_ns()
+
+
+def _day_versions(business_id, days):
+    """Current version of every day, starting one for days that have none"""
+    keys = OrderedDict((_version_key(business_id, day), day) for day in days)
+    versions = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, _new_version(), SLOT_VERSION_TTL)
+        versions.update(cache.get_many(missing))
+    return OrderedDict((day, versions.get(key)) for key, day in keys.items())
+
+
+def _query_booked_slots(business, first_day, last_day):
+    """One query on the (business, start_time) active-status index, whatever the range"""
+    reservations = Reservation.objects.filter(
+        business=business,
+        start_time__gte=local_day_start(first_day),
+        start_time__lt=local_day_start(last_day + timedelta(days=1)),
+        status__in=ACTIVE_STATUSES,
+    ).order_by('start_time').values_list('start_time', 'end_time')
+
+    days = OrderedDict(
+        ((first_day + timedelta(days=offset)).isoformat(), [])
+        for offset in range((last_day - first_day).days + 1)
+    )
+    for start_time, end_time in reservations:
+        # Convert UTC times to local timezone
+        start_local = start_time.astimezone(LOCAL_TZ)
+        end_local = end_time.astimezone(LOCAL_TZ)
+        days[start_local.date().isoformat()].append({
+            'start': start_local.strftime('%H:%M'),
+            'end': end_local.strftime('%H:%M'),
+        })
+    return days
+
+
+def booked_slots_for_range(business, first_day, last_day):
+    """
+    Booked intervals for every local day in [first_day, last_day], as
+    {'YYYY-MM-DD': [{'start': 'HH:MM', 'end': 'HH:MM'}, ...]}.
+    Days missing from the cache are loaded with a single query and cached
+    under the versions read before that query.
+    """
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    keys = OrderedDict(
+        (_cache_key(business.pk, day, version), day)
+        for day, version in _day_versions(business.pk, days).items()
+    )
+    cached = cache.get_many(list(keys))
+    missing = [day for key, day in keys.items() if key not in cached]
+    slot_cache_stats.record(hits=len(cached), misses=len(missing))
+
+    fresh = {}
+    if missing:
+        fresh = _query_booked_slots(business, missing[0], missing[-1])
+        cache.set_many(
+            {key: fresh[day.isoformat()] for key, day in keys.items() if key not in cached},
+            SLOT_CACHE_TTL,
+        )
+
+    return OrderedDict(
+        (day.isoformat(), cached[key] if key in cached else fresh[day.isoformat()])
+        for key, day in keys.items()
+    )
+
+
+def booked_slots_for_day(business, day):
+    """Booked intervals of a single local day"""
+    return booked_slots_for_range(business, day, day)[day.isoformat()]
+
+
+def invalidate_booked_slots(business_id, *start_times):
+    """Bump the versions of the days on which the given start times fall (None is ignored)"""
+    keys = {
+        _version_key(business_id, start_time.astimezone(LOCAL_TZ).date())
+        for start_time in start_times if start_time is not None
+    }
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No version yet (or it expired): any new one retires old entries
+            cache.set(key, _new_version(), SLOT_VERSION_TTL)
+    if keys:
+        slot_cache_stats.record(invalidations=len(keys))
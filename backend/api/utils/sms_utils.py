@@ -1,45 +1,61 @@
-import os
-from twilio.rest import Client
+from django.conf import settings
 from django.utils import timezone
 import pytz
 
-def send_sms(to_phone, message):
+from api.utils.provider_routing import ProviderNotConfigured, ProvidersUnavailable, provider_router
+from api.utils.providers import twilio_client
+
+def send_sms(to_phone, message, raise_errors=False):
     """
     Send SMS using Twilio
     
     Args:
         to_phone: Recipient phone number (format: +1234567890)
         message: SMS message text
+        raise_errors: Raise ProviderNotConfigured instead of returning False
+            when Twilio has no credentials (the notification queue gives up
+            on such jobs instead of retrying them), and ProvidersUnavailable
+            when Twilio's circuit is open (the job waits for it instead)
     
     Returns:
         bool: True if sent successfully, False otherwise
     """
-    try:
-        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-        from_phone = os.getenv('TWILIO_PHONE_NUMBER')
-        
-        if not all([account_sid, auth_token, from_phone]):
-            print("Twilio credentials not configured")
-            return False
-        
-        client = Client(account_sid, auth_token)
-        
-        message = client.messages.create(
+    client = twilio_client()
+    from_phone = settings.TWILIO_PHONE_NUMBER
+
+    if client is None or not from_phone:
+        if raise_errors:
+            raise ProviderNotConfigured(
+                'SMS not sent: Twilio is not configured '
+                '(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER)'
+            )
+        print("Twilio credentials not configured")
+        return False
+
+    def create(provider):
+        sent = client.messages.create(
             body=message,
             from_=from_phone,
             to=to_phone
         )
-        
-        print(f"SMS sent successfully. SID: {message.sid}")
+        print(f"SMS sent successfully. SID: {sent.sid}")
         return True
-        
-    except Exception as e:
-        print(f"Failed to send SMS: {str(e)}")
+
+    # Skipped at once while Twilio's circuit is open
+    try:
+        provider = provider_router.route(['twilio'], create)
+    except ProvidersUnavailable as e:
+        if raise_errors:
+            raise
+        print(f"SMS to {to_phone} not sent: {e}")
         return False
+    if provider is None:
+        print(f"Failed to send SMS to {to_phone}")
+        return False
+    return True
 
 
-def send_reservation_confirmation_sms(reservation):
+def send_reservation_confirmation_sms(reservation, raise_errors=False):
     """Send SMS notification for confirmed reservation"""
     customer_phone = reservation.customer_phone
     business_name = reservation.business.name if reservation.business else "the business"
@@ -59,10 +75,10 @@ def send_reservation_confirmation_sms(reservation):
         f"Ju presim!"
     )
     
-    return send_sms(customer_phone, message)
+    return send_sms(customer_phone, message, raise_errors=raise_errors)
 
 
-def send_reservation_cancelled_sms(reservation):
+def send_reservation_cancelled_sms(reservation, raise_errors=False):
     """Send SMS notification for cancelled/rejected reservation"""
     customer_phone = reservation.customer_phone
     business_name = reservation.business.name if reservation.business else "the business"
@@ -82,7 +98,30 @@ def send_reservation_cancelled_sms(reservation):
         f"Ju lutemi caktoni nje termin tjeter."
     )
     
-    return send_sms(customer_phone, message)
+    return send_sms(customer_phone, message, raise_errors=raise_errors)
+
+
+def send_reservation_reminder_sms(reservation, raise_errors=False):
+    """Send SMS reminder for an upcoming confirmed reservation"""
+    customer_phone = reservation.customer_phone
+    business_name = reservation.business.name if reservation.business else "the business"
+    
+    # Convert to local timezone (Europe/Berlin = Kosovo time)
+    local_tz = pytz.timezone('Europe/Berlin')
+    local_time = reservation.start_time.astimezone(local_tz)
+    
+    # Staff line if staff is assigned
+    staff_line = f"Stafi: {reservation.staff.name}\n" if reservation.staff else ""
+    
+    message = (
+        f"Kujtese: keni nje rezervim ne {business_name}.\n\n"
+        f"Data: {local_time.strftime('%d/%m/%Y')}\n"
+        f"Ora: {local_time.strftime('%H:%M')}\n"
+        f"{staff_line}\n"
+        f"Ju presim!"
+    )
+    
+    return send_sms(customer_phone, message, raise_errors=raise_errors)
 
 
 def send_admin_notification_sms(reservation, admin_phone):
@@ -103,3 +142,4 @@ def send_admin_notification_sms(reservation, admin_phone):
     )
     
     return send_sms(admin_phone, message)
+
@@ -0,0 +1,194 @@
+"""
+Per-worker registry of active businesses keyed by subdomain.
+
+TenantMiddleware resolves the tenant on every subdomain request. Public traffic
+is read-heavy and spread over a small set of subdomains, so the Business row is
+kept in process memory for a short time instead of being fetched on each hit.
+Entries expire after TENANT_CACHE_TTL seconds and the registry never holds more
+than TENANT_CACHE_MAX_SIZE subdomains (least recently used are evicted first).
+Saving or deleting a Business invalidates its entries in this worker (see
+api/signals.py); other workers pick up the change when their entry expires.
+A lookup that raced with an invalidation (the row was read before the save
+committed) does not store its result: every invalidated subdomain and
+business id records the invalidation sequence number, and a result is only
+cached if neither was invalidated after the lookup started. Those records
+only matter to lookups still in flight, so they are pruned down to the
+oldest running lookup whenever one finishes.
+
+Lookups that find nothing are remembered too, in a separate and shorter-lived
+negative cache, and hosts that can never be a business subdomain (see
+InputSanitizer.is_valid_subdomain) are rejected without a query at all. This
+keeps scanners probing random subdomains away from the database.
+"""
+import copy
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+
+from api.models import Business
+from api.utils.input_sanitizer import InputSanitizer
+
+
+class TenantRegistry:
+    """Bounded TTL cache of subdomain -> Business snapshot with hit/miss counters."""
+
+    def __init__(self, ttl=300, max_size=5000, negative_ttl=30, negative_max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self.negative_max_size = negative_max_size
+        self._entries = OrderedDict()  # subdomain -> (expires_at, business)
+        self._missing = OrderedDict()  # subdomain -> expires_at
+        self._invalidated_at = {}  # subdomain or ('pk', business id) -> invalidation sequence
+        self._sequence = 0
+        self._in_flight = Counter()  # sequence a running lookup started at -> count
+        self._cleared_at = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.negative_hits = 0
+        self.negative_evictions = 0
+        self.rejected = 0
+
+    def get(self, subdomain):
+        """
+        Return a copy of the active Business for subdomain, or None.
+        Copies are handed out so a view mutating request.tenant never
+        changes the shared snapshot.
+        """
+        if not InputSanitizer.is_valid_subdomain(subdomain):
+            with self._lock:
+                self.rejected += 1
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subdomain)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(subdomain)
+                self.hits += 1
+                return copy.copy(entry[1])
+            if entry is not None:
+                del self._entries[subdomain]
+
+            missing_until = self._missing.get(subdomain)
+            if missing_until is not None and missing_until > now:
+                self.negative_hits += 1
+                return None
+            if missing_until is not None:
+                del self._missing[subdomain]
+            self.misses += 1
+            started_at = self._sequence
+            self._in_flight[started_at] += 1
+
+        try:
+            business = self._load(subdomain)
+            if business is not None:
+                self._store(subdomain, business, started_at)
+                return copy.copy(business)
+            self._store_missing(subdomain, started_at)
+            return None
+        finally:
+            self._finish(started_at)
+
+    def _finish(self, started_at):
+        """Forget invalidations no running lookup can be affected by"""
+        with self._lock:
+            self._in_flight[started_at] -= 1
+            if not self._in_flight[started_at]:
+                del self._in_flight[started_at]
+            if not self._in_flight:
+                self._invalidated_at.clear()
+                return
+            oldest = min(self._in_flight)
+            for key in [key for key, sequence in self._invalidated_at.items() if sequence <= oldest]:
+                del self._invalidated_at[key]
+
+    def _load(self, subdomain):
+        try:
+            return Business.objects.get(subdomain=subdomain, is_active=True)
+        except (Business.DoesNotExist, Business.MultipleObjectsReturned):
+            return None
+
+    def _changed_since(self, started_at, *keys):
+        if self._cleared_at > started_at:
+            return True
+        return any(self._invalidated_at.get(key, 0) > started_at for key in keys)
+
+    def _store(self, subdomain, business, started_at):
+        with self._lock:
+            if self._changed_since(started_at, subdomain, ('pk', business.pk)):
+                return
+            self._entries[subdomain] = (time.monotonic() + self.ttl, business)
+            self._entries.move_to_end(subdomain)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _store_missing(self, subdomain, started_at):
+        with self._lock:
+            if self._changed_since(started_at, subdomain):
+                return
+            self._missing[subdomain] = time.monotonic() + self.negative_ttl
+            self._missing.move_to_end(subdomain)
+            while len(self._missing) > self.negative_max_size:
+                self._missing.popitem(last=False)
+                self.negative_evictions += 1
+
+    def invalidate_business(self, business):
+        """Drop cached entries for a business, including under a previous subdomain."""
+        with self._lock:
+            stale = [
+                key for key, (_, cached) in self._entries.items()
+                if key == business.subdomain or cached.pk == business.pk
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            # Lookups still in flight for this business must not cache what they read
+            self._sequence += 1
+            if self._in_flight:
+                for key in {business.subdomain, ('pk', business.pk), *stale}:
+                    self._invalidated_at[key] = self._sequence
+            # A new or reactivated business must not stay hidden behind a cached miss
+            self._missing.pop(business.subdomain, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._missing.clear()
+            self._sequence += 1
+            self._invalidated_at.clear()
+            self._cleared_at = self._sequence
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'negative_size': len(self._missing),
+                'negative_max_size': self.negative_max_size,
+                'negative_ttl_seconds': self.negative_ttl,
+                'negative_hits': self.negative_hits,
+                'negative_evictions': self.negative_evictions,
+                'rejected': self.rejected,
+            }
+
+
+tenant_registry = TenantRegistry(
+    ttl=getattr(settings, 'TENANT_CACHE_TTL', 300),
+    max_size=getattr(settings, 'TENANT_CACHE_MAX_SIZE', 5000),
+    negative_ttl=getattr(settings, 'TENANT_NEGATIVE_CACHE_TTL', 30),
+    negative_max_size=getattr(settings, 'TENANT_NEGATIVE_CACHE_MAX_SIZE', 10000),
+)
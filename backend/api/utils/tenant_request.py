@@ -1,5 +1,8 @@
 """Resolve Business from request when Host has no subdomain (e.g. API on localhost)."""
-from api.models import Business
+from api.middleware import get_current_tenant
+from api.utils.tenant_cache import tenant_registry
+
+_UNRESOLVED = object()
 
 
 def get_tenant_from_request(request):
@@ -19,7 +22,19 @@ def get_tenant_from_request(request):
     subdomain = request.META.get('HTTP_X_SUBDOMAIN') or body_sub or query_sub
     if not subdomain:
         return None
-    try:
-        return Business.objects.get(subdomain=subdomain.strip().lower(), is_active=True)
-    except (Business.DoesNotExist, Business.MultipleObjectsReturned):
-        return None
+    return tenant_registry.get(subdomain.strip().lower())
+
+
+def resolve_request_tenant(request):
+    """
+    Business for this request, resolved once and memoized on the request.
+    Host subdomain (TenantMiddleware) wins, then get_tenant_from_request().
+    The serializer, the view and any helper of the same request share the result.
+    """
+    # DRF wraps the Django request; memoize on the underlying one so both see it
+    http_request = getattr(request, '_request', request)
+    tenant = getattr(http_request, '_resolved_tenant', _UNRESOLVED)
+    if tenant is _UNRESOLVED:
+        tenant = get_current_tenant() or get_tenant_from_request(request)
+        http_request._resolved_tenant = tenant
+    return tenant
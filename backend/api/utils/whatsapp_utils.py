@@ -3,12 +3,16 @@ WhatsApp utilities for sending messages via Twilio or Ultramsg
 """
 from django.conf import settings
 import logging
-import requests
+
+from api.utils.provider_routing import (
+    ProviderError, ProviderNotConfigured, ProvidersUnavailable, provider_router
+)
+from api.utils.providers import http_session, http_timeout, twilio_client
 
 logger = logging.getLogger(__name__)
 
 
-def send_whatsapp_twilio(to_phone, message_type, reservation, business):
+def send_whatsapp_twilio(to_phone, message_type, reservation, business, raise_errors=False):
     """
     Send WhatsApp message using Twilio (Official WhatsApp Business API)
     
@@ -17,23 +21,19 @@ def send_whatsapp_twilio(to_phone, message_type, reservation, business):
         message_type: 'confirmed' or 'rejected'
         reservation: Reservation object
         business: Business object
+        raise_errors: Raise provider errors instead of returning False
+            (used by the provider router to judge provider health)
         
     Returns:
         bool: True if message sent successfully, False otherwise
     """
     try:
-        from twilio.rest import Client
-        
         # Check if Twilio is configured
-        if not settings.TWILIO_ACCOUNT_SID or not settings.TWILIO_AUTH_TOKEN:
+        client = twilio_client()
+        if client is None:
             logger.warning('⚠️ Twilio not configured, skipping WhatsApp')
             return False
         
-        client = Client(
-            settings.TWILIO_ACCOUNT_SID,
-            settings.TWILIO_AUTH_TOKEN
-        )
-        
         # WhatsApp requires 'whatsapp:' prefix
         to_whatsapp = f'whatsapp:{to_phone}'
         from_number = settings.TWILIO_WHATSAPP_NUMBER
@@ -73,11 +73,13 @@ def send_whatsapp_twilio(to_phone, message_type, reservation, business):
         return True
         
     except Exception as e:
+        if raise_errors:
+            raise
         logger.error(f'❌ Failed to send WhatsApp via Twilio to {to_phone}: {str(e)}')
         return False
 
 
-def send_whatsapp_ultramsg(to_phone, message_type, reservation, business):
+def send_whatsapp_ultramsg(to_phone, message_type, reservation, business, raise_errors=False):
     """
     Send WhatsApp message using Ultramsg (Unofficial API - for testing)
     
@@ -86,6 +88,8 @@ def send_whatsapp_ultramsg(to_phone, message_type, reservation, business):
         message_type: 'confirmed' or 'rejected'
         reservation: Reservation object
         business: Business object
+        raise_errors: Raise provider errors instead of returning False
+            (used by the provider router to judge provider health)
         
     Returns:
         bool: True if message sent successfully, False otherwise
@@ -123,7 +127,7 @@ def send_whatsapp_ultramsg(to_phone, message_type, reservation, business):
             return False
         
         # Ultramsg API endpoint
-        url = f"https://api.ultramsg.com/{settings.ULTRAMSG_INSTANCE_ID}/messages/chat"
+        url = f"{settings.ULTRAMSG_API_URL.rstrip('/')}/{settings.ULTRAMSG_INSTANCE_ID}/messages/chat"
         
         payload = {
             'token': settings.ULTRAMSG_TOKEN,
@@ -131,48 +135,69 @@ def send_whatsapp_ultramsg(to_phone, message_type, reservation, business):
             'body': message
         }
         
-        response = requests.post(url, data=payload, timeout=10)
+        response = http_session().post(url, data=payload, timeout=http_timeout())
         
         if response.status_code == 200:
             logger.info(f'✅ WhatsApp sent via Ultramsg to {to_phone}')
             return True
         else:
+            if raise_errors:
+                raise ProviderError('ultramsg', response.status_code, response.text)
             logger.error(f'❌ WhatsApp failed via Ultramsg: {response.text}')
             return False
         
     except Exception as e:
+        if raise_errors:
+            raise
         logger.error(f'❌ Failed to send WhatsApp via Ultramsg to {to_phone}: {str(e)}')
         return False
 
 
-def send_whatsapp_message(to_phone, message_type, reservation, business):
+def send_whatsapp_message(to_phone, message_type, reservation, business, raise_errors=False):
     """
     Send WhatsApp message using configured provider (Twilio or Ultramsg)
     
-    Tries Twilio first (if configured), falls back to Ultramsg
+    Routed by api/utils/provider_routing.py: configured providers are tried
+    fastest first (Twilio before Ultramsg until both have been measured) and
+    a provider whose circuit is open is skipped without waiting on it
     
     Args:
         to_phone: Customer phone number (e.g., "+38344123456")
         message_type: 'confirmed' or 'rejected'
         reservation: Reservation object
         business: Business object
+        raise_errors: Raise ProviderNotConfigured instead of returning False
+            when neither provider has credentials, and ProvidersUnavailable
+            when every configured provider's circuit is open
         
     Returns:
         bool: True if message sent successfully, False otherwise
     """
-    # Try Twilio first (official API)
+    providers = []
     if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
-        logger.info('📱 Attempting to send WhatsApp via Twilio...')
-        result = send_whatsapp_twilio(to_phone, message_type, reservation, business)
-        if result:
-            return True
-    
-    # Fall back to Ultramsg (unofficial API)
+        providers.append('twilio')
     if settings.ULTRAMSG_INSTANCE_ID and settings.ULTRAMSG_TOKEN:
-        logger.info('📱 Attempting to send WhatsApp via Ultramsg...')
-        result = send_whatsapp_ultramsg(to_phone, message_type, reservation, business)
-        if result:
-            return True
-    
-    logger.warning('⚠️ No WhatsApp provider configured (Twilio or Ultramsg)')
-    return False
+        providers.append('ultramsg')
+    if not providers:
+        if raise_errors:
+            raise ProviderNotConfigured(
+                'WhatsApp not sent: no provider is configured (Twilio or Ultramsg credentials)'
+            )
+        logger.warning('⚠️ No WhatsApp provider configured (Twilio or Ultramsg)')
+        return False
+
+    senders = {'twilio': send_whatsapp_twilio, 'ultramsg': send_whatsapp_ultramsg}
+    try:
+        provider = provider_router.route(
+            providers,
+            lambda name: senders[name](to_phone, message_type, reservation, business, raise_errors=True),
+        )
+    except ProvidersUnavailable as e:
+        if raise_errors:
+            raise
+        logger.warning(f'⚠️ WhatsApp to {to_phone}: {e}')
+        return False
+    if provider is None:
+        logger.warning(f'⚠️ WhatsApp to {to_phone} not sent: every provider failed')
+        return False
+    return True
@@ -2,5 +2,8 @@ from .auth import RegisterView, MeView
 from .reservation import ReservationViewSet
 from .user import UserViewSet
 from .dashboard import dashboard_stats
+from .metrics import system_metrics
+from .notification import notification_status
+from .providers import provider_status
 from .business import BusinessViewSet
 from .staff import StaffViewSet
@@ -0,0 +1,26 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from api.utils.booking_locks import booking_lock_stats
+from api.utils.mail_pool import smtp_pool_stats
+from api.utils.notifications import notification_executor
+from api.utils.provider_routing import provider_router
+from api.utils.slots import slot_cache_stats
+from api.utils.tenant_cache import tenant_registry
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def system_metrics(request):
+    """In-process counters of the worker that served this request (super admin only)"""
+    if not request.user.is_super_admin:
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    return Response({
+        'tenant_cache': tenant_registry.stats(),
+        'booked_slots_cache': slot_cache_stats.stats(),
+        'booking_locks': booking_lock_stats.stats(),
+        'notification_executor': notification_executor.stats(),
+        'smtp_pool': smtp_pool_stats.stats(),
+        'provider_routing': provider_router.stats(),
+    })
@@ -0,0 +1,21 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from api.models import NotificationJob
+from api.serializers import NotificationJobSerializer
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_status(request, job_id):
+    """Delivery outcome of a notification ticket (its business owner or super admin)"""
+    jobs = NotificationJob.objects.all()
+    if not request.user.is_super_admin:
+        if not (request.user.is_business_owner and request.user.business):
+            return Response({'error': 'Permission denied'}, status=403)
+        jobs = jobs.filter(business=request.user.business)
+
+    job = jobs.filter(pk=job_id).first()
+    if job is None:
+        return Response({'error': 'Notification not found'}, status=404)
+    return Response(NotificationJobSerializer(job).data)
@@ -0,0 +1,23 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from api.utils.provider_routing import provider_router
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def provider_status(request):
+    """
+    SMS/WhatsApp provider routing state of this worker (super admin only).
+    POST {"provider": "twilio"} closes that provider's circuit by hand.
+    """
+    if not request.user.is_super_admin:
+        return Response({'error': 'Super admin access required'}, status=403)
+
+    if request.method == 'POST':
+        name = request.data.get('provider')
+        if name not in provider_router.stats()['providers']:
+            return Response({'error': 'Unknown provider'}, status=400)
+        provider_router.reset(name)
+
+    return Response(provider_router.stats())
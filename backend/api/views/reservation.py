@@ -1,23 +1,82 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from api.models import Reservation
-from api.serializers import ReservationSerializer
+from api.models import Business, Reservation
+from api.serializers import ReservationSerializer, ReservationListSerializer
+from api.pagination import ReservationCursorPagination
 from api.middleware import get_current_tenant
-from api.utils.tenant_request import get_tenant_from_request
-from api.utils.sms_utils import send_reservation_confirmation_sms, send_reservation_cancelled_sms, send_admin_notification_sms
-from api.utils.email_utils import send_new_reservation_email_async
+from api.utils.tenant_request import resolve_request_tenant
+from api.utils.sms_utils import send_admin_notification_sms
+from api.utils.notifications import enqueue_new_reservation_email, enqueue_status_notifications
+from api.utils.slots import MAX_RANGE_DAYS, booked_slots_for_day, booked_slots_for_range, invalidate_booked_slots
+from api.utils.availability import compute_availability
+from api.utils.overlap import ReservationOverlap, overlap_guard, overlapping_reservations
+from api.utils.booking_locks import booking_lock
+from api.utils.reservation_import import ImportFormatError, import_reservations, parse_rows, rows_from_payload
+from django.conf import settings
+from django.urls import reverse
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Statuses an owner can set
+BULK_STATUSES = ('pending', 'confirmed', 'rejected', 'canceled')
+BULK_STATUS_MAX_IDS = 500
+
 
 class ReservationViewSet(viewsets.ModelViewSet):
     serializer_class = ReservationSerializer
     permission_classes = []  # No authentication required for public booking
+    pagination_class = ReservationCursorPagination  # ?page_size= / ?cursor=, see api/pagination.py
+
+    # Read actions that honour ?fields=a,b,c (sparse fieldsets)
+    sparse_fieldset_actions = ('list', 'retrieve', 'lookup')
+
+    def get_sparse_fields(self):
+        """
+        Field names requested with ?fields=, or None for the default representation.
+        Any field of ReservationSerializer may be requested; unknown names are a 400.
+        """
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            raw = self.request.query_params.get('fields') if self.request else None
+            if raw and self.action in self.sparse_fieldset_actions:
+                requested = {name.strip() for name in raw.split(',') if name.strip()}
+                unknown = requested - set(ReservationSerializer.Meta.fields)
+                if unknown:
+                    raise ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+                self._sparse_fields = requested
+        return self._sparse_fields
+
+    def get_serializer_class(self):
+        # Compact representation by default for lists; ?fields= picks from the full one
+        if self.action == 'list' and self.get_sparse_fields() is None:
+            return ReservationListSerializer
+        return ReservationSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
+        """
+        Reservations visible in this context, joined with exactly the relations
+        the action's serializer reads (and, where possible, selecting only the
+        columns it reads) so list responses cost a single lean query.
+        """
+        return self.get_serializer_class().setup_eager_loading(
+            self.get_scoped_queryset(), fields=self.get_sparse_fields()
+        )
+
+    def get_scoped_queryset(self):
         """
         Get reservations based on context:
         - Subdomain context: All reservations for that business (public view)
@@ -43,6 +102,69 @@ class ReservationViewSet(viewsets.ModelViewSet):
         # No access for unauthenticated users on main domain
         return Reservation.objects.none()
 
+    def filter_queryset(self, queryset):
+        """
+        Server-side list filters (combinable):
+        - start / end: YYYY-MM-DD (business-local day) or ISO datetime; keeps
+          reservations starting in [start, end). A date for end includes that day.
+        - status: one or more comma-separated statuses
+        - staff: staff id, or "none" for unassigned reservations
+        Shapes match the (business, start_time), (business, status) and
+        active-status partial indexes on Reservation.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+
+        params = self.request.query_params
+        start = self._parse_range_param('start')
+        end = self._parse_range_param('end', end_of_day=True)
+        if start is not None:
+            queryset = queryset.filter(start_time__gte=start)
+        if end is not None:
+            queryset = queryset.filter(start_time__lt=end)
+
+        status_param = params.get('status')
+        if status_param:
+            statuses = {value.strip() for value in status_param.split(',') if value.strip()}
+            valid = {choice for choice, _ in Reservation.STATUS_CHOICES}
+            if not statuses <= valid:
+                raise ValidationError({'status': f"Must be one of: {', '.join(sorted(valid))}"})
+            queryset = queryset.filter(status__in=sorted(statuses))
+
+        staff_param = params.get('staff')
+        if staff_param:
+            if staff_param.lower() == 'none':
+                queryset = queryset.filter(staff__isnull=True)
+            elif staff_param.isdigit():
+                queryset = queryset.filter(staff_id=int(staff_param))
+            else:
+                raise ValidationError({'staff': 'Must be a staff id or "none"'})
+
+        return queryset
+
+    def _parse_range_param(self, name, end_of_day=False):
+        """Aware datetime for a start/end query param; dates are local business days"""
+        raw = self.request.query_params.get(name)
+        if not raw:
+            return None
+        try:
+            # Dates first: parse_datetime() would also accept a bare date as midnight
+            day = parse_date(raw)
+            if day is not None:
+                if end_of_day:
+                    day += timedelta(days=1)
+                value = datetime.combine(day, time.min)
+            else:
+                value = parse_datetime(raw)
+                if value is None:
+                    raise ValueError
+        except ValueError:
+            raise ValidationError({name: 'Use YYYY-MM-DD or an ISO 8601 datetime'})
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
     def create(self, request, *args, **kwargs):
         """Remove subdomain from body before validation (used only to resolve tenant)."""
         data = request.data.copy() if request.data else {}
@@ -59,29 +181,44 @@ class ReservationViewSet(viewsets.ModelViewSet):
         Public (simple) clients can create without login when business is identified
         by subdomain (from Host header or X-Subdomain / body).
         """
-        tenant = get_current_tenant() or get_tenant_from_request(self.request)
+        # Already resolved (and memoized on the request) by ReservationSerializer.validate
+        tenant = resolve_request_tenant(self.request)
 
         if tenant:
             # Subdomain context or subdomain from frontend - no auth required
-            reservation = serializer.save(business=tenant, status='pending')
-            # Notify owner via SMTP without blocking the response (see email_utils).
-            transaction.on_commit(
-                lambda rid=str(reservation.id): send_new_reservation_email_async(rid)
-            )
+            # Owner email is queued with the insert (see api/utils/notifications.py)
+            self._save_new_reservation(serializer, tenant, status='pending')
             # DO NOT send SMS to customer on creation - only when BO confirms/rejects
         else:
             # Main domain, no subdomain - require authentication and business
             if not self.request.user.is_authenticated:
-                from rest_framework.exceptions import ValidationError
                 raise ValidationError("No business context found. Please use a valid booking link.")
             if self.request.user.is_business_owner and self.request.user.business:
-                reservation = serializer.save(business=self.request.user.business)
-                transaction.on_commit(
-                    lambda rid=str(reservation.id): send_new_reservation_email_async(rid)
-                )
+                self._save_new_reservation(serializer, self.request.user.business)
             else:
                 raise PermissionError("No business context available")
 
+    def _save_new_reservation(self, serializer, business, **extra):
+        """
+        Insert the reservation and its owner-email job in one transaction.
+        Tenants with serialize_bookings queue conflicting creates on advisory
+        locks (see api/utils/booking_locks.py) and re-check overlaps once they
+        hold the lock.
+        """
+        with transaction.atomic():
+            if business.serialize_bookings:
+                data = serializer.validated_data
+                staff = data.get('staff')
+                staff_id = staff.pk if staff else None
+                with booking_lock(business, staff_id, data['start_time'], data['end_time']):
+                    if overlapping_reservations(business, data['start_time'], data['end_time'], staff_id).exists():
+                        raise ReservationOverlap()
+                    reservation = serializer.save(business=business, **extra)
+            else:
+                reservation = serializer.save(business=business, **extra)
+            enqueue_new_reservation_email(reservation, business)
+        return reservation
+
     def perform_update(self, serializer):
         """
         Update reservation with permission checks
@@ -149,9 +286,9 @@ class ReservationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        reservations = Reservation.objects.filter(
-            business=tenant,
-            customer_phone=phone
+        reservations = self.get_serializer_class().setup_eager_loading(
+            Reservation.objects.filter(business=tenant, customer_phone=phone),
+            fields=self.get_sparse_fields(),
         ).order_by('-created_at')
         
         serializer = self.get_serializer(reservations, many=True)
@@ -163,27 +300,25 @@ class ReservationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[])
     def booked_slots(self, request):
         """
-        Get booked time intervals for a specific date (local business day).
+        Get booked time intervals for a specific date (local business day),
+        or for every day of a range in one call (calendar month view).
         Pending and confirmed reservations block the slot picker so the same time
         cannot be selected twice; confirmed stays blocked after acceptance.
-        Query params: date (YYYY-MM-DD), subdomain (optional)
+        Query params: date (YYYY-MM-DD), or from + to (YYYY-MM-DD, inclusive,
+        at most MAX_RANGE_DAYS days); subdomain (optional)
         """
-        from datetime import datetime, timedelta
-        import pytz
-        
         date_str = request.query_params.get('date')
-        subdomain = request.query_params.get('subdomain')
+        from_str = request.query_params.get('from')
+        to_str = request.query_params.get('to')
         
-        if not date_str:
+        if not date_str and not (from_str and to_str):
             return Response(
-                {'error': 'Date parameter is required (YYYY-MM-DD)'}, 
+                {'error': 'Date parameter is required (YYYY-MM-DD), or from and to for a range'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Get tenant from subdomain or current context
-        tenant = get_current_tenant()
-        if not tenant and subdomain:
-            tenant = get_tenant_from_request(request)
+        tenant = resolve_request_tenant(request)
         
         if not tenant:
             return Response(
@@ -192,51 +327,224 @@ class ReservationViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            # Parse date
-            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            
-            # Use Europe/Berlin timezone (same as settings.TIME_ZONE)
-            local_tz = pytz.timezone('Europe/Berlin')
-            
-            # Get start and end of day in local timezone
-            start_of_day = local_tz.localize(datetime.combine(target_date, datetime.min.time()))
-            end_of_day = local_tz.localize(datetime.combine(target_date, datetime.max.time()))
-            
-            reservations = Reservation.objects.filter(
-                business=tenant,
-                start_time__gte=start_of_day,
-                start_time__lte=end_of_day,
-                status__in=['pending', 'confirmed'],
-            ).values('start_time', 'end_time')
-            
-            # Format booked slots as time strings in local timezone
-            booked_slots = []
-            for reservation in reservations:
-                # Convert UTC times to local timezone
-                start_time_local = reservation['start_time'].astimezone(local_tz)
-                end_time_local = reservation['end_time'].astimezone(local_tz)
-                
-                booked_slots.append({
-                    'start': start_time_local.strftime('%H:%M'),
-                    'end': end_time_local.strftime('%H:%M')
+            if date_str:
+                target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+                return Response({
+                    'date': date_str,
+                    'booked_slots': booked_slots_for_day(tenant, target_date)
                 })
-            
-            return Response({
-                'date': date_str,
-                'booked_slots': booked_slots
-            })
-            
+
+            first_day = datetime.strptime(from_str, '%Y-%m-%d').date()
+            last_day = datetime.strptime(to_str, '%Y-%m-%d').date()
         except ValueError:
             return Response(
                 {'error': 'Invalid date format. Use YYYY-MM-DD'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+        span = (last_day - first_day).days + 1
+        if span < 1 or span > MAX_RANGE_DAYS:
+            return Response(
+                {'error': f'Range must run forward and span at most {MAX_RANGE_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'from': from_str,
+            'to': to_str,
+            'booked_slots': booked_slots_for_range(tenant, first_day, last_day)
+        })
     
+    @action(detail=False, methods=['get'], permission_classes=[])
+    def availability(self, request):
+        """
+        Free time per active staff member for each local day of a range:
+        business hours minus rest days and pending/confirmed reservations
+        (unassigned reservations block every staff member).
+        Query params: from, to (YYYY-MM-DD, inclusive, at most MAX_RANGE_DAYS days),
+        staff (optional id), duration (optional minutes: also list bookable
+        start times), subdomain (optional)
+        """
+        tenant = resolve_request_tenant(request)
+        if not tenant:
+            return Response(
+                {'error': 'Business context required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = request.query_params
+        try:
+            first_day = datetime.strptime(params.get('from', ''), '%Y-%m-%d').date()
+            last_day = datetime.strptime(params.get('to', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'from and to are required (YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        span = (last_day - first_day).days + 1
+        if span < 1 or span > MAX_RANGE_DAYS:
+            return Response(
+                {'error': f'Range must run forward and span at most {MAX_RANGE_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        staff_param = params.get('staff')
+        duration_param = params.get('duration')
+        if staff_param and not staff_param.isdigit():
+            return Response({'error': 'staff must be a staff id'}, status=status.HTTP_400_BAD_REQUEST)
+        if duration_param and not (duration_param.isdigit() and 5 <= int(duration_param) <= 480):
+            return Response(
+                {'error': 'duration must be a number of minutes between 5 and 480'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        staff = compute_availability(
+            tenant,
+            first_day,
+            last_day,
+            staff_id=int(staff_param) if staff_param else None,
+            duration=timedelta(minutes=int(duration_param)) if duration_param else None,
+        )
+        return Response({
+            'from': first_day.isoformat(),
+            'to': last_day.isoformat(),
+            'business_hours_start': tenant.business_hours_start.strftime('%H:%M'),
+            'business_hours_end': tenant.business_hours_end.strftime('%H:%M'),
+            'staff': staff,
+        })
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Import existing appointments in one request (see api/utils/reservation_import.py).
+        Body: a JSON list / {"reservations": [...]}, or a multipart "file" (.csv or .json).
+        Query params: dry_run=1 validates without inserting; business=<id> (super admin only)
+        Returns a per-row error report; valid rows are inserted even if others fail.
+        """
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        if user.is_super_admin:
+            try:
+                business = Business.objects.filter(pk=request.query_params.get('business')).first()
+            except DjangoValidationError:
+                business = None  # not a UUID
+        elif user.is_business_owner:
+            business = user.business
+        else:
+            business = None
+        if business is None:
+            return Response(
+                {'error': 'Business context required (super admins pass ?business=<id>)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                fmt = 'csv' if upload.name.lower().endswith('.csv') else 'json'
+                rows = parse_rows(upload.read().decode('utf-8-sig'), fmt)
+            else:
+                rows = rows_from_payload(request.data)
+        except (ImportFormatError, UnicodeDecodeError) as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_rows = getattr(settings, 'RESERVATION_IMPORT_MAX_ROWS', 5000)
+        if len(rows) > max_rows:
+            return Response(
+                {'error': f'At most {max_rows} rows per request; use the import_reservations command for more'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        dry_run = request.query_params.get('dry_run') in ('1', 'true')
+        report = import_reservations(business, rows, dry_run=dry_run)
+        logger.info(
+            f'📥 Imported {report["created"]}/{report["total"]} reservations for {business.subdomain}'
+            f'{" (dry run)" if dry_run else ""}'
+        )
+        return Response(report)
+
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """
+        Apply one status transition to many reservations with a single UPDATE.
+        Body: {"ids": [1, 2, ...], "status": "confirmed"}
+        Only reservations the user may manage are touched (filtered in SQL);
+        customer SMS for the changed rows is queued as one batch of notification jobs.
+        """
+        new_status = request.data.get('status')
+        ids = request.data.get('ids')
+
+        if new_status not in BULK_STATUSES:
+            return Response(
+                {'error': f"Invalid status. Must be: {', '.join(BULK_STATUSES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (not isinstance(ids, list) or not ids or len(ids) > BULK_STATUS_MAX_IDS
+                or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)):
+            return Response(
+                {'error': f'ids must be a list of 1 to {BULK_STATUS_MAX_IDS} reservation ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        queryset = Reservation.objects.filter(pk__in=ids)
+        if user.is_super_admin:
+            pass
+        elif user.is_business_owner and user.business:
+            queryset = queryset.filter(business=user.business)
+        else:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        with overlap_guard(), transaction.atomic():
+            rows = list(
+                queryset.select_for_update().only('id', 'business_id', 'start_time', 'status', 'customer_phone')
+            )
+            changed = [reservation for reservation in rows if reservation.status != new_status]
+            changed_ids = [reservation.pk for reservation in changed]
+            jobs = []
+            if changed_ids:
+                # Re-activating bookings can trip the exclusion constraint (409 for the batch)
+                Reservation.objects.filter(pk__in=changed_ids).update(
+                    status=new_status, updated_at=timezone.now()
+                )
+
+                # update() bypasses post_save: clear the slot cache per business here
+                start_times_by_business = {}
+                for reservation in changed:
+                    start_times_by_business.setdefault(reservation.business_id, []).append(reservation.start_time)
+                for business_id, start_times in start_times_by_business.items():
+                    transaction.on_commit(
+                        lambda b=business_id, times=start_times: invalidate_booked_slots(b, *times)
+                    )
+
+                # One batch of notification jobs for the worker (see api/utils/notifications.py)
+                jobs = enqueue_status_notifications(changed, new_status)
+
+        found = {reservation.pk for reservation in rows}
+        logger.info(f'📝 Bulk status → {new_status}: {len(changed_ids)} of {len(ids)} reservations updated')
+        return Response({
+            'new_status': new_status,
+            'updated': changed_ids,
+            'unchanged': sorted(found - set(changed_ids)),
+            'not_found': sorted(set(ids) - found),
+            'sms_notification': {
+                'queued': bool(jobs),
+                'count': len(jobs),
+                'tickets': [str(job.pk) for job in jobs],
+            },
+        })
+
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
         """
-        Update reservation status and send WhatsApp notification to customer
-        Returns detailed feedback about WhatsApp delivery status
+        Update reservation status and queue the SMS notification to the customer
+        Returns a delivery ticket; the outcome is reported by the notifications endpoint
         """
         reservation = self.get_object()
         new_status = request.data.get('status')
@@ -265,33 +573,17 @@ class ReservationViewSet(viewsets.ModelViewSet):
         # Update status
         old_status = reservation.status
         reservation.status = new_status
-        reservation.save()
+        # Re-activating a booking can collide with one made in the meantime
+        with overlap_guard(), transaction.atomic():
+            reservation.save()
+            # Customer message is delivered from the job queue, off the request path
+            jobs = enqueue_status_notifications([reservation], new_status)
         
         logger.info(f'📝 Reservation {reservation.id} status updated: {old_status} → {new_status}')
         
-        # Send SMS notification for confirmed/rejected/canceled status
-        sms_sent = False
-        sms_error = None
-        
-        if new_status in ['confirmed', 'rejected', 'canceled']:
-            try:
-                # Send correct message based on status
-                if new_status == 'confirmed':
-                    sms_sent = send_reservation_confirmation_sms(reservation)
-                elif new_status in ['rejected', 'canceled']:
-                    sms_sent = send_reservation_cancelled_sms(reservation)
-                
-                if sms_sent:
-                    logger.info(f'✅ SMS sent to {reservation.customer_phone} for reservation {reservation.id} (status: {new_status})')
-                else:
-                    logger.warning(f'⚠️ SMS not sent (Twilio not configured) for reservation {reservation.id}')
-                    sms_error = 'Twilio SMS not configured'
-                    
-            except Exception as e:
-                logger.error(f'❌ SMS failed for reservation {reservation.id}: {str(e)}')
-                sms_error = str(e)
-        
-        # Prepare response with detailed feedback
+        # Prepare response with detailed feedback; the SMS outcome is
+        # reported by GET /api/notifications/<ticket>/
+        ticket = jobs[0] if jobs else None
         serializer = self.get_serializer(reservation)
         response_data = {
             'reservation': serializer.data,
@@ -299,11 +591,16 @@ class ReservationViewSet(viewsets.ModelViewSet):
             'old_status': old_status,
             'new_status': new_status,
             'sms_notification': {
-                'sent': sms_sent,
-                'required': new_status in ['confirmed', 'rejected', 'canceled'],
-                'error': sms_error,
+                'sent': False,
+                'required': ticket is not None,
+                'status': ticket.status if ticket else None,
+                'ticket': str(ticket.pk) if ticket else None,
+                'status_url': request.build_absolute_uri(
+                    reverse('notification_status', args=[ticket.pk])
+                ) if ticket else None,
+                'error': None,
                 'customer_phone': reservation.customer_phone
             }
         }
         
-        return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(response_data, status=status.HTTP_200_OK)
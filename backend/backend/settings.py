@@ -186,6 +186,36 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Cache: use Redis when available so invalidations reach every gunicorn worker
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Booked slots per (business, day), invalidated on write (see api/utils/slots.py)
+BOOKED_SLOTS_CACHE_TTL = int(os.getenv('BOOKED_SLOTS_CACHE_TTL', '300'))  # seconds
+
+# Tenant resolution cache (per worker, see api/utils/tenant_cache.py)
+TENANT_CACHE_TTL = int(os.getenv('TENANT_CACHE_TTL', '300'))  # seconds
+TENANT_CACHE_MAX_SIZE = int(os.getenv('TENANT_CACHE_MAX_SIZE', '5000'))
+TENANT_NEGATIVE_CACHE_TTL = int(os.getenv('TENANT_NEGATIVE_CACHE_TTL', '30'))  # unknown subdomains
+TENANT_NEGATIVE_CACHE_MAX_SIZE = int(os.getenv('TENANT_NEGATIVE_CACHE_MAX_SIZE', '10000'))
+
+# Advisory-lock booking mode (Business.serialize_bookings, see api/utils/booking_locks.py)
+BOOKING_LOCK_CONTENDED_MS = int(os.getenv('BOOKING_LOCK_CONTENDED_MS', '5'))  # waits counted as contention
+
+# Bulk reservation import (POST /api/reservations/import/)
+RESERVATION_IMPORT_MAX_ROWS = int(os.getenv('RESERVATION_IMPORT_MAX_ROWS', '5000'))
+
 # CORS Settings - Allow frontend to access backend
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  
@@ -207,18 +237,55 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Email Settings (Gmail SMTP - Synchronous)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '587'))
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() in ('1', 'true', 'yes')
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('EMAIL_HOST_USER')
 ADMIN_EMAIL = os.getenv('ADMIN_EMAIL')
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '20'))  # seconds; a hung SMTP server must not hold a thread forever
+SMTP_KEEPALIVE_SECONDS = int(os.getenv('SMTP_KEEPALIVE_SECONDS', '30'))  # NOOP-probe pooled connections idle longer than this
 
 # SMS Settings - Twilio
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', '')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '')
+TWILIO_WHATSAPP_NUMBER = os.getenv('TWILIO_WHATSAPP_NUMBER', '')
+
+# Ultramsg (WhatsApp fallback, testing only)
+ULTRAMSG_INSTANCE_ID = os.getenv('ULTRAMSG_INSTANCE_ID', '')
+ULTRAMSG_TOKEN = os.getenv('ULTRAMSG_TOKEN', '')
+ULTRAMSG_API_URL = os.getenv('ULTRAMSG_API_URL', 'https://api.ultramsg.com')
+
+# Provider HTTP clients (see api/utils/providers.py)
+TWILIO_API_BASE_URL = os.getenv('TWILIO_API_BASE_URL', '')  # only to point Twilio at a local stand-in
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv('PROVIDER_CONNECT_TIMEOUT', '3.05'))  # seconds
+PROVIDER_READ_TIMEOUT = float(os.getenv('PROVIDER_READ_TIMEOUT', '10'))  # seconds
+PROVIDER_POOL_SIZE = int(os.getenv('PROVIDER_POOL_SIZE', '10'))  # keep-alive connections per host and thread
+
+# Provider circuit breakers (see api/utils/provider_routing.py)
+PROVIDER_BREAKER_FAILURES = int(os.getenv('PROVIDER_BREAKER_FAILURES', '3'))  # consecutive failures that open a circuit
+PROVIDER_BREAKER_COOLDOWN = int(os.getenv('PROVIDER_BREAKER_COOLDOWN', '30'))  # seconds before a trial call
+PROVIDER_PROBE_EVERY = int(os.getenv('PROVIDER_PROBE_EVERY', '20'))  # every Nth message ignores latency ordering
+
+# Notification job queue (see api/utils/notifications.py)
+# With the worker enabled, requests only enqueue; run_notification_worker delivers
+NOTIFICATION_WORKER_ENABLED = os.getenv('NOTIFICATION_WORKER_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '5'))
+NOTIFICATION_BACKOFF_BASE = int(os.getenv('NOTIFICATION_BACKOFF_BASE', '30'))  # seconds, doubled per attempt
+NOTIFICATION_BACKOFF_MAX = int(os.getenv('NOTIFICATION_BACKOFF_MAX', '3600'))  # seconds
+NOTIFICATION_LOCK_TIMEOUT = int(os.getenv('NOTIFICATION_LOCK_TIMEOUT', '300'))  # re-claim jobs of dead workers
+CUSTOMER_NOTIFICATION_CHANNEL = os.getenv('CUSTOMER_NOTIFICATION_CHANNEL', 'sms')  # 'sms' or 'whatsapp'
+# In-process delivery without a worker: bounded thread pool, drained on gunicorn worker exit
+NOTIFICATION_EXECUTOR_THREADS = int(os.getenv('NOTIFICATION_EXECUTOR_THREADS', '4'))
+NOTIFICATION_EXECUTOR_QUEUE_SIZE = int(os.getenv('NOTIFICATION_EXECUTOR_QUEUE_SIZE', '200'))
+NOTIFICATION_EXECUTOR_DRAIN_TIMEOUT = int(os.getenv('NOTIFICATION_EXECUTOR_DRAIN_TIMEOUT', '10'))  # seconds
+NOTIFICATION_SWEEP_INTERVAL = int(os.getenv('NOTIFICATION_SWEEP_INTERVAL', '60'))  # seconds
+NOTIFICATION_DIGEST_FLUSH_INTERVAL = int(os.getenv('NOTIFICATION_DIGEST_FLUSH_INTERVAL', '60'))  # seconds (worker)
+
+# Appointment reminders (run_reminder_scheduler)
+REMINDER_HOURS_BEFORE = int(os.getenv('REMINDER_HOURS_BEFORE', '24'))
 
 # Security Settings
 SECURE_BROWSER_XSS_FILTER = True
@@ -0,0 +1,18 @@
+"""
+Gunicorn settings, read from the working directory (./gunicorn.conf.py) in
+addition to the command-line flags in the Procfile / entrypoint.
+"""
+
+
+def post_worker_init(worker):
+    # The app is loaded in the worker by now; start the notification sweeper
+    # here rather than in the master, whose threads a fork would not carry over
+    from api.utils.notifications import start_sweeper
+    start_sweeper()
+
+
+def worker_exit(server, worker):
+    # Let queued in-process notification deliveries finish before the worker
+    # process exits (restart, deploy, max_requests); see api/utils/executor.py
+    from api.utils.notifications import EXECUTOR_DRAIN_TIMEOUT, notification_executor
+    notification_executor.shutdown(EXECUTOR_DRAIN_TIMEOUT)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Per-message latency of SMS/WhatsApp provider calls, before and after
+api/utils/providers.py.
+
+- before: a new twilio Client per SMS and a bare requests.post per Ultramsg
+  message (what sms_utils/whatsapp_utils used to do): one new connection,
+  i.e. one handshake, per message;
+- after: send_sms() and the Ultramsg post over this thread's pooled client
+  and keep-alive session.
+
+Both run against FakeProviderServer (api/utils/fake_providers.py), which
+charges --handshake-ms per new connection in place of TLS setup.
+
+    python scripts/bench/bench_providers.py --messages 200 --handshake-ms 40
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from api.utils.fake_providers import FakeProviderServer
+
+
+def measure(label, send, messages, server):
+    connections = server.connections
+    timings = []
+    for index in range(messages):
+        started = time.perf_counter()
+        ok = send(index)
+        timings.append((time.perf_counter() - started) * 1000)
+        if not ok:
+            raise SystemExit(f'{label}: message {index} was not accepted')
+    timings.sort()
+    print(
+        f'{label:<28} mean {statistics.mean(timings):7.2f} ms   '
+        f'p50 {timings[len(timings) // 2]:7.2f} ms   '
+        f'p95 {timings[int(len(timings) * 0.95)]:7.2f} ms   '
+        f'connections {server.connections - connections}'
+    )
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Provider client latency, before/after pooling')
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--handshake-ms', type=float, default=40)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    server = FakeProviderServer(latency_ms=args.latency_ms, handshake_ms=args.handshake_ms).start()
+    os.environ.update({
+        'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+        'TWILIO_AUTH_TOKEN': 'bench-token',
+        'TWILIO_PHONE_NUMBER': '+15005550006',
+        'TWILIO_API_BASE_URL': server.url,
+        'ULTRAMSG_INSTANCE_ID': 'instance1',
+        'ULTRAMSG_TOKEN': 'bench-token',
+        'ULTRAMSG_API_URL': server.url,
+    })
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+    import django
+    django.setup()
+
+    import requests
+    from django.conf import settings
+    from twilio.rest import Client
+    from api.utils import providers
+    from api.utils.sms_utils import send_sms
+
+    ultramsg_url = f'{settings.ULTRAMSG_API_URL}/{settings.ULTRAMSG_INSTANCE_ID}/messages/chat'
+
+    def sms_before(index):
+        # Old send_sms: a fresh Client (and so a fresh connection pool) per message.
+        # The rebased transport only redirects the host to the stand-in.
+        client = Client(
+            settings.TWILIO_ACCOUNT_SID,
+            settings.TWILIO_AUTH_TOKEN,
+            http_client=providers._TwilioHttpClient(server.url),
+        )
+        client.messages.create(body=f'Bench {index}', from_=settings.TWILIO_PHONE_NUMBER, to='+38344000000')
+        return True
+
+    def sms_after(index):
+        return send_sms('+38344000000', f'Bench {index}')
+
+    def ultramsg_before(index):
+        payload = {'token': settings.ULTRAMSG_TOKEN, 'to': '38344000000', 'body': f'Bench {index}'}
+        return requests.post(ultramsg_url, data=payload, timeout=10).status_code == 200
+
+    def ultramsg_after(index):
+        payload = {'token': settings.ULTRAMSG_TOKEN, 'to': '38344000000', 'body': f'Bench {index}'}
+        response = providers.http_session().post(ultramsg_url, data=payload, timeout=providers.http_timeout())
+        return response.status_code == 200
+
+    print(
+        f'{args.messages} messages per run, stand-in handshake {args.handshake_ms} ms, '
+        f'latency {args.latency_ms} ms\n'
+    )
+    for name, before, after in (
+        ('Twilio SMS', sms_before, sms_after),
+        ('Ultramsg WhatsApp', ultramsg_before, ultramsg_after),
+    ):
+        old = measure(f'{name} (before)', before, args.messages, server)
+        new = measure(f'{name} (after)', after, args.messages, server)
+        print(f'{"":<28} {old / new:.1f}x faster per message\n')
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Bulk status endpoint (POST /api/reservations/bulk_status/).
+
+- The status change is one UPDATE. Only reservations of the owner's business
+  change; others are reported as not found, and rows already in the status
+  as unchanged.
+- The customer notifications of the changed rows are queued as one batch of
+  notification jobs (a single INSERT), one ticket per job in the response.
+- Invalid input is rejected before anything is touched.
+
+All test data is created inside a transaction that is rolled back, so the
+queued jobs are never delivered.
+"""
+import os
+import sys
+import django
+from datetime import timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+from api.models import Business, NotificationJob, Reservation, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _reservations(business, count, status='pending', offset=0):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=2)
+    return Reservation.objects.bulk_create([
+        Reservation(
+            business=business,
+            customer_name='Bulk Customer',
+            customer_phone=f'+3834412{offset + i:04d}',
+            start_time=start + timedelta(hours=offset + i),
+            end_time=start + timedelta(hours=offset + i, minutes=30),
+            status=status,
+        )
+        for i in range(count)
+    ])
+
+
+def test_bulk_status_queues_one_batch():
+    print("\n" + "="*60)
+    print("TESTING BULK STATUS: ONE BATCH OF NOTIFICATION JOBS")
+    print("="*60)
+
+    passed = False
+    try:
+        with transaction.atomic():
+            business = Business.objects.create(name='Bulk Test', subdomain='bulk-status-test', email='bulk@example.com')
+            other = Business.objects.create(name='Other Bulk', subdomain='bulk-status-other', email='other@example.com')
+            owner = User.objects.create_user(
+                email='bulk-status-owner@example.com', password=None,
+                first_name='Bulk', last_name='Owner', business=business,
+            )
+            pending = _reservations(business, 3)
+            confirmed = _reservations(business, 1, status='confirmed', offset=3)
+            foreign = _reservations(other, 1, offset=4)
+            missing_id = max(r.pk for r in pending + confirmed + foreign) + 1000
+            ids = [r.pk for r in pending + confirmed + foreign] + [missing_id]
+
+            client = APIClient()
+            client.force_authenticate(user=owner)
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.post(
+                    '/api/reservations/bulk_status/', {'ids': ids, 'status': 'confirmed'}, format='json'
+                )
+            job_inserts = [
+                q for q in ctx.captured_queries
+                if q['sql'].startswith('INSERT') and NotificationJob._meta.db_table in q['sql']
+            ]
+            reservation_updates = [
+                q for q in ctx.captured_queries
+                if q['sql'].startswith('UPDATE') and Reservation._meta.db_table in q['sql']
+            ]
+            data = response.data
+            jobs = list(NotificationJob.objects.filter(pk__in=data['sms_notification']['tickets']))
+            print(f"\n📊 Status {response.status_code}: updated {data.get('updated')}, "
+                  f"unchanged {data.get('unchanged')}, not_found {data.get('not_found')}")
+            print(f"📊 {len(reservation_updates)} reservation UPDATE(s), {len(jobs)} job(s) from "
+                  f"{len(job_inserts)} INSERT(s): {sorted((job.kind, job.recipient) for job in jobs)}")
+
+            statuses = dict(Reservation.objects.filter(pk__in=ids).values_list('pk', 'status'))
+            if response.status_code != 200:
+                print(f"❌ FAIL: Expected 200, got {response.status_code}")
+            elif sorted(data['updated']) != sorted(r.pk for r in pending):
+                print("❌ FAIL: Exactly the pending reservations of the owner's business must change")
+            elif data['unchanged'] != [confirmed[0].pk] or data['not_found'] != sorted([foreign[0].pk, missing_id]):
+                print("❌ FAIL: Unchanged / not found reservations are misreported")
+            elif statuses[foreign[0].pk] != 'pending':
+                print("❌ FAIL: Another business's reservation was changed")
+            elif len(reservation_updates) != 1 or len(job_inserts) != 1:
+                print("❌ FAIL: Statuses and notification jobs were not written as one batch each")
+            elif (sorted(job.reservation_id for job in jobs) != sorted(r.pk for r in pending)
+                    or {job.kind for job in jobs} != {'reservation_confirmed'}
+                    or {job.status for job in jobs} != {'queued'}):
+                print("❌ FAIL: Expected one queued confirmation job per changed reservation")
+            else:
+                print("✅ PASS: One UPDATE, one batch of jobs, one ticket per changed reservation")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+def test_bulk_status_rejects_bad_input():
+    print("\n" + "="*60)
+    print("TESTING BULK STATUS: INVALID INPUT")
+    print("="*60)
+
+    passed = False
+    try:
+        with transaction.atomic():
+            business = Business.objects.create(name='Bulk Input', subdomain='bulk-input-test', email='input@example.com')
+            owner = User.objects.create_user(
+                email='bulk-input-owner@example.com', password=None,
+                first_name='Bulk', last_name='Owner', business=business,
+            )
+            reservation = _reservations(business, 1)[0]
+            client = APIClient()
+            client.force_authenticate(user=owner)
+
+            bodies = [
+                {'ids': [reservation.pk], 'status': 'done'},
+                {'ids': [], 'status': 'confirmed'},
+                {'ids': [str(reservation.pk)], 'status': 'confirmed'},
+                {'ids': [True], 'status': 'confirmed'},
+            ]
+            codes = [
+                client.post('/api/reservations/bulk_status/', body, format='json').status_code
+                for body in bodies
+            ]
+            untouched = (
+                Reservation.objects.get(pk=reservation.pk).status == 'pending'
+                and not NotificationJob.objects.filter(business=business).exists()
+            )
+            print(f"\n📊 Status codes: {codes}, reservation untouched: {untouched}")
+            if codes != [400] * len(bodies) or not untouched:
+                print("❌ FAIL: Invalid bulk requests must be rejected without side effects")
+            else:
+                print("✅ PASS: Invalid input is rejected")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+if __name__ == '__main__':
+    # Lets the test client use 'testserver'
+    setup_test_environment()
+    results = [test_bulk_status_queues_one_batch(), test_bulk_status_rejects_bad_input()]
+    sys.exit(0 if all(results) else 1)
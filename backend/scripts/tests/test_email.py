@@ -3,6 +3,9 @@ Test: Send reservation notification email with dummy data
 Run from backend directory:
     docker compose cp ../scripts/tests/test_email.py backend:/app/test_email.py
     docker compose exec backend python test_email.py
+
+Without sending real mail: start `python manage.py run_fake_providers` and run
+with EMAIL_HOST=127.0.0.1 EMAIL_PORT=1025 EMAIL_USE_TLS=False
 """
 import os, sys, django
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Digest mode for new-reservation owner emails (api/utils/notifications.py).
+
+- With email_digest_enabled the owner email is buffered, not queued; a
+  business without digest mode still gets one queued email per booking.
+- flush_digests() leaves the buffer alone until its oldest email has waited
+  email_digest_minutes, then folds it into one digest job.
+- The digest lists every buffered reservation, and once it is sent the
+  buffered emails' tickets report 'sent' too.
+
+The email sender is replaced by a stand-in; no message leaves the process.
+All test data is created inside a transaction that is rolled back.
+"""
+import os
+import sys
+import django
+from datetime import timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import transaction
+from django.utils import timezone
+from api.models import Business, NotificationJob, Reservation
+from api.utils import notifications
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _book(business, count):
+    """count new reservations, each with its owner email enqueued as the create view does"""
+    start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    jobs = []
+    for i in range(count):
+        reservation = Reservation.objects.create(
+            business=business, customer_name='Digest Customer', customer_phone=f'+3834412345{i}',
+            start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i, minutes=30),
+        )
+        jobs.append(notifications.enqueue_new_reservation_email(reservation, business))
+    return jobs
+
+
+def test_digest_buffer_and_flush():
+    print("\n" + "="*60)
+    print("TESTING EMAIL DIGEST: BUFFER AND FLUSH")
+    print("="*60)
+
+    digested = []
+
+    def sender(job):
+        digested.append(sorted(r.pk for r in notifications._digest_reservations(job)))
+        return True
+
+    passed = False
+    try:
+        senders = {('email', notifications.DIGEST_KIND): sender}
+        with transaction.atomic(), mock.patch.dict(notifications.SENDERS, senders):
+            business = Business.objects.create(
+                name='Digest Test', subdomain='digest-test', email='digest@example.com',
+                email_digest_enabled=True, email_digest_minutes=15,
+            )
+            plain = Business.objects.create(name='No Digest', subdomain='digest-off-test', email='plain@example.com')
+            buffered = _book(business, 3)
+            immediate = _book(plain, 1)
+            print(f"\n📊 Digest business: {[job.status for job in buffered]}, "
+                  f"other business: {[job.status for job in immediate]}")
+            claimable = notifications.claim_due_jobs(10, business_id=business.pk)
+
+            early = [d for d in notifications.flush_digests() if d.business_id == business.pk]
+            NotificationJob.objects.filter(pk__in=[job.pk for job in buffered]).update(
+                created_at=timezone.now() - timedelta(minutes=16)
+            )
+            digests = [d for d in notifications.flush_digests() if d.business_id == business.pk]
+            print(f"📊 Flush inside the window: {len(early)} digest(s); after it: {len(digests)} digest(s)")
+
+            notifications.run_jobs(notifications.claim_due_jobs(10, business_id=business.pk))
+            items = list(NotificationJob.objects.filter(pk__in=[job.pk for job in buffered]))
+            digest = NotificationJob.objects.get(pk=digests[0].pk) if digests else None
+            print(f"📊 Digest: {digest.status if digest else '-'}, listing {digested}; "
+                  f"buffered tickets: {sorted(job.status for job in items)}")
+
+            expected = sorted(job.reservation_id for job in buffered)
+            if {job.status for job in buffered} != {'buffered'} or immediate[0].status != 'queued':
+                print("❌ FAIL: Only digest-mode businesses get their owner emails buffered")
+            elif claimable:
+                print("❌ FAIL: Buffered emails were claimed for sending on their own")
+            elif early:
+                print("❌ FAIL: The buffer was flushed before its digest window passed")
+            elif len(digests) != 1 or digest.kind != notifications.DIGEST_KIND:
+                print("❌ FAIL: Expected one digest job once the window passed")
+            elif digest.status != 'sent' or digested != [expected]:
+                print("❌ FAIL: The digest must be sent once, listing every buffered reservation")
+            elif {job.status for job in items} != {'sent'} or {job.digest_id for job in items} != {digest.pk}:
+                print("❌ FAIL: Buffered tickets do not report the digest's outcome")
+            else:
+                print("✅ PASS: Owner emails are buffered and flushed as one digest")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+if __name__ == '__main__':
+    results = [test_digest_buffer_and_flush()]
+    sys.exit(0 if all(results) else 1)
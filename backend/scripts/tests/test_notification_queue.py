@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Retry, backoff and dead-lettering of the notification job queue
+(api/utils/notifications.py).
+
+- A failed send is rescheduled with exponential backoff (±10% jitter) and
+  dead-lettered with its last error after max_attempts.
+- A job that cannot succeed (provider not configured) is dead after one attempt.
+- Migration 0014 turns the old 'failed' status into 'dead' (and back).
+
+Providers are replaced by stand-in senders; no message leaves the process.
+All test data is created inside a transaction that is rolled back.
+"""
+import importlib
+import os
+import sys
+import django
+from datetime import timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+from api.models import Business, NotificationJob, Reservation
+from api.utils import notifications
+from api.utils.provider_routing import ProviderNotConfigured
+
+SMS_CONFIRMED = ('sms', 'reservation_confirmed')
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _reservation(subdomain):
+    business = Business.objects.create(name='Queue Test', subdomain=subdomain, email='queue@example.com')
+    start = timezone.now() + timedelta(days=1)
+    return Reservation.objects.create(
+        business=business,
+        customer_name='Queue Customer',
+        customer_phone='+38344123456',
+        start_time=start,
+        end_time=start + timedelta(minutes=30),
+        status='confirmed',
+    )
+
+
+def _attempt(job):
+    """Make the job due, claim it like a worker and send it; returns the reloaded job"""
+    NotificationJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    job_ids = notifications.claim_due_jobs(10, business_id=job.business_id)
+    notifications.run_jobs(job_ids)
+    return NotificationJob.objects.get(pk=job.pk)
+
+
+def test_retry_backoff_and_dead_letter():
+    print("\n" + "="*60)
+    print("TESTING NOTIFICATION QUEUE: RETRY, BACKOFF, DEAD-LETTER")
+    print("="*60)
+
+    def failing_sender(job):
+        raise ConnectionError('provider unreachable')
+
+    passed = False
+    try:
+        with transaction.atomic(), mock.patch.dict(notifications.SENDERS, {SMS_CONFIRMED: failing_sender}):
+            reservation = _reservation('queue-retry-test')
+            job = notifications.enqueue_status_notifications([reservation], 'confirmed', channel='sms')[0]
+            failed = False
+
+            for attempt in range(1, job.max_attempts + 1):
+                before = timezone.now()
+                job = _attempt(job)
+                print(f"\n📊 Attempt {attempt}: status={job.status}, attempts={job.attempts}, error={job.error!r}")
+                if job.attempts != attempt:
+                    print(f"❌ FAIL: Expected {attempt} attempt(s), the claim counted {job.attempts}")
+                    failed = True
+                    break
+                if attempt < job.max_attempts:
+                    delay = (job.run_after - before).total_seconds()
+                    expected = min(notifications.BACKOFF_BASE * 2 ** (attempt - 1), notifications.BACKOFF_MAX)
+                    print(f"   next try in {delay:.1f}s (backoff {expected}s ±10%)")
+                    if job.status != 'retrying':
+                        print("❌ FAIL: A failed attempt with attempts left must be retried")
+                        failed = True
+                        break
+                    if not expected * 0.9 - 1 <= delay <= expected * 1.1 + 1:
+                        print("❌ FAIL: Retry is not scheduled with exponential backoff")
+                        failed = True
+                        break
+
+            if not failed:
+                if job.status != 'dead' or 'provider unreachable' not in job.error:
+                    print("❌ FAIL: Job was not dead-lettered with its last error after max_attempts")
+                elif job.locked_at is not None:
+                    print("❌ FAIL: Dead job still holds its claim")
+                else:
+                    print("✅ PASS: Failures back off exponentially and end dead-lettered")
+                    passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+def test_not_configured_is_not_retried():
+    print("\n" + "="*60)
+    print("TESTING NOTIFICATION QUEUE: NON-RETRYABLE ERRORS")
+    print("="*60)
+
+    def unconfigured_sender(job):
+        raise ProviderNotConfigured('SMS not sent: Twilio is not configured')
+
+    passed = False
+    try:
+        with transaction.atomic(), mock.patch.dict(notifications.SENDERS, {SMS_CONFIRMED: unconfigured_sender}):
+            reservation = _reservation('queue-unconfigured-test')
+            job = notifications.enqueue_status_notifications([reservation], 'confirmed', channel='sms')[0]
+            job = _attempt(job)
+            print(f"\n📊 status={job.status}, attempts={job.attempts}, error={job.error!r}")
+            if job.status != 'dead' or job.attempts != 1:
+                print("❌ FAIL: A job that cannot succeed must be dead after one attempt")
+            else:
+                print("✅ PASS: Unconfigured provider dead-letters the job at once")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+def test_failed_status_migration():
+    print("\n" + "="*60)
+    print("TESTING MIGRATION 0014: 'failed' -> 'dead'")
+    print("="*60)
+
+    migration = importlib.import_module('api.migrations.0014_notificationjob_queue')
+    passed = False
+    try:
+        with transaction.atomic():
+            reservation = _reservation('queue-migration-test')
+            failed_job, sent_job = NotificationJob.objects.bulk_create([
+                NotificationJob(business=reservation.business, reservation=reservation, channel='sms',
+                                kind='reservation_confirmed', recipient=reservation.customer_phone, status=status)
+                for status in ('failed', 'sent')
+            ])
+
+            migration.migrate_statuses(apps, None)
+            forward = {job.pk: job.status for job in NotificationJob.objects.filter(pk__in=[failed_job.pk, sent_job.pk])}
+            migration.unmigrate_statuses(apps, None)
+            backward = NotificationJob.objects.get(pk=failed_job.pk).status
+            print(f"\n📊 forward: failed -> {forward[failed_job.pk]}, sent -> {forward[sent_job.pk]}; "
+                  f"backward: dead -> {backward}")
+
+            if forward[failed_job.pk] != 'dead' or forward[sent_job.pk] != 'sent':
+                print("❌ FAIL: Forward migration must turn only 'failed' jobs into 'dead'")
+            elif backward != 'failed':
+                print("❌ FAIL: Reverse migration must turn 'dead' back into 'failed'")
+            else:
+                print("✅ PASS: Given-up jobs become dead-lettered jobs")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+if __name__ == '__main__':
+    results = [
+        test_retry_backoff_and_dead_letter(),
+        test_not_configured_is_not_retried(),
+        test_failed_status_migration(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Circuit breakers of the provider router (api/utils/provider_routing.py).
+
+- Consecutive failures open a provider's circuit; calls are then skipped
+  without reaching the provider. After the cooldown one trial call is let
+  through (half-open): a failure opens the circuit again, a success closes it.
+- A refused message (4xx) does not count against the provider; an error of
+  unknown kind does.
+- A notification job whose providers are all skipped is deferred until the
+  circuit may let a call through, without using up one of its attempts.
+
+Providers are stand-in functions; no message leaves the process. Job data is
+created inside a transaction that is rolled back.
+"""
+import os
+import sys
+import time
+import django
+from datetime import timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import transaction
+from django.utils import timezone
+from api.models import Business, NotificationJob, Reservation
+from api.utils import notifications, provider_routing
+from api.utils.provider_routing import ProviderError, ProviderRouter, ProvidersUnavailable, provider_router
+
+COOLDOWN = 0.2  # seconds, instead of PROVIDER_BREAKER_COOLDOWN
+SKIPPED = 'ProvidersUnavailable, 0 call(s)'
+
+
+class _Rollback(Exception):
+    pass
+
+
+class StandIn:
+    """A provider call that counts how often it was reached"""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+
+    def __call__(self, name):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def _route(router, outcome):
+    """(result of route(), calls that reached the provider)"""
+    send = StandIn(outcome)
+    try:
+        result = router.route(['stand-in'], send)
+    except ProvidersUnavailable as e:
+        result = e
+    return result, send.calls
+
+
+def test_breaker_transitions():
+    print("\n" + "="*60)
+    print("TESTING PROVIDER BREAKER: OPEN, HALF-OPEN, CLOSE")
+    print("="*60)
+
+    router = ProviderRouter()
+    breaker = router.breaker('stand-in')
+    outage = ProviderError('stand-in', 503, 'unavailable')
+    steps = []
+
+    with mock.patch.object(provider_routing, 'COOLDOWN', COOLDOWN):
+        # Refusals mean the provider is up: they never open the circuit
+        for _ in range(provider_routing.FAILURE_THRESHOLD):
+            _route(router, ProviderError('stand-in', 400, 'invalid number'))
+        steps.append(('refusals', breaker.state, 'closed'))
+
+        for _ in range(provider_routing.FAILURE_THRESHOLD - 1):
+            _route(router, outage)
+        _route(router, KeyError('unexpected'))  # unknown errors count as failures
+        steps.append(('failures', breaker.state, 'open'))
+
+        result, calls = _route(router, True)
+        steps.append(('skipped while open', f'{type(result).__name__}, {calls} call(s)', SKIPPED))
+
+        time.sleep(COOLDOWN * 1.5)
+        result, calls = _route(router, outage)
+        steps.append(('failed trial', f'{breaker.state}, {calls} call(s)', 'open, 1 call(s)'))
+
+        time.sleep(COOLDOWN * 1.5)
+        breaker.allow()  # take the trial slot: the circuit is half-open now
+        steps.append(('cooldown over', breaker.state, 'half_open'))
+        result, calls = _route(router, True)
+        steps.append(('second caller during trial', f'{type(result).__name__}, {calls} call(s)', SKIPPED))
+        breaker.record_success(1.0)  # the trial call succeeded
+        steps.append(('successful trial', breaker.state, 'closed'))
+
+        result, calls = _route(router, True)
+        steps.append(('after close', f'{result}, {calls} call(s)', 'stand-in, 1 call(s)'))
+
+    print()
+    failed = False
+    for label, actual, expected in steps:
+        mark = '✓' if actual == expected else '✗'
+        print(f"   {mark} {label}: {actual} (expected {expected})")
+        failed = failed or actual != expected
+    print(f"📊 {breaker.snapshot()}")
+
+    passed = not failed and breaker.times_opened == 2
+    if passed:
+        print("✅ PASS: Breaker opens, lets one trial through and closes again")
+    else:
+        print("❌ FAIL: Breaker transitions")
+
+    print("\n" + "="*60)
+    return passed
+
+
+def test_deferral_uses_no_attempt():
+    print("\n" + "="*60)
+    print("TESTING PROVIDER BREAKER: DEFERRED JOB KEEPS ITS ATTEMPTS")
+    print("="*60)
+
+    name = 'breaker-test-provider'
+    breaker = provider_router.breaker(name)
+    outage = ProviderError(name, 503, 'unavailable')
+    for _ in range(provider_routing.FAILURE_THRESHOLD):
+        provider_router.route([name], StandIn(outage))
+
+    send = StandIn(True)
+
+    def sender(job):
+        return provider_router.route([name], send) is not None
+
+    passed = False
+    try:
+        with transaction.atomic(), mock.patch.dict(notifications.SENDERS, {('sms', 'reservation_confirmed'): sender}):
+            business = Business.objects.create(name='Breaker Test', subdomain='breaker-test', email='breaker@example.com')
+            start = timezone.now() + timedelta(days=1)
+            reservation = Reservation.objects.create(
+                business=business, customer_name='Breaker Customer', customer_phone='+38344123456',
+                start_time=start, end_time=start + timedelta(minutes=30), status='confirmed',
+            )
+            job = notifications.enqueue_status_notifications([reservation], 'confirmed', channel='sms')[0]
+            before = timezone.now()
+            notifications.run_jobs(notifications.claim_due_jobs(10, business_id=business.pk))
+            job = NotificationJob.objects.get(pk=job.pk)
+            wait = (job.run_after - before).total_seconds()
+            print(f"\n📊 status={job.status}, attempts={job.attempts}, provider calls={send.calls}, "
+                  f"next try in {wait:.1f}s (circuit retry in {breaker.retry_in():.1f}s)")
+            print(f"   error={job.error!r}")
+
+            if job.status != 'retrying' or job.attempts != 0:
+                print("❌ FAIL: A job skipped by open circuits must wait without using an attempt")
+            elif send.calls:
+                print("❌ FAIL: The provider was called while its circuit was open")
+            elif wait < provider_routing.COOLDOWN * 0.9:
+                print("❌ FAIL: The job is due again before the circuit can let a call through")
+            else:
+                print("✅ PASS: Open circuits defer the job and give back its attempt")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+    finally:
+        provider_router.reset(name)
+
+    print("\n" + "="*60)
+    return passed
+
+
+if __name__ == '__main__':
+    results = [test_breaker_transitions(), test_deferral_uses_no_attempt()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Query budgets for the reservation endpoints.
+
+- Public create (POST /api/reservations/): the tenant must be resolved once
+  per request and reused by the serializer, the view and the post_save signal.
+- List (GET /api/reservations/): the number of queries must not grow with
+  the number of reservations (no N+1 on business/staff/customer), and a
+  plain list call returns one bounded page with a `next` link.
+
+The script exits non-zero when a budget is exceeded.
+All test data is created inside a transaction that is rolled back.
+"""
+import os
+import sys
+import django
+from datetime import timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+from api.models import Business, Staff, Reservation, User
+from api.utils.tenant_cache import tenant_registry
+
+# Staff lookup, overlap check, INSERT, owner-email job INSERT (on PostgreSQL
+# the overlap check is the exclusion constraint enforced by the INSERT itself,
+# see api/utils/overlap.py)
+CREATE_QUERY_BUDGET = 4
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _statements(queries):
+    """
+    Captured queries minus savepoint bookkeeping: the test's own rollback
+    transaction turns the overlap guard's atomic() into SAVEPOINT/RELEASE,
+    which a real request (autocommit) does not issue.
+    """
+    return [q for q in queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))]
+
+
+def _print_queries(queries):
+    for i, query in enumerate(queries, 1):
+        print(f"   {i}. {query['sql'][:160]}")
+
+
+def test_create_query_budget():
+    print("\n" + "="*60)
+    print("TESTING QUERY BUDGET: PUBLIC RESERVATION CREATE")
+    print("="*60)
+
+    passed = False
+    try:
+        with transaction.atomic():
+            business = Business.objects.create(
+                name='Query Budget', subdomain='query-budget-test', email='budget@example.com'
+            )
+            staff = Staff.objects.create(business=business, name='Budget Staff')
+            # Warm the per-worker tenant registry as steady-state traffic would
+            tenant_registry.get(business.subdomain)
+
+            start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+            client = Client(HTTP_HOST='localhost')
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.post(
+                    '/api/reservations/',
+                    {
+                        'subdomain': business.subdomain,
+                        'customer_name': 'Budget Customer',
+                        'customer_phone': '+38344123456',
+                        'start_time': start.isoformat(),
+                        'end_time': (start + timedelta(minutes=30)).isoformat(),
+                        'staff': staff.pk,
+                    },
+                    content_type='application/json',
+                )
+
+            queries = _statements(ctx.captured_queries)
+            print(f"\n📊 Response Status: {response.status_code}")
+            print(f"🔢 Queries: {len(queries)} (budget {CREATE_QUERY_BUDGET})")
+            _print_queries(queries)
+
+            if response.status_code != 201:
+                print(f"❌ FAIL: Expected 201, got {response.status_code}: {response.content[:300]}")
+            elif len(queries) > CREATE_QUERY_BUDGET:
+                print("❌ FAIL: Query budget exceeded")
+            else:
+                print("✅ PASS: Create path is within its query budget")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+    finally:
+        tenant_registry.clear()
+
+    print("\n" + "="*60)
+    return passed
+
+
+def _count_list_queries(client, business, staff, customer, total, query=''):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=30)
+    existing = Reservation.objects.filter(business=business).count()
+    Reservation.objects.bulk_create([
+        Reservation(
+            business=business,
+            staff=staff if i % 2 else None,
+            customer=customer if i % 3 == 0 else None,
+            customer_name='List Customer',
+            customer_phone='+38344123456',
+            start_time=start + timedelta(hours=i),
+            end_time=start + timedelta(hours=i, minutes=30),
+        )
+        for i in range(existing, total)
+    ])
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/api/reservations/' + query)
+    return response, len(ctx.captured_queries)
+
+
+def test_list_query_count_constant():
+    print("\n" + "="*60)
+    print("TESTING QUERY COUNT: RESERVATION LIST (N+1)")
+    print("="*60)
+
+    passed = False
+    try:
+        with transaction.atomic():
+            business = Business.objects.create(
+                name='List Budget', subdomain='list-budget-test', email='list@example.com'
+            )
+            staff = Staff.objects.create(business=business, name='List Staff')
+            owner = User.objects.create_user(
+                email='list-budget-owner@example.com', password=None,
+                first_name='List', last_name='Owner', business=business,
+            )
+            client = APIClient()
+            client.force_authenticate(user=owner)
+
+            # Full representation, and a sparse one whose only customer
+            # data comes from the property-backed *_display fields
+            failed = False
+            for query in ('', '?fields=id,customer_name_display,customer_email_display'):
+                counts = {}
+                for total in (5, 50):
+                    response, counts[total] = _count_list_queries(client, business, staff, owner, total, query)
+                    print(f"\n📊 {total} reservations{query} -> status {response.status_code}, {counts[total]} queries")
+                    if response.status_code != 200 or len(response.data['results']) != total:
+                        print(f"❌ FAIL: Unexpected response for {total} reservations")
+                        raise _Rollback
+                Reservation.objects.filter(business=business).delete()
+                failed = failed or counts[5] != counts[50]
+
+            # More history than one page: still one page and a next link
+            response, _ = _count_list_queries(client, business, staff, owner, 120)
+            page = response.data['results']
+            print(f"\n📊 120 reservations -> {len(page)} in the first page, next={bool(response.data['next'])}")
+            if len(page) != 50 or not response.data['next']:
+                print("❌ FAIL: The default list is not paginated")
+                failed = True
+            else:
+                follow = client.get(response.data['next'])
+                if len(follow.data['results']) != 50 or {r['id'] for r in page} & {r['id'] for r in follow.data['results']}:
+                    print("❌ FAIL: The next page does not continue after the first")
+                    failed = True
+
+            if failed:
+                print("❌ FAIL: Reservation list budget")
+            else:
+                print("✅ PASS: Query count is independent of list size, pages are bounded")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+if __name__ == '__main__':
+    # Lets the test client use 'testserver' and keeps outgoing mail in memory
+    setup_test_environment()
+    results = [test_create_query_budget(), test_list_query_count_constant()]
+    sys.exit(0 if all(results) else 1)
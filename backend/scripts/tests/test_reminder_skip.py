@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Reminder SMS for reservations that changed after the reminder was queued
+(api/utils/reminders.py, api/utils/notifications.py).
+
+- A reminder whose reservation was canceled meanwhile ends 'skipped'.
+- A reminder whose reservation was moved to another time ends 'skipped'.
+- Neither reaches the SMS provider; an unchanged reservation's reminder is sent.
+
+The SMS sender is replaced by a stand-in; no message leaves the process.
+All test data is created inside a transaction that is rolled back.
+"""
+import os
+import sys
+import django
+from datetime import timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import transaction
+from django.utils import timezone
+from api.models import Business, NotificationJob, Reservation
+from api.utils import notifications
+from api.utils.reminders import due_reminders
+
+
+class _Rollback(Exception):
+    pass
+
+
+def test_stale_reminders_are_skipped():
+    print("\n" + "="*60)
+    print("TESTING REMINDERS: CANCELED OR MOVED RESERVATIONS")
+    print("="*60)
+
+    reminded = []
+
+    def sender(job):
+        reminded.append(job.reservation_id)
+        return True
+
+    passed = False
+    try:
+        senders = {('sms', notifications.REMINDER_KIND): sender}
+        with transaction.atomic(), mock.patch.dict(notifications.SENDERS, senders):
+            business = Business.objects.create(
+                name='Reminder Test', subdomain='reminder-skip-test', email='rem@example.com'
+            )
+            start = timezone.now().replace(microsecond=0) + timedelta(hours=3)
+            kept, canceled, moved = [
+                Reservation.objects.create(
+                    business=business, customer_name='Reminder Customer', customer_phone=f'+3834412345{i}',
+                    start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i, minutes=30),
+                    status='confirmed',
+                )
+                for i in range(3)
+            ]
+
+            # Queued the way claim_reminder_batch() queues them, for this business only
+            rows = list(
+                due_reminders().filter(business=business).order_by('start_time')
+                .values_list('pk', 'business_id', 'customer_phone', 'start_time')
+            )
+            notifications.enqueue_reminders(rows)
+
+            Reservation.objects.filter(pk=canceled.pk).update(status='canceled')
+            Reservation.objects.filter(pk=moved.pk).update(
+                start_time=moved.start_time + timedelta(days=1), end_time=moved.end_time + timedelta(days=1)
+            )
+
+            notifications.run_jobs(notifications.claim_due_jobs(10, business_id=business.pk))
+            jobs = {
+                job.reservation_id: job
+                for job in NotificationJob.objects.filter(business=business, kind=notifications.REMINDER_KIND)
+            }
+            print()
+            for label, reservation in (('kept', kept), ('canceled', canceled), ('moved', moved)):
+                job = jobs.get(reservation.pk)
+                print(f"📊 {label}: {job.status if job else 'no job'} {job.error if job else ''}")
+            print(f"📊 Provider called for: {reminded}")
+
+            if len(jobs) != 3:
+                print(f"❌ FAIL: Expected 3 reminder jobs, got {len(jobs)}")
+            elif jobs[kept.pk].status != 'sent':
+                print("❌ FAIL: The unchanged reservation's reminder was not sent")
+            elif jobs[canceled.pk].status != 'skipped' or jobs[moved.pk].status != 'skipped':
+                print("❌ FAIL: Reminders of canceled or moved reservations must be skipped")
+            elif reminded != [kept.pk]:
+                print("❌ FAIL: A skipped reminder reached the provider")
+            else:
+                print("✅ PASS: Stale reminders are skipped, current ones sent")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+if __name__ == '__main__':
+    results = [test_stale_reminders_are_skipped()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+Conflict detection of the bulk reservation import (api/utils/reservation_import.py).
+
+- Rows overlapping an existing active booking are reported with the overlap
+  error (same staff, or either side unassigned); other staff members, touching
+  intervals and canceled bookings do not conflict.
+- Rows overlapping each other: the one that starts first wins.
+- A dry run reports the same errors and inserts nothing.
+- When a concurrent create wins the race (the insert trips the overlap
+  constraint), the import reads again instead of failing the batch.
+
+All test data is created inside a transaction that is rolled back.
+"""
+import os
+import sys
+import django
+from datetime import timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import transaction
+from django.utils import timezone
+from api.models import Business, Reservation, Staff
+from api.utils import reservation_import
+from api.utils.overlap import OVERLAP_MESSAGE, ReservationOverlap
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _setup():
+    business = Business.objects.create(name='Import Test', subdomain='import-test', email='import@example.com')
+    anna = Staff.objects.create(business=business, name='Anna')
+    Staff.objects.create(business=business, name='Besa')
+    day = (timezone.now() + timedelta(days=3)).replace(hour=8, minute=0, second=0, microsecond=0)
+    for staff, start, status in ((anna, day + timedelta(hours=2), 'confirmed'),
+                                 (anna, day + timedelta(hours=1), 'canceled')):
+        Reservation.objects.create(
+            business=business, staff=staff, customer_name='Existing Customer',
+            customer_phone='+38344000000', start_time=start,
+            end_time=start + timedelta(minutes=30), status=status,
+        )
+    return business, day
+
+
+def _row(day, start_minutes, length, staff='', status=''):
+    start = day + timedelta(minutes=start_minutes)
+    return {
+        'customer_name': 'Imported Customer',
+        'customer_phone': '+38344123456',
+        'start_time': start.isoformat(),
+        'end_time': (start + timedelta(minutes=length)).isoformat(),
+        'staff': staff,
+        'status': status,
+    }
+
+
+def _rows(day):
+    """Existing: Anna 10:00-10:30 confirmed, Anna 09:00-09:30 canceled"""
+    return [
+        _row(day, 120, 30, staff='Anna'),                    # 1: same staff as existing -> conflict
+        _row(day, 120, 30, staff='Besa'),                    # 2: other staff -> ok
+        _row(day, 135, 30, staff='besa'),                    # 3: overlaps row 2 -> conflict
+        _row(day, 130, 10),                                  # 4: unassigned over existing -> conflict
+        _row(day, 150, 30, staff='Anna'),                    # 5: touches existing -> ok
+        _row(day, 125, 30, staff='Anna', status='canceled'), # 6: canceled rows never conflict
+        _row(day, 60, 30, staff='Anna'),                     # 7: existing there is canceled -> ok
+    ]
+
+
+EXPECTED_CONFLICTS = {1, 3, 4}
+
+
+def _conflict_rows(result):
+    return {error['row'] for error in result['errors'] if error['errors'] == {'start_time': OVERLAP_MESSAGE}}
+
+
+def test_conflicts_against_existing_rows():
+    print("\n" + "="*60)
+    print("TESTING RESERVATION IMPORT: CONFLICTS")
+    print("="*60)
+
+    passed = False
+    try:
+        with transaction.atomic():
+            business, day = _setup()
+            rows = _rows(day)
+
+            dry = reservation_import.import_reservations(business, rows, dry_run=True)
+            count_after_dry_run = Reservation.objects.filter(business=business).count()
+            result = reservation_import.import_reservations(business, rows)
+            count = Reservation.objects.filter(business=business).count()
+
+            print(f"\n📊 Dry run: conflicts {sorted(_conflict_rows(dry))}, {count_after_dry_run} rows in the table")
+            print(f"📊 Import: conflicts {sorted(_conflict_rows(result))}, created {result['created']}, "
+                  f"{count} rows in the table")
+
+            expected_created = len(rows) - len(EXPECTED_CONFLICTS)
+            if _conflict_rows(dry) != EXPECTED_CONFLICTS or count_after_dry_run != 2:
+                print(f"❌ FAIL: Dry run should report rows {sorted(EXPECTED_CONFLICTS)} and insert nothing")
+            elif _conflict_rows(result) != EXPECTED_CONFLICTS or result['failed'] != len(EXPECTED_CONFLICTS):
+                print(f"❌ FAIL: Expected conflicts in rows {sorted(EXPECTED_CONFLICTS)}")
+            elif result['created'] != expected_created or count != 2 + expected_created:
+                print(f"❌ FAIL: Expected {expected_created} rows to be created")
+            else:
+                print("✅ PASS: Conflicting rows are reported, the rest are imported")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+def test_concurrent_create_is_retried():
+    print("\n" + "="*60)
+    print("TESTING RESERVATION IMPORT: LOST RACE IS RETRIED")
+    print("="*60)
+
+    bulk_create = Reservation.objects.bulk_create
+    calls = []
+
+    def racing_bulk_create(objs, **kwargs):
+        # The first insert trips the overlap constraint, as if a booking
+        # without the day lock committed between the read and the insert
+        calls.append(len(objs))
+        if len(calls) == 1:
+            raise ReservationOverlap()
+        return bulk_create(objs, **kwargs)
+
+    passed = False
+    try:
+        with transaction.atomic():
+            business, day = _setup()
+            with mock.patch.object(Reservation.objects, 'bulk_create', side_effect=racing_bulk_create):
+                result = reservation_import.import_reservations(business, _rows(day))
+            print(f"\n📊 Inserts tried: {len(calls)}, created {result['created']}, "
+                  f"conflicts {sorted(_conflict_rows(result))}")
+
+            if len(calls) != 2:
+                print("❌ FAIL: Import did not read again after losing the race")
+            elif result['created'] != len(_rows(day)) - len(EXPECTED_CONFLICTS):
+                print("❌ FAIL: Retried import did not insert the valid rows")
+            else:
+                print("✅ PASS: A lost race re-reads the bookings instead of failing the batch")
+                passed = True
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    print("\n" + "="*60)
+    return passed
+
+
+if __name__ == '__main__':
+    results = [test_conflicts_against_existing_rows(), test_concurrent_create_is_retried()]
+    sys.exit(0 if all(results) else 1)
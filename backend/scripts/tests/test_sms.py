@@ -2,6 +2,9 @@
 """
 Quick SMS test script
 Run from project root: docker exec -it fade_district-backend-1 python scripts/tests/test_sms.py
+
+Without sending real SMS: start `python manage.py run_fake_providers` and run
+with TWILIO_API_BASE_URL=http://127.0.0.1:8025 (any TWILIO_* credentials)
 """
 import os
 import sys
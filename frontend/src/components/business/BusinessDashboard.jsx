@@ -26,7 +26,10 @@ const MONTH_NAMES = ['Jan','Shk','Mar','Pri','Maj','Qer','Kor','Gus','Sht','Tet'
 const BusinessDashboard = () => {
   const navigate = useNavigate();
   const { user, logout } = useAuth();
-  const { reservations, allReservations, loading, filterStatus, setFilterStatus, refreshReservations } = useReservations();
+  const {
+    reservations, allReservations, loading, filterStatus, setFilterStatus, refreshReservations,
+    hasMoreReservations, loadMoreReservations, loadingMore,
+  } = useReservations();
   const [activeTab, setActiveTab] = useState('overview');
   const [stats, setStats] = useState({ total: 0, pending: 0, confirmed: 0, completed: 0, canceled: 0 });
 
@@ -188,6 +191,9 @@ const BusinessDashboard = () => {
             filterStatus={filterStatus}
             setFilterStatus={setFilterStatus}
             refreshReservations={refreshReservations}
+            hasMore={hasMoreReservations}
+            loadMore={loadMoreReservations}
+            loadingMore={loadingMore}
           />
         )}
         {activeTab === 'staff' && <StaffManagement />}
@@ -269,7 +275,7 @@ const BookingLinkCard = ({ bookingUrl }) => {
 };
 
 /* ── Reservations Tab ── */
-const ReservationsTab = ({ reservations, filterStatus, setFilterStatus, refreshReservations }) => (
+const ReservationsTab = ({ reservations, filterStatus, setFilterStatus, refreshReservations, hasMore, loadMore, loadingMore }) => (
   <div>
     <div className="flex justify-between items-center mb-6">
       <h2 className="text-2xl font-bold text-gray-900">Rezervimet e klientëve</h2>
@@ -289,6 +295,14 @@ const ReservationsTab = ({ reservations, filterStatus, setFilterStatus, refreshR
       </div>
     </div>
     <ReservationList reservations={reservations} showBusinessInfo={false} onStatusChange={refreshReservations} />
+    {hasMore && (
+      <div className="flex justify-center mt-6">
+        <button onClick={loadMore} disabled={loadingMore}
+          className="text-base text-blue-600 hover:text-blue-800 border-2 border-blue-200 px-4 py-2.5 rounded-lg hover:bg-blue-50 font-medium shadow-sm disabled:opacity-50">
+          {loadingMore ? 'Duke ngarkuar...' : 'Shfaq rezervimet e vjetra'}
+        </button>
+      </div>
+    )}
   </div>
 );
 
@@ -1,20 +1,25 @@
 import { useState, useEffect } from 'react';
 import api from '../api/axios';
 
+// The list endpoint is cursor-paginated: { next, results }, newest first
+const PAGE_SIZE = 100;
+
 export const useReservations = () => {
   const [reservations, setReservations] = useState([]);
   const [allReservations, setAllReservations] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filterStatus, setFilterStatus] = useState('all');
 
+  // Refreshes load the newest page only, so their cost does not grow with history
   const fetchReservations = async () => {
     setLoading(true);
     try {
-      console.log('Fetching reservations...');
-      const response = await api.get('reservations/');
-      console.log('Reservations response:', response.data);
-      setAllReservations(response.data);
-      filterReservations(response.data, filterStatus);
+      const response = await api.get('reservations/', { params: { page_size: PAGE_SIZE } });
+      setAllReservations(response.data.results);
+      setNextPage(response.data.next);
+      filterReservations(response.data.results, filterStatus);
     } catch (error) {
       console.error('Error fetching reservations:', error);
       console.error('Error response:', error.response?.data);
@@ -22,6 +27,20 @@ export const useReservations = () => {
     setLoading(false);
   };
 
+  // Older reservations, one page at a time via the `next` cursor link
+  const loadMoreReservations = async () => {
+    if (!nextPage || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await api.get(nextPage);
+      setAllReservations(current => [...current, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (error) {
+      console.error('Error loading more reservations:', error);
+    }
+    setLoadingMore(false);
+  };
+
   const filterReservations = (reservationList, status) => {
     if (status === 'all') {
       setReservations(reservationList);
@@ -87,6 +106,9 @@ export const useReservations = () => {
   return {
     reservations,
     allReservations,
+    hasMoreReservations: Boolean(nextPage),
+    loadMoreReservations,
+    loadingMore,
     loading,
     filterStatus,
     setFilterStatus,